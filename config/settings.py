@@ -1,17 +1,26 @@
 from pathlib import Path
 import os
 import dj_database_url # 추가
+from django.core.exceptions import ImproperlyConfigured
 
 # 1. BASE_DIR 정의 (이 부분이 없어서 에러가 난 것입니다)
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# 2. 보안 키 (개발용 임의 키)
-SECRET_KEY = 'django-insecure-test-key-for-food-erp'
+# 실행 환경 - DJANGO_ENV=production 이면 운영 설정 (DEBUG 끔, 템플릿 컴파일 캐시 고정, 보안 키/ALLOWED_HOSTS 필수)
+PRODUCTION = os.environ.get('DJANGO_ENV', '') == 'production'
 
-# 3. 디버그 모드 (개발 중엔 True)
-DEBUG = True
+# 2. 보안 키 (운영은 DJANGO_SECRET_KEY 필수)
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY', 'django-insecure-test-key-for-food-erp')
+if PRODUCTION and SECRET_KEY.startswith('django-insecure'):
+    raise ImproperlyConfigured("DJANGO_ENV=production 에서는 DJANGO_SECRET_KEY 를 설정해야 합니다.")
 
-ALLOWED_HOSTS = ['*']
+# 3. 디버그 모드 (개발 중엔 True, 운영 기본 False)
+DEBUG = os.environ.get('DJANGO_DEBUG', '0' if PRODUCTION else '1') == '1'
+
+# 운영은 ALLOWED_HOSTS 필수 (쉼표 구분, '*' 불가 - Host 헤더 위조로 비밀번호 재설정 링크 등이 다른 도메인을 가리킬 수 있음)
+ALLOWED_HOSTS = [host.strip() for host in os.environ.get('ALLOWED_HOSTS', '' if PRODUCTION else '*').split(',') if host.strip()]
+if PRODUCTION and (not ALLOWED_HOSTS or '*' in ALLOWED_HOSTS):
+    raise ImproperlyConfigured("DJANGO_ENV=production 에서는 ALLOWED_HOSTS 를 설정해야 합니다 (예: erp.example.com).")
 
 # 4. 앱 등록 (fulfillment 앱 필수!)
 INSTALLED_APPS = [
@@ -23,12 +32,16 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'fulfillment',
     'django.contrib.humanize',  # <--- 콤마(,)가 뒤에 꼭 있어야 합니다!
+    'rest_framework',
+    'django_filters',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'fulfillment.middleware.RequestProfilingMiddleware',  # REQUEST_PROFILING=1 일 때만 동작
     'whitenoise.middleware.WhiteNoiseMiddleware', # ★ 여기에 추가!
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'fulfillment.routers.ReplicaStickinessMiddleware',  # 쓰기 직후 읽기는 primary 로 (reporting 복제본 사용 시)
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
@@ -42,17 +55,56 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'], # 루트 템플릿 폴더 연결
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'fulfillment.context_processors.fragment_cache',
             ],
         },
     },
 ]
+# 템플릿 로더 - 개발: Django 기본 (컴파일 결과 캐시 + 파일 수정 시 자동 초기화)
+#               운영: cached.Loader 명시 (처음 한 번만 읽고 컴파일, 파일 변경 감시 없음 -> 배포 시 재시작)
+if PRODUCTION:
+    TEMPLATES[0]['OPTIONS']['loaders'] = [('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ])]
+else:
+    TEMPLATES[0]['APP_DIRS'] = True
+
+# 캐시 (기준 데이터 / 템플릿 조각) - 기본은 워커별 메모리
+# 여러 워커가 공유하려면 CACHE_BACKEND=django.core.cache.backends.redis.RedisCache, CACHE_LOCATION=redis://...
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION', '')
+# 배포 버전 - 템플릿 조각 캐시 키 접두어 (배포 후 이전 템플릿으로 만든 조각을 쓰지 않음)
+APP_RELEASE = os.environ.get('APP_RELEASE', '')
+CACHES = {
+    'default': {'BACKEND': CACHE_BACKEND, 'LOCATION': CACHE_LOCATION},
+    # {% cache %} 태그가 사용하는 캐시
+    'template_fragments': {'BACKEND': CACHE_BACKEND, 'LOCATION': CACHE_LOCATION, 'KEY_PREFIX': f"fragment{APP_RELEASE}"},
+}
+# 워커(프로세스)마다 따로인 캐시 - 키에 DB 버전이 들어가는 기준 데이터/템플릿 조각에는 괜찮지만
+# 삭제로 무효화하는 세션/로그인 사용자 캐시는 다른 워커에 이전 값이 남으므로 공유 캐시(Redis, Memcached, 파일 등)에서만 사용
+SHARED_CACHE = not CACHE_BACKEND.endswith(('.LocMemCache', '.DummyCache'))
+# 세션 저장 방식 (요청마다 세션 테이블 조회 줄이기)
+# - db: 매 요청 DB (워커별 캐시일 때 기본) / cached_db: 캐시 우선, 없으면 DB (공유 캐시일 때 기본) / cache: 캐시만
+# - signed_cookies: 서버 저장 없이 서명된 쿠키 (로그아웃해도 탈취된 쿠키는 만료 전까지 유효 - SECRET_KEY 로 서명)
+SESSION_STORE = os.environ.get('SESSION_STORE', 'cached_db' if SHARED_CACHE else 'db')
+if SESSION_STORE in ('cache', 'cached_db') and not SHARED_CACHE:
+    raise ImproperlyConfigured(f"SESSION_STORE={SESSION_STORE} 는 공유 CACHE_BACKEND 가 필요합니다 (로그아웃한 세션이 다른 워커에 남음).")
+SESSION_ENGINE = f"django.contrib.sessions.backends.{SESSION_STORE}"
+# 로그인 사용자 캐시 (초, 0 = 매 요청 DB 조회) - 사용자 저장/삭제 시 공유 캐시에서 즉시 삭제 (fulfillment.auth)
+AUTH_USER_CACHE_SECONDS = int(os.environ.get('AUTH_USER_CACHE_SECONDS', 300 if SHARED_CACHE else 0))
+if AUTH_USER_CACHE_SECONDS and not SHARED_CACHE:
+    raise ImproperlyConfigured("AUTH_USER_CACHE_SECONDS 는 공유 CACHE_BACKEND 가 필요합니다 (비활성화/삭제된 사용자가 다른 워커에 남음).")
+AUTHENTICATION_BACKENDS = ['fulfillment.auth.CachedModelBackend']
+
+# {% cache %} 조각 유지 시간 (초, 0 = 끔) - 키에 데이터 버전이 들어 있으므로 길어도 됨
+FRAGMENT_CACHE_TIMEOUT = int(os.environ.get('FRAGMENT_CACHE_TIMEOUT', 3600))
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
@@ -64,6 +116,37 @@ DATABASES = {
     )
 }
 
+# 읽기 전용 복제본 - 보고서/엑셀/원장 인쇄/대시보드/API 목록 조회 (fulfillment.routers)
+# 로컬 테스트: REPORTING_DATABASE_URL=sqlite:///replica.sqlite3 + manage.py sync_reporting_db
+if os.environ.get('REPORTING_DATABASE_URL'):
+    DATABASES['reporting'] = dj_database_url.parse(os.environ['REPORTING_DATABASE_URL'], conn_max_age=600)
+    DATABASES['reporting']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['fulfillment.routers.ReportingRouter']
+# 사용자가 쓰기를 한 뒤 이 시간(초) 동안은 그 사용자의 읽기도 primary 에서 (복제 지연 대비)
+REPORTING_STICKY_SECONDS = int(os.environ.get('REPORTING_STICKY_SECONDS', 10))
+
+# SQLite 동시 접속 모드 (SQLITE_TUNING=0 이면 Django 기본값)
+# - WAL: 읽기와 쓰기가 서로 막지 않음 / busy_timeout: 잠금 시 즉시 실패하지 않고 대기
+# - transaction_mode=IMMEDIATE: atomic() 이 BEGIN IMMEDIATE 로 시작 -> 쓰기 잠금을 처음에 잡아 읽기->쓰기 승격 중 교착 없음
+SQLITE_TUNING = os.environ.get('SQLITE_TUNING', '1') == '1'
+for _db in DATABASES.values():
+    if not SQLITE_TUNING or _db['ENGINE'] != 'django.db.backends.sqlite3':
+        continue
+    _db.setdefault('OPTIONS', {}).update({
+        'transaction_mode': 'IMMEDIATE',
+        'init_command': ';'.join([
+            'PRAGMA journal_mode=WAL',
+            f"PRAGMA busy_timeout={int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 20000))}",
+            'PRAGMA synchronous=NORMAL',
+            f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}",
+            f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_KB', 64 * 1024))}",
+            'PRAGMA temp_store=MEMORY',
+        ]),
+    })
+
+# 쓰기 트랜잭션(@write_transaction) 잠금 오류 재시도 횟수
+DB_LOCK_RETRIES = int(os.environ.get('DB_LOCK_RETRIES', 3))
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -91,6 +174,58 @@ STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# 업로드 파일 (공지 첨부) - 웹서버에서 직접 공개하지 않고 로그인 확인 뷰(notice_file)로만 전달
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', os.path.join(BASE_DIR, 'media'))
+MEDIA_URL = '/media/'
+# 첨부 전송을 웹서버에 넘김: '' = Django 가 직접(FileResponse), 'x-sendfile' = Apache mod_xsendfile, 'x-accel' = nginx
+SENDFILE_BACKEND = os.environ.get('SENDFILE_BACKEND', '')
+# nginx: location /protected/ { internal; alias <MEDIA_ROOT>/; }
+SENDFILE_URL_PREFIX = os.environ.get('SENDFILE_URL_PREFIX', '/protected/')
+# 이미지 첨부 미리보기 캐시 폴더 / 크기(긴 변 픽셀)
+THUMBNAIL_CACHE_DIR = os.environ.get('THUMBNAIL_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'thumbnails'))
+THUMBNAIL_SIZE = int(os.environ.get('THUMBNAIL_SIZE', 160))
+
+# 거래명세서 PDF 캐시 폴더 (출고완료 주문만 저장)
+INVOICE_CACHE_DIR = os.environ.get('INVOICE_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'invoices'))
+# 일괄 명세서 렌더링 워커 프로세스 수
+INVOICE_BATCH_WORKERS = int(os.environ.get('INVOICE_BATCH_WORKERS', min(4, os.cpu_count() or 1)))
+
+# PDF/엑셀/바코드 라이브러리를 워커 시작 시 미리 로드할지 여부 (기본: 처음 사용할 때 로드)
+PRELOAD_HEAVY_LIBS = os.environ.get('PRELOAD_HEAVY_LIBS', '') == '1'
+
+# 통장 거래내역 대사 - 장부 일자와 이 일수 이내 차이까지 같은 거래로 봄
+RECONCILE_DATE_WINDOW_DAYS = int(os.environ.get('RECONCILE_DATE_WINDOW_DAYS', 3))
+
+# 조회수 카운터를 DB 에 모아서 반영하는 주기 (초, 0 = 요청마다)
+HIT_COUNTER_FLUSH_SECONDS = float(os.environ.get('HIT_COUNTER_FLUSH_SECONDS', 10))
+
+# 읽기 전용 API (/api/v1/) - 배송앱/BI 스크립트용
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': ['rest_framework.permissions.IsAuthenticated'],
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+}
+
+# 요청별 SQL/시간 계측 (Server-Timing 헤더 + 'fulfillment.profiling' 로그)
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', '') == '1'
+PROFILING_SLOWEST = int(os.environ.get('PROFILING_SLOWEST', 5))
+# 이 시간(ms) 이상 걸린 쿼리는 호출 위치와 함께 경고 로그 (비우면 사용 안 함)
+PROFILING_SLOW_QUERY_MS = float(os.environ['PROFILING_SLOW_QUERY_MS']) if os.environ.get('PROFILING_SLOW_QUERY_MS') else None
+PROFILING_EXPLAIN = os.environ.get('PROFILING_EXPLAIN', '') == '1'
+
+# 기본 WARNING (느린 쿼리 경고만) - 요청별 계측/렌더 로그를 보려면 FULFILLMENT_LOG_LEVEL=INFO
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {'console': {'class': 'logging.StreamHandler'}},
+    'loggers': {
+        'fulfillment': {'handlers': ['console'], 'level': os.environ.get('FULFILLMENT_LOG_LEVEL', 'WARNING')},
+    },
+}
+
 # 8. 기본 ID 필드 설정
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -0,0 +1,190 @@
+"""
+읽기 전용 JSON API (v1) - 배송앱 / BI 스크립트 동기화용
+
+- serializer/모델 인스턴스 없이 values() dict 를 그대로 응답 (대량 동기화 속도)
+- cursor 페이지네이션 (id 순, ?cursor= / ?page_size=)
+- ?fields=id,status,... 로 필요한 필드만 조회
+- 필터 파라미터는 HTML 목록 화면(order_list, inventory_list 등)과 동일
+- 조회는 reporting 복제본이 설정되어 있으면 그쪽으로 (fulfillment.routers)
+"""
+from django.db.models import F
+from django_filters import rest_framework as filters
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import ListAPIView
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import IsAuthenticated
+
+from .models import Order, OrderItem, Inventory, Product, Partner, ProductCategory, StorageType, PartnerType
+from .routers import reporting
+from .services import partner_balance_queryset, partner_balance, BALANCE_FIELDS
+
+
+class SyncCursorPagination(CursorPagination):
+    ordering = 'id'
+    page_size = 500
+    page_size_query_param = 'page_size'
+    max_page_size = 5000
+
+
+# ---------------------------------------------------------
+#  필터 (HTML 목록 화면의 GET 파라미터와 동일)
+# ---------------------------------------------------------
+class OrderFilter(filters.FilterSet):
+    start_date = filters.DateFilter(field_name='order_date', lookup_expr='date__gte')
+    end_date = filters.DateFilter(field_name='order_date', lookup_expr='date__lte')
+    client = filters.NumberFilter(field_name='client_id')
+    status = filters.CharFilter(field_name='status')
+
+    class Meta:
+        model = Order
+        fields = []
+
+
+class InventoryFilter(filters.FilterSet):
+    p_name = filters.CharFilter(field_name='product__name', lookup_expr='icontains')
+    sku = filters.CharFilter(field_name='product__sku', lookup_expr='icontains')
+    location = filters.NumberFilter(field_name='location_id')
+    start_date = filters.DateFilter(field_name='expiry_date', lookup_expr='gte')
+    end_date = filters.DateFilter(field_name='expiry_date', lookup_expr='lte')
+
+    class Meta:
+        model = Inventory
+        fields = []
+
+
+class ProductFilter(filters.FilterSet):
+    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    category = filters.ChoiceFilter(field_name='category', choices=ProductCategory.choices)
+    storage = filters.ChoiceFilter(field_name='storage_type', choices=StorageType.choices)
+
+    class Meta:
+        model = Product
+        fields = []
+
+
+class PartnerFilter(filters.FilterSet):
+    name = filters.CharFilter(field_name='name', lookup_expr='icontains')
+    partner_type = filters.ChoiceFilter(field_name='partner_type', choices=PartnerType.choices)
+
+    class Meta:
+        model = Partner
+        fields = []
+
+
+# ---------------------------------------------------------
+#  공통 베이스
+# ---------------------------------------------------------
+class LeanListAPIView(ListAPIView):
+    """
+    values() 기반 목록 API.
+    field_map     : 응답 키 -> ORM 경로 (id 는 커서 기준이라 항상 포함)
+    computed      : 조회 후 계산하는 키 -> 계산에 필요한 field_map 키 목록 (decorate 에서 채움)
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = SyncCursorPagination
+    filter_backends = [filters.DjangoFilterBackend]
+    field_map = {}
+    computed = {}
+
+    def get_fields(self):
+        requested = self.request.query_params.get('fields')
+        if not requested:
+            return list(self.field_map) + list(self.computed)
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.field_map and name not in self.computed]
+        if unknown:
+            raise ValidationError({'fields': f"알 수 없는 필드: {', '.join(unknown)}"})
+        return ['id'] + [name for name in names if name != 'id']
+
+    def decorate(self, rows, fields):
+        """computed 필드 채우기 (하위 클래스)"""
+        return rows
+
+    def list(self, request, *args, **kwargs):
+        fields = self.get_fields()
+        needed = {name for name in fields if name in self.field_map}
+        for name in fields:
+            needed.update(self.computed.get(name, ()))
+        plain = [name for name in needed if self.field_map[name] == name]
+        aliased = {name: F(self.field_map[name]) for name in needed if self.field_map[name] != name}
+
+        with reporting():  # 동기화용 대량 조회는 복제본에서
+            rows = self.filter_queryset(self.get_queryset()).values(*plain, **aliased)
+            page = self.decorate(self.paginate_queryset(rows), fields)
+        # 계산용으로만 가져온 값은 응답에서 제외
+        page = [{name: row[name] for name in fields} for row in page]
+        return self.get_paginated_response(page)
+
+
+# ---------------------------------------------------------
+#  리소스
+# ---------------------------------------------------------
+class OrderListAPI(LeanListAPIView):
+    """주문 (+ 품목)"""
+    filterset_class = OrderFilter
+    field_map = {
+        'id': 'id', 'order_date': 'order_date', 'status': 'status', 'memo': 'memo',
+        'client_id': 'client_id', 'client_name': 'client__name',
+        'total_revenue': 'total_revenue', 'total_cogs': 'total_cogs',
+    }
+    computed = {'items': ()}
+    item_fields = ('product_id', 'quantity', 'supplied_weight', 'cost_price', 'final_amount')
+    item_aliases = {'sku': F('product__sku'), 'product_name': F('product__name')}
+
+    def get_queryset(self):
+        return Order.objects.all()
+
+    def decorate(self, rows, fields):
+        if 'items' not in fields or not rows:
+            return rows
+        items = {row['id']: [] for row in rows}
+        for item in OrderItem.objects.filter(order_id__in=items).order_by('id').values('order_id', *self.item_fields, **self.item_aliases):
+            items[item.pop('order_id')].append(item)
+        for row in rows:
+            row['items'] = items[row['id']]
+        return rows
+
+
+class InventoryListAPI(LeanListAPIView):
+    """재고 로트 (수량 > 0)"""
+    filterset_class = InventoryFilter
+    field_map = {
+        'id': 'id', 'product_id': 'product_id', 'sku': 'product__sku', 'product_name': 'product__name',
+        'location_id': 'location_id', 'location_code': 'location__code', 'zone_name': 'location__zone__name',
+        'quantity': 'quantity', 'batch_number': 'batch_number',
+        'received_date': 'received_date', 'expiry_date': 'expiry_date',
+    }
+
+    def get_queryset(self):
+        return Inventory.objects.filter(quantity__gt=0)
+
+
+class ProductListAPI(LeanListAPIView):
+    """상품"""
+    filterset_class = ProductFilter
+    field_map = {name: name for name in (
+        'id', 'sku', 'name', 'category', 'storage_type', 'unit',
+        'purchase_price', 'price', 'shelf_life_days', 'is_taxable',
+    )}
+
+    def get_queryset(self):
+        return Product.objects.all()
+
+
+class PartnerBalanceListAPI(LeanListAPIView):
+    """거래처 잔액 (Partner.current_balance 와 동일 규칙, 서브쿼리 집계)"""
+    filterset_class = PartnerFilter
+    field_map = {name: name for name in (
+        'id', 'name', 'partner_type', 'biz_number', 'phone', 'initial_balance',
+        'sales_total', 'purchase_total', 'deposit_total', 'withdrawal_total',
+    )}
+    computed = {'balance': BALANCE_FIELDS}
+
+    def get_queryset(self):
+        return partner_balance_queryset()
+
+    def decorate(self, rows, fields):
+        if 'balance' in fields:
+            for row in rows:
+                row['balance'] = partner_balance(*(row[name] for name in BALANCE_FIELDS))
+        return rows
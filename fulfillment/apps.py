@@ -1,6 +1,25 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class FulfillmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'fulfillment'
+
+    def ready(self):
+        # 테이블 변경 카운터 (조건부 GET)
+        from .versions import connect_signals
+        connect_signals()
+
+        # 조회수 카운터 주기 반영
+        from . import counters
+        counters.connect_signals()
+
+        # 로그인 사용자 캐시 무효화 (사용자 저장/삭제)
+        from . import auth
+        auth.connect_signals()
+
+        # PDF/엑셀/바코드를 주로 처리하는 워커는 첫 요청 지연을 없애기 위해 미리 로드
+        if getattr(settings, 'PRELOAD_HEAVY_LIBS', False):
+            from .utils import preload_heavy_libraries
+            preload_heavy_libraries()
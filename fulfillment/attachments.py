@@ -0,0 +1,201 @@
+"""
+공지 첨부파일 전달 + 이미지 미리보기(썸네일)
+
+- MEDIA_ROOT 는 웹서버에서 공개하지 않고 로그인 확인 뷰(notice_file)로만 전달
+- SENDFILE_BACKEND = 'x-sendfile'(Apache) / 'x-accel'(nginx) : 헤더만 응답하고 전송/Range 는 웹서버가 처리
+- 그 외 : FileResponse -> WSGI 서버의 file_wrapper 가 sendfile() 로 전송 (파이썬 워커로 복사하지 않음)
+  + Range 요청(단일 구간) 206 응답, ETag(크기+수정시각) / If-None-Match / If-Range
+- 링크에 ?v=<수정시각> 을 붙이면 파일이 바뀔 때 URL 도 바뀌므로 1년 캐시(immutable), 없으면 매번 ETag 재검증
+- 썸네일 : 이미지 첨부만, THUMBNAIL_CACHE_DIR 에 '접두어-버전.webp' 로 저장 (원본이 바뀌면 버전이 달라져 다시 생성)
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import content_disposition_header, http_date
+
+from .utils import get_pillow
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp')
+CACHE_FOREVER = 365 * 24 * 3600
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def is_image(name):
+    return bool(name) and name.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def parse_range(header, size):
+    """
+    'bytes=시작-끝' 단일 구간 -> (시작, 끝) 포함 범위
+    형식이 다르거나 여러 구간이면 None (전체 전송), 파일 범위 밖이면 ValueError (416)
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if not start:  # 'bytes=-500' = 마지막 500 바이트
+        if int(end) == 0 or size == 0:
+            raise ValueError(header)
+        return max(size - int(end), 0), size - 1
+    start, end = int(start), min(int(end), size - 1) if end else size - 1
+    if start > end:
+        raise ValueError(header)
+    return start, end
+
+
+class RangeFile:
+    """열린 파일의 일부 구간만 읽는 래퍼 (fileno 가 없으므로 WSGI 서버는 sendfile 대신 read() 로 전송)"""
+
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self.f, self.remaining = f, length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        data = self.f.read(self.remaining if size < 0 else min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+def _validators(stat):
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"', int(stat.st_mtime)
+
+
+def _sendfile(path, name, filename, as_attachment):
+    response = HttpResponse(content_type=mimetypes.guess_type(filename)[0] or 'application/octet-stream')
+    if settings.SENDFILE_BACKEND == 'x-accel':
+        response['X-Accel-Redirect'] = settings.SENDFILE_URL_PREFIX.rstrip('/') + '/' + quote(name.replace(os.sep, '/'))
+    else:
+        response['X-Sendfile'] = path
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def _file_response(request, path, filename, as_attachment, etag, last_modified, size):
+    header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    if header and (not if_range or if_range in (etag, http_date(last_modified))):
+        try:
+            span = parse_range(header, size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f"bytes */{size}"
+            return response
+        if span:
+            start, end = span
+            response = FileResponse(RangeFile(open(path, 'rb'), start, end - start + 1), status=206,
+                                    as_attachment=as_attachment, filename=filename)
+            response['Content-Length'] = end - start + 1
+            response['Content-Range'] = f"bytes {start}-{end}/{size}"
+            return response
+    return FileResponse(open(path, 'rb'), as_attachment=as_attachment, filename=filename)
+
+
+def serve_file(request, path, filename=None, *, name=None, as_attachment=False, immutable=False):
+    """
+    파일 응답 (권한 확인은 호출하는 뷰에서)
+    name : MEDIA_ROOT 기준 저장 이름 - 있으면 SENDFILE_BACKEND 설정에 따라 웹서버로 넘김
+    immutable : URL 에 버전이 들어 있어 내용이 바뀌지 않음 -> 1년 캐시
+    """
+    try:
+        stat = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("파일이 없습니다.")
+    filename = filename or os.path.basename(path)
+    etag, last_modified = _validators(stat)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if name and settings.SENDFILE_BACKEND:
+            response = _sendfile(path, name, filename, as_attachment)
+        else:
+            response = _file_response(request, path, filename, as_attachment, etag, last_modified, stat.st_size)
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    if immutable:
+        patch_cache_control(response, private=True, max_age=CACHE_FOREVER, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def serve_fieldfile(request, fieldfile, **kwargs):
+    """모델 FileField 값 -> serve_file (비어 있으면 404)"""
+    if not fieldfile:
+        raise Http404("첨부파일이 없습니다.")
+    return serve_file(request, fieldfile.path, os.path.basename(fieldfile.name), name=fieldfile.name, **kwargs)
+
+
+# ---------------------------------------------------------
+# 썸네일 (디스크 캐시)
+# ---------------------------------------------------------
+def _thumbnail_path(prefix, version):
+    return os.path.join(settings.THUMBNAIL_CACHE_DIR, f"{prefix}-{version}.webp")
+
+
+def clear_thumbnails(prefix, keep=None):
+    """해당 접두어의 썸네일 파일 삭제 (keep 경로는 남김)"""
+    cache_dir = settings.THUMBNAIL_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(f"{prefix}-") and name.endswith('.webp') and path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _render_thumbnail(source, path):
+    Image = get_pillow()
+    from PIL import ImageOps
+    size = (settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE)
+    with Image.open(source) as img:
+        img.draft('RGB', size)  # JPEG 는 디코딩 단계에서 축소 (원본 해상도로 풀지 않음)
+        img = ImageOps.exif_transpose(img)
+        img.thumbnail(size)
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        img.save(tmp_path, 'WEBP', quality=80)
+    os.replace(tmp_path, path)  # 동시 요청에도 반쯤 쓰인 파일이 보이지 않도록 원자적 교체
+
+
+def get_thumbnail(fieldfile, prefix):
+    """
+    이미지 첨부의 썸네일 경로 (없으면 생성) -> 이미지가 아니거나 읽을 수 없으면 None
+    prefix : 캐시 파일 이름 앞부분 (예: 'notice-12')
+    """
+    if not fieldfile or not is_image(fieldfile.name):
+        return None
+    try:
+        stat = os.stat(fieldfile.path)
+    except FileNotFoundError:
+        return None
+    key = f"{fieldfile.name}:{stat.st_size}:{stat.st_mtime_ns}:{settings.THUMBNAIL_SIZE}"
+    path = _thumbnail_path(prefix, hashlib.sha1(key.encode()).hexdigest()[:12])
+    if os.path.exists(path):
+        return path
+    os.makedirs(settings.THUMBNAIL_CACHE_DIR, exist_ok=True)
+    Image = get_pillow()
+    try:
+        _render_thumbnail(fieldfile.path, path)
+    except (OSError, ValueError, Image.DecompressionBombError):  # 손상/미지원 형식, 너무 큰 이미지
+        logger.warning("thumbnail of %s failed", fieldfile.name, exc_info=True)
+        return None
+    clear_thumbnails(prefix, keep=path)
+    return path
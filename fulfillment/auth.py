@@ -0,0 +1,59 @@
+"""
+로그인 사용자 캐시 - 요청마다 auth_user 를 다시 조회하지 않음
+
+- AuthenticationMiddleware 가 부르는 get_user()/aget_user() 결과를 Django 캐시에 AUTH_USER_CACHE_SECONDS 동안 보관
+- 무효화는 캐시 삭제이므로 모든 워커가 같은 캐시를 봐야 함 -> 공유 CACHE_BACKEND 일 때만 켜짐 (settings.SHARED_CACHE)
+- 사용자 저장/삭제(post_save/post_delete) 시 즉시 + 커밋 후 한 번 더 삭제
+  (커밋 전에 다른 요청이 이전 값을 다시 캐시해도 커밋 후 지워짐)
+  -> 비밀번호 변경(세션 해시 검증), 비활성화, 로그인 시각 갱신, 회원탈퇴가 바로 반영
+- update() 처럼 signal 이 없는 경로는 invalidate_user() 를 직접 호출 (아니면 최대 AUTH_USER_CACHE_SECONDS 지연)
+- 권한/그룹은 캐시하지 않음 (사용자 객체에 붙는 권한 캐시는 요청 단위 그대로)
+- 세션 저장 방식은 settings.SESSION_STORE (cached_db / signed_cookies ...)
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+
+def _key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user(user_id):
+    cache.delete(_key(user_id))
+    transaction.on_commit(lambda: cache.delete(_key(user_id)))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend + 사용자 조회 캐시 (로그인/권한 검사는 ModelBackend 그대로)"""
+
+    def get_user(self, user_id):
+        timeout = settings.AUTH_USER_CACHE_SECONDS
+        user = cache.get(_key(user_id)) if timeout else None
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None and timeout:
+                cache.set(_key(user_id), user, timeout)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+    async def aget_user(self, user_id):
+        timeout = settings.AUTH_USER_CACHE_SECONDS
+        user = await cache.aget(_key(user_id)) if timeout else None
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None and timeout:
+                await cache.aset(_key(user_id), user, timeout)
+        return user if user is not None and self.user_can_authenticate(user) else None
+
+
+def _on_user_change(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+def connect_signals():
+    user_model = get_user_model()
+    post_save.connect(_on_user_change, sender=user_model, dispatch_uid='fulfillment.auth.save')
+    post_delete.connect(_on_user_change, sender=user_model, dispatch_uid='fulfillment.auth.delete')
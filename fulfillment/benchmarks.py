@@ -0,0 +1,379 @@
+"""
+뷰 벤치마크 / 쿼리 예산
+
+- fulfillment/urls.py 의 이름 있는 URL 전부를 테스트 클라이언트로 호출 -> 응답 시간, 쿼리 수, 최대 메모리(tracemalloc)
+- ROUTES.budget : 캐시가 빈 첫 요청의 최대 쿼리 수. 데이터 양과 무관해야 하므로 N+1 이 생기면 초과
+- tests.py (CI 예산 검사) 와 manage.py benchmark_views (JSON 리포트 / 이전 리포트와 비교) 가 같은 정의를 사용
+- TEMPLATE_PAGES / render_profiles : 주요 화면의 템플릿 렌더링 시간을 로더/조각 캐시 설정별로 비교 (benchmark_templates)
+"""
+import importlib
+import statistics
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from io import BytesIO, StringIO
+from time import perf_counter
+from typing import NamedTuple
+
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.db import connection
+from django.template import engines
+from django.template.backends.django import Template as BackendTemplate
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils import timezone
+
+from . import refdata
+from .models import (
+    Order, Inventory, Purchase, Expense, Employee, Payroll, WorkLog, Payment, Product,
+    BankAccount, BankTransaction, Zone, Location, Notice, CompanyInfo,
+)
+from .utils import get_pillow
+from .versions import mark_changed
+
+BENCH_USER = 'bench'
+BENCH_PASSWORD = 'bench-password'
+
+# scale=1 기준 setup_data 인자 (건수 인자만 scale 배)
+SEED_PARAMS = {
+    'partners': 30, 'products': 200, 'zones': 3, 'locations_per_zone': 20, 'lots': 500,
+    'orders_per_day': 10, 'lines': 4, 'purchases_per_day': 3, 'payments_per_day': 5,
+    'expenses_per_day': 2, 'employees': 5, 'years': 0.25,
+}
+UNSCALED = ('zones', 'lines', 'years')
+
+
+class Route(NamedTuple):
+    budget: int             # 최대 쿼리 수 (캐시 비운 첫 요청)
+    args: tuple = ()        # URL 인자 - fixtures 키
+    query: str = ''         # 쿼리스트링 ({fixtures 키} 치환)
+    method: str = 'get'
+    data: dict = None       # POST 본문 ({fixtures 키} 치환)
+    login: bool = True
+    requires: str = None    # 네이티브 의존 라이브러리 - import 실패 시 건너뜀
+
+
+ROUTES = {
+    'index': Route(13),  # 조각 캐시 빈 상태 - 캐시 적중 시 4 (세션/사용자/버전/그룹)
+    'dashboard': Route(13),
+    'dashboard_async': Route(14),  # async login_required(auser) + 템플릿 request.user 가 사용자를 따로 조회 (공유 캐시면 두 번째는 사용자 캐시 -> 13)
+    'signup': Route(0, login=False),
+    'delete_account': Route(3),
+
+    'inbound_create': Route(7),
+    'print_label': Route(6, ('inventory',)),
+
+    'inventory_list': Route(5),
+    'inventory_update': Route(8, ('inventory',)),
+    'inventory_delete': Route(5, ('inventory',)),
+    'export_inventory_excel': Route(3),
+
+    'purchase_list': Route(6),
+    'purchase_create': Route(2),
+    'purchase_update': Route(9, ('purchase',)),
+    'purchase_delete': Route(4, ('purchase',)),
+    'export_purchase_excel': Route(3),
+
+    'order_list': Route(6),
+    'order_create': Route(2),
+    'order_import': Route(3),
+    'order_update': Route(8, ('order',)),
+    'order_delete': Route(4, ('order',)),
+    'export_order_excel': Route(3),
+    'order_allocate': Route(40, ('open_order',)),  # 품목/로트별 재고 차감 쓰기 - 품목 수(최대 7)에 비례
+    'process_weight': Route(6, ('order',)),
+    'generate_invoice': Route(7, ('order',), 'format=html'),
+    'invoice_batch': Route(10, query='ids={shipped_ids}', requires='weasyprint'),
+
+    'monthly_report': Route(7),
+    'monthly_report_async': Route(8),
+    'expense_list': Route(5),
+    'expense_create': Route(2),
+    'expense_update': Route(5, ('expense',)),
+    'expense_delete': Route(4, ('expense',)),
+
+    'employee_list': Route(4),
+    'employee_create': Route(2),
+    'employee_update': Route(4, ('employee',)),
+    'employee_delete': Route(4, ('employee',)),
+    'payroll_list': Route(5),
+    'payroll_create': Route(2),
+    'payroll_run': Route(6),
+    'payroll_update': Route(5, ('payroll',)),
+    'payroll_delete': Route(4, ('payroll',)),
+    'worklog_list': Route(6),
+    'worklog_create': Route(2),
+    'worklog_update': Route(5, ('worklog',)),
+    'worklog_delete': Route(5, ('worklog',)),
+
+    'partner_list': Route(5),
+    'partner_create': Route(2),
+    'partner_update': Route(4, ('partner',)),
+    'partner_delete': Route(4, ('partner',)),
+    'partner_detail': Route(13, ('partner',)),
+    'print_partner_ledger': Route(8, ('partner',)),
+    'partner_payment_create': Route(3, ('partner',)),
+    'payment_update': Route(5, ('payment',)),
+    'payment_delete': Route(5, ('payment',)),
+
+    'product_list': Route(5),
+    'product_create': Route(2),
+    'product_update': Route(4, ('product',)),
+    'product_delete': Route(4, ('product',)),
+    'data_import': Route(3),
+
+    'company_update': Route(4),
+    'bank_list': Route(11),
+    'bank_create': Route(2),
+    'bank_transaction_create': Route(2),
+    'bank_detail': Route(7, ('bank',)),
+    'bank_statement_import': Route(4, ('bank',)),
+    'bank_reconciliation': Route(10, ('bank',)),
+    'bank_transaction_update': Route(6, ('bank_trx',)),
+    'bank_transaction_delete': Route(4, ('bank_trx',)),
+
+    'location_list': Route(9),
+    'zone_create': Route(2),
+    'zone_delete': Route(4, ('zone',)),
+    'location_create': Route(2),
+    'location_delete': Route(4, ('location',)),
+    'product_search': Route(4, query='q=갈'),
+    'location_search': Route(4, query='q=A'),
+
+    'notice_list': Route(5),
+    'notice_create': Route(2),
+    'notice_detail': Route(5, ('notice',)),
+    'notice_file': Route(3, ('notice',)),
+    'notice_thumbnail': Route(3, ('notice',)),
+
+    'api_token': Route(1, method='post', data={'username': BENCH_USER, 'password': BENCH_PASSWORD}, login=False),
+    'api_token_refresh': Route(1, method='post', data={'refresh': '{refresh}'}, login=False),
+    'api_orders': Route(4, query='page_size=100'),
+    'api_inventory': Route(3, query='page_size=100'),
+    'api_products': Route(3, query='page_size=100'),
+    'api_partner_balances': Route(3, query='page_size=100'),
+}
+
+
+def route_names(urlconf='fulfillment.urls'):
+    """urls.py 의 이름 있는 URL 목록"""
+    return [p.name for p in get_resolver(urlconf).url_patterns if isinstance(p, URLPattern) and p.name]
+
+
+def _sample_image():
+    Image = get_pillow()
+    buffer = BytesIO()
+    Image.linear_gradient('L').resize((800, 600)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def seed(scale=1, seed=42, stdout=None):
+    """벤치마크용 데이터 (setup_data + 공지/업무일지/회사정보/계정)"""
+    stdout = stdout or StringIO()
+    params = {key: value if key in UNSCALED else value * scale for key, value in SEED_PARAMS.items()}
+    call_command('setup_data', seed=seed, stdout=stdout, **params)
+
+    user = User.objects.create_superuser(BENCH_USER, password=BENCH_PASSWORD)
+    CompanyInfo.objects.get_or_create(defaults={'name': '벤치마크 물류'})
+    Notice.objects.bulk_create([
+        Notice(title=f"공지 {i + 1}", content="벤치마크 공지 본문 " * 20, author=user, is_important=i % 10 == 0)
+        for i in range(20 * scale)
+    ])
+    notice = Notice.objects.order_by('id').first()  # 첨부/미리보기 벤치마크용 이미지 첨부
+    notice.file.save('bench.png', ContentFile(_sample_image()), save=True)
+    employees = list(Employee.objects.values_list('id', flat=True))
+    today = timezone.now().date()
+    WorkLog.objects.bulk_create([
+        WorkLog(employee_id=employees[i % len(employees)], date=today - timezone.timedelta(days=i // len(employees)),
+                content="입고 검수 및 피킹", issues="" if i % 7 else "파손 1건")
+        for i in range(100 * scale)
+    ])
+    mark_changed(Notice, WorkLog, CompanyInfo)
+
+
+def load_fixtures():
+    """URL 인자로 쓸 대표 객체 pk (거래가 많은 매출처 / 출고완료 주문 등)"""
+    from rest_framework_simplejwt.tokens import RefreshToken
+
+    shipped = Order.objects.filter(status='SHIPPED', client__isnull=False).order_by('-id')
+    order = shipped.first()
+    open_order = Order.objects.filter(status='PENDING').order_by('id').first() or order
+    return {
+        'order': order.pk, 'open_order': open_order.pk,
+        'shipped_ids': ','.join(str(pk) for pk in shipped.values_list('id', flat=True)[:5]),
+        'partner': order.client_id,
+        'inventory': Inventory.objects.filter(quantity__gt=0).order_by('id').first().pk,
+        'purchase': Purchase.objects.order_by('-id').first().pk,
+        'expense': Expense.objects.order_by('-id').first().pk,
+        'employee': Employee.objects.order_by('id').first().pk,
+        'payroll': Payroll.objects.order_by('-id').first().pk,
+        'worklog': WorkLog.objects.order_by('-id').first().pk,
+        'payment': Payment.objects.order_by('-id').first().pk,
+        'product': Product.objects.order_by('id').first().pk,
+        'bank': BankAccount.objects.order_by('id').first().pk,
+        'bank_trx': BankTransaction.objects.order_by('-id').first().pk,
+        'zone': Zone.objects.order_by('id').first().pk,
+        'location': Location.objects.order_by('id').first().pk,
+        'notice': Notice.objects.order_by('id').first().pk,
+        'refresh': str(RefreshToken.for_user(User.objects.get(username=BENCH_USER))),
+    }
+
+
+def reset_caches():
+    """캐시가 빈 상태 (배포 직후 첫 요청) 재현 - 기준 데이터 + 템플릿 조각"""
+    for alias in settings.CACHES:
+        caches[alias].clear()
+    refdata._load.cache_clear()
+
+
+def available(module):
+    try:
+        importlib.import_module(module)
+        return True
+    except (ImportError, OSError):  # weasyprint: 네이티브 라이브러리(pango) 없으면 OSError
+        return False
+
+
+def _capture():
+    """queries_log 는 최대 9000건 (deque) - 꽉 차면 건수 차이가 0 이 되므로 매번 비움"""
+    connection.queries_log.clear()
+    return CaptureQueriesContext(connection)
+
+
+def _content_length(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+class Bench:
+    """
+    around : 요청마다 감쌀 컨텍스트 (TestCase 에서는 on_commit 콜백 실행용)
+    """
+    def __init__(self, fixtures, around=None):
+        self.fixtures = fixtures
+        self.around = around or nullcontext
+        self.client = Client()
+        self.client.force_login(User.objects.get(username=BENCH_USER))
+        self.anonymous = Client()
+
+    def path(self, name, route):
+        path = reverse(f'fulfillment:{name}', args=[self.fixtures[key] for key in route.args])
+        return f"{path}?{route.query.format(**self.fixtures)}" if route.query else path
+
+    def request(self, name, route):
+        client = self.client if route.login else self.anonymous
+        data = {key: str(value).format(**self.fixtures) for key, value in (route.data or {}).items()}
+        with self.around():
+            response = getattr(client, route.method)(self.path(name, route), data)
+            _content_length(response)
+        return response
+
+    def measure(self, name, repeat=5, memory=True):
+        """첫 요청(캐시 없음) 쿼리 수 + 반복 요청 시간(ms) / 최대 메모리(KB)"""
+        route = ROUTES[name]
+        result = {'path': self.path(name, route), 'budget': route.budget}
+        if route.requires and not available(route.requires):
+            return {**result, 'skipped': f"{route.requires} 사용 불가"}
+
+        reset_caches()
+        with _capture() as cold:
+            response = self.request(name, route)
+        result.update(status=response.status_code, queries=len(cold), bytes=_content_length(response))
+
+        timings = []
+        for _ in range(repeat):
+            with _capture() as warm:
+                started = perf_counter()
+                self.request(name, route)
+                timings.append((perf_counter() - started) * 1000)
+        if timings:
+            result.update(queries_warm=len(warm), ms_median=round(statistics.median(timings), 2),
+                          ms_min=round(min(timings), 2))
+        if memory:
+            tracemalloc.start()
+            try:
+                self.request(name, route)
+                result['peak_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            finally:
+                tracemalloc.stop()
+        return result
+
+    def run(self, names=None, repeat=5, memory=True):
+        return {name: self.measure(name, repeat, memory) for name in (names or ROUTES)}
+
+
+# ---------------------------------------------------------
+# 템플릿 렌더링 벤치마크 (manage.py benchmark_templates)
+# ---------------------------------------------------------
+TEMPLATE_PAGES = (
+    'dashboard', 'order_list', 'inventory_list', 'purchase_list', 'partner_list', 'partner_detail',
+    'product_list', 'bank_detail', 'monthly_report', 'notice_list', 'notice_detail', 'worklog_list',
+)
+_LOADERS = ['django.template.loaders.filesystem.Loader', 'django.template.loaders.app_directories.Loader']
+
+
+def render_profiles():
+    """비교할 렌더링 설정 -> {이름: override_settings 인자}"""
+    def templates(loaders):
+        engine = {**settings.TEMPLATES[0], 'APP_DIRS': False}
+        return [{**engine, 'OPTIONS': {**engine['OPTIONS'], 'loaders': loaders}}]
+
+    no_fragments = {**settings.CACHES, 'template_fragments': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    cached = [('django.template.loaders.cached.Loader', _LOADERS)]
+    return {
+        'no_cache': {'TEMPLATES': templates(_LOADERS), 'CACHES': no_fragments},       # 요청마다 읽기 + 컴파일
+        'cached_loader': {'TEMPLATES': templates(cached), 'CACHES': no_fragments},    # 컴파일 결과 재사용
+        'fragments': {'TEMPLATES': templates(cached), 'CACHES': settings.CACHES},     # + {% cache %} 조각
+    }
+
+
+@contextmanager
+def render_timer():
+    """
+    템플릿 렌더링 시간(초) 목록 - render() 1회 = 1건 (include/extends 는 포함되어 합산)
+    템플릿이 처음 값을 읽을 때 실행되는 쿼리(지연 QuerySet, lazy_dashboard)도 렌더링 시간에 포함
+    """
+    original = BackendTemplate.render
+    spent = []
+
+    def timed(self, *args, **kwargs):
+        started = perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            spent.append(perf_counter() - started)
+
+    BackendTemplate.render = timed
+    try:
+        yield spent
+    finally:
+        BackendTemplate.render = original
+
+
+def measure_render(bench, name, repeat=5):
+    """첫 요청(로더/조각 캐시 빈 상태) + 반복 요청의 렌더링 시간(ms) 중앙값"""
+    route = ROUTES[name]
+    reset_caches()
+    for engine in engines.all():  # 컴파일된 템플릿 캐시 (cached.Loader) 도 비움
+        for loader in engine.engine.template_loaders:
+            loader.reset()
+    with render_timer() as spent:
+        bench.request(name, route)
+        first = sum(spent)
+        timings = []
+        for _ in range(repeat):
+            spent.clear()
+            bench.request(name, route)
+            timings.append(sum(spent))
+    return {'first_ms': round(first * 1000, 2), 'ms_median': round(statistics.median(timings) * 1000, 2) if timings else None}
+
+
+def over_budget(results):
+    """[(이름, 쿼리 수, 예산)] - 예산 초과 또는 오류 응답"""
+    return [(name, r['queries'], r['budget']) for name, r in results.items()
+            if 'skipped' not in r and (r['queries'] > r['budget'] or r['status'] >= 400)]
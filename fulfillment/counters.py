@@ -0,0 +1,75 @@
+"""
+조회수 등 적중 카운터 - 요청마다 행 전체를 save() 하지 않고 모아서 반영
+
+- hit(Notice, pk) : 프로세스 메모리에 +1 (DB 쿼리 없음)
+- 요청 종료 시 HIT_COUNTER_FLUSH_SECONDS 가 지났으면 F('views') + n 으로 일괄 반영
+  (같은 증가량끼리 묶어 UPDATE 1개 -> 행 수와 무관하게 쿼리 몇 개)
+- update() 는 save() 가 아니므로 updated_at(auto_now) 과 테이블 변경 카운터(versions)는 그대로 = '내용 수정' 의미 유지
+- 워커 프로세스가 여럿이어도 각자 자기 증가분만 더하므로 유실/경합 없음
+  (프로세스가 비정상 종료되면 마지막 주기 분량만 유실 - 정상 종료는 atexit 로 반영)
+- 화면에는 pending() 으로 아직 반영되지 않은 증가분을 더해 표시
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+FLUSH_CHUNK = 500  # UPDATE 1개당 pk 수 (SQLite 변수 개수 제한)
+
+_lock = threading.Lock()
+_pending = defaultdict(int)  # {(모델, 필드, pk): 증가분}
+_last_flush = time.monotonic()
+
+
+def hit(model, pk, field='views', n=1):
+    with _lock:
+        _pending[model, field, pk] += n
+
+
+def pending(model, pk, field='views'):
+    """아직 DB 에 반영되지 않은 증가분 (이 프로세스 기준)"""
+    return _pending.get((model, field, pk), 0)
+
+
+def flush():
+    """모아 둔 증가분 반영 -> 반영한 행 수. 실패하면 다음 주기에 다시 시도"""
+    global _last_flush
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+        _last_flush = time.monotonic()
+    if not batch:
+        return 0
+    groups = defaultdict(list)  # {(모델, 필드, 증가분): [pk]}
+    for (model, field, pk), n in batch.items():
+        groups[model, field, n].append(pk)
+    try:
+        with transaction.atomic():  # 일부만 반영된 채 재시도하면 중복 -> 전부 아니면 전무
+            for (model, field, n), pks in groups.items():
+                for i in range(0, len(pks), FLUSH_CHUNK):
+                    model._base_manager.filter(pk__in=pks[i:i + FLUSH_CHUNK]).update(**{field: F(field) + n})
+    except DatabaseError:
+        logger.warning("카운터 반영 실패 - 다음 주기에 다시 시도 (%d건)", len(batch), exc_info=True)
+        with _lock:
+            for key, n in batch.items():
+                _pending[key] += n
+        return 0
+    return len(batch)
+
+
+def _flush_if_due(**kwargs):
+    if _pending and time.monotonic() - _last_flush >= settings.HIT_COUNTER_FLUSH_SECONDS:
+        flush()
+
+
+def connect_signals():
+    request_finished.connect(_flush_if_due, dispatch_uid='fulfillment.counters.flush')
+    atexit.register(flush)
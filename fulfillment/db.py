@@ -0,0 +1,60 @@
+"""
+쓰기 트랜잭션 / DB 잠금 오류 재시도
+
+- @write_transaction : atomic() + 잠금 오류(database is locked, deadlock, 직렬화 실패) 시 백오프 후 재시도
+  (SQLite 는 settings 의 transaction_mode=IMMEDIATE 로 BEGIN IMMEDIATE 시작)
+- 뷰에 붙이면 POST 등 쓰기 요청만 감싸고 GET 화면은 그대로
+- 이미 바깥 트랜잭션 안이면 savepoint 로만 감쌈 (실패한 트랜잭션 안에서 재시도해도 소용없으므로 재시도는 바깥에서,
+  예외가 나면 이 함수가 쓴 것만 되돌리므로 호출한 쪽이 예외를 잡아도 반쯤 처리된 데이터가 남지 않음)
+"""
+import logging
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+LOCK_MARKERS = ('database is locked', 'database table is locked', 'deadlock detected', 'could not obtain lock',
+                'lock timeout', 'lock wait timeout', 'could not serialize access')
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+RETRY_BASE_DELAY = 0.05  # 초 - 재시도마다 2배 + 지터
+
+lock_stats = {'retries': 0, 'failures': 0}
+
+
+def is_lock_error(error):
+    """예외 또는 오류 메시지가 잠금 경합인지"""
+    text = str(error).lower()
+    return any(marker in text for marker in LOCK_MARKERS)
+
+
+def write_transaction(func=None, *, attempts=None, using=None):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if args and isinstance(args[0], HttpRequest) and args[0].method in SAFE_METHODS:
+                return func(*args, **kwargs)
+            if transaction.get_connection(using).in_atomic_block:
+                with transaction.atomic(using=using):
+                    return func(*args, **kwargs)
+            tries = attempts or settings.DB_LOCK_RETRIES
+            for attempt in range(1, tries + 1):
+                try:
+                    with transaction.atomic(using=using):
+                        return func(*args, **kwargs)
+                except OperationalError as e:
+                    if not is_lock_error(e):
+                        raise
+                    if attempt >= tries:
+                        lock_stats['failures'] += 1
+                        raise
+                    lock_stats['retries'] += 1
+                    delay = RETRY_BASE_DELAY * 2 ** (attempt - 1) * random.uniform(1, 1.5)
+                    logger.warning("%s: %s - %d/%d 재시도 (%.2fs 후)", func.__qualname__, e, attempt, tries - 1, delay)
+                    time.sleep(delay)
+        return wrapper
+    return decorator(func) if func else decorator
@@ -1,7 +1,13 @@
 from django import forms
-from django.forms import inlineformset_factory
+from django.core.exceptions import ValidationError
+from django.forms import formset_factory, inlineformset_factory, BaseInlineFormSet
+from django.forms.models import InlineForeignKeyField
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.urls import reverse
+from functools import partial
+
+from . import refdata, search
 
 # 모델 전체 임포트
 from .models import (
@@ -20,17 +26,86 @@ class SignUpForm(UserCreationForm):
         for field in self.fields.values():
             field.widget.attrs['class'] = 'form-control'
 
+# --- 기준 데이터 선택지 (refdata 캐시) ---
+class ReferenceChoiceIterator:
+    """ModelChoiceIterator 대체 - DB 대신 캐시된 튜플로 <option> 생성"""
+    def __init__(self, field, loader):
+        self.field = field; self.loader = loader
+    def __iter__(self):
+        if self.field.empty_label is not None:
+            yield ('', self.field.empty_label)
+        for ref in self.loader():
+            yield (ref.id, str(ref))
+    def __len__(self):
+        return len(self.loader()) + (self.field.empty_label is not None)
+    def __bool__(self):
+        return self.field.empty_label is not None or bool(self.loader())
+
+class ReferenceChoicesMixin:
+    """
+    reference_choices = {필드명: 로더} 에 지정한 FK 필드의 선택지를 refdata 캐시로 렌더링.
+    입력값 검증은 기존 queryset 으로 그대로 (선택된 1건만 조회).
+    """
+    reference_choices = {}
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, loader in self.reference_choices.items():
+            field = self.fields[name]
+            field.iterator = partial(ReferenceChoiceIterator, loader=loader)
+            field.widget.choices = field.choices
+
+class TypeaheadSelect(forms.Select):
+    """
+    카탈로그가 큰 선택 상자 - 현재 선택된 값만 <option> 으로 렌더링하고,
+    나머지는 select2 가 data-typeahead-url 검색 API 로 조회 (페이지 크기가 상품 수와 무관)
+    """
+    def __init__(self, kind, url_name, attrs=None):
+        super().__init__(attrs)
+        self.kind = kind; self.url_name = url_name
+        self.objects = None  # 폼셋이 미리 읽어 둔 {id: 객체} (SharedChoicesInlineFormSet)
+
+    def _lookup(self, value):
+        if self.objects is None:
+            return search.get_ref(self.kind, value)
+        try:
+            return self.objects.get(int(value))
+        except (TypeError, ValueError):
+            return None
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-typeahead-url'] = reverse(self.url_name)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        options = [self.create_option(name, '', '---------', not any(value), 0)]
+        for v in value:
+            ref = self._lookup(v) if v else None
+            if ref is None:
+                continue
+            option = self.create_option(name, ref.id, search.result_text(self.kind, ref), True, len(options))
+            # select2 검색 결과와 같은 값을 data-* 로 (수정 화면의 행 계산용)
+            option['attrs'].update({f'data-{key}': val for key, val in search.result_data(self.kind, ref).items()})
+            options.append(option)
+        return [(None, options, 0)]
+
+def _active_locations(): return refdata.locations(active_only=True)
+def _suppliers(): return refdata.partners('SUPPLIER', 'BOTH')
+def _clients(): return refdata.partners('CLIENT', 'BOTH')
+
 # --- 물류 폼 ---
-class InboundForm(forms.ModelForm):
+class InboundForm(ReferenceChoicesMixin, forms.ModelForm):
     product = forms.ModelChoiceField(queryset=Product.objects.all(), widget=forms.Select(attrs={'class': 'form-select search-select'}))
     location = forms.ModelChoiceField(queryset=Location.objects.filter(is_active=True), widget=forms.Select(attrs={'class': 'form-select search-select'}))
     quantity = forms.IntegerField(widget=forms.NumberInput(attrs={'class': 'form-control'}))
     expiry_date = forms.DateField(widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    reference_choices = {'product': refdata.products, 'location': _active_locations}
     class Meta:
         model = Inventory
         fields = ['product', 'location', 'quantity', 'expiry_date']
 
-class InventoryForm(forms.ModelForm):
+class InventoryForm(ReferenceChoicesMixin, forms.ModelForm):
+    reference_choices = {'product': refdata.products, 'location': refdata.locations}
     class Meta:
         model = Inventory
         fields = ['product', 'location', 'quantity', 'expiry_date', 'batch_number']
@@ -130,6 +205,23 @@ class PayrollForm(forms.ModelForm):
             'deduction': forms.NumberInput(attrs={'class': 'form-control'}),
         }
 
+# --- 월 급여 일괄 지급 (posting.run_payroll) ---
+class PayrollRunForm(forms.Form):
+    month_label = forms.RegexField(regex=r'^\d{4}-(0[1-9]|1[0-2])$', label="귀속월", error_messages={'invalid': "YYYY-MM 형식으로 입력하세요."},
+                                   widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'YYYY-MM'}))
+    payment_date = forms.DateField(label="지급일", widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}))
+    payment_account = forms.ModelChoiceField(BankAccount.objects.filter(is_active=True), required=False, label="출금 계좌",
+                                             empty_label="(통장 내역 생성 안 함)", widget=forms.Select(attrs={'class': 'form-select'}))
+
+class PayrollRunRowForm(forms.Form):
+    """직원별 조정값 - 기본급은 직원 정보 그대로"""
+    employee = forms.IntegerField(widget=forms.HiddenInput)
+    bonus = forms.DecimalField(max_digits=12, decimal_places=0, min_value=0, initial=0, widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm text-end'}))
+    leave_pay = forms.DecimalField(max_digits=12, decimal_places=0, min_value=0, initial=0, widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm text-end'}))
+    deduction = forms.DecimalField(max_digits=12, decimal_places=0, min_value=0, initial=0, widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm text-end'}))
+
+PayrollRunFormSet = formset_factory(PayrollRunRowForm, extra=0)
+
 # --- 자금/업무일지 폼 ---
 class BankAccountForm(forms.ModelForm):
     class Meta:
@@ -183,7 +275,141 @@ class PaymentQuickForm(forms.ModelForm):
         self.fields['bank_account'].queryset = BankAccount.objects.filter(is_active=True)
 
 # --- 발주/주문 폼셋 ---
-class PurchaseForm(forms.ModelForm):
+class SharedModelChoiceField(forms.ModelChoiceField):
+    """폼셋이 넣어 준 {키: 객체} 맵(objects)에서 값을 찾는 선택 필드 (행마다 get 쿼리 없음)"""
+    objects = None
+
+    @property
+    def key_field(self):
+        opts = self.queryset.model._meta
+        return opts.get_field(self.to_field_name) if self.to_field_name else opts.pk
+
+    def to_python(self, value):
+        if self.objects is None or value in self.empty_values:
+            return super().to_python(value)
+        try:
+            key = self.key_field.to_python(getattr(value, self.key_field.attname, value))
+        except ValidationError:
+            key = None
+        obj = self.objects.get(key)
+        if obj is None:
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice', params={'value': value})
+        return obj
+
+
+class SharedChoicesModelForm(forms.ModelForm):
+    """
+    SharedChoicesInlineFormSet 의 행 폼 (FK 는 Meta.field_classes 로 SharedModelChoiceField 지정)
+    공유 맵(in_bulk)에서 찾은 FK 는 존재가 확인됐으므로 모델 필드 검증(행별 exists 쿼리)에서만 제외하고,
+    unique / 제약 검사는 FK 를 포함해 그대로 실행
+    """
+    _checking_fields = False
+
+    def _shared_fields(self):
+        return {name for name, field in self.fields.items() if isinstance(field, SharedModelChoiceField) and field.objects is not None}
+
+    def _get_validation_exclusions(self):
+        exclude = super()._get_validation_exclusions()
+        return exclude | self._shared_fields() if self._checking_fields else exclude
+
+    def _post_clean(self):
+        self._checking_fields = True  # full_clean(필드 검증) 동안만 - validate_unique 에서 해제
+        try:
+            super()._post_clean()
+        finally:
+            self._checking_fields = False
+
+    def validate_unique(self):
+        self._checking_fields = False
+        super().validate_unique()
+        # full_clean 에서 건너뛴 제약 중 공유 FK 를 포함하는 것 (인라인 FK 는 Django 와 같이 폼셋 단위 검사)
+        shared = self._shared_fields()
+        exclude = self._get_validation_exclusions() | {name for name, field in self.fields.items() if isinstance(field, InlineForeignKeyField)}
+        errors = {}
+        for model_class, constraints in self.instance.get_constraints():
+            for constraint in constraints:
+                if shared.isdisjoint(getattr(constraint, 'fields', ())):
+                    continue
+                try:
+                    constraint.validate(model_class, self.instance, exclude=exclude)
+                except ValidationError as e:
+                    errors = e.update_error_dict(errors)
+        if errors:
+            self._update_errors(ValidationError(errors))
+
+
+class SharedChoicesInlineFormSet(BaseInlineFormSet):
+    """
+    행마다 같은 선택지 쿼리를 반복하지 않는 폼셋 (행 수와 무관하게 쿼리 수 일정)
+    - 검증: 모든 행에 입력된 id 를 모아 필드별 in_bulk 1회 -> 각 행의 SharedModelChoiceField 가 {id: 객체} 맵에서 조회
+    - 렌더링: 일반 Select 는 선택지를 한 번만 평가해 모든 행이 공유,
+              TypeaheadSelect 는 같은 맵으로 선택된 값의 라벨 표시
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shared_choices = {}
+        self._shared_objects = {}
+
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # 기존 행 pk 필드도 공유 맵에서 조회 (행마다 get 쿼리 방지)
+        name = self.model._meta.pk.name
+        pk = form.fields[name]
+        if type(pk) is forms.ModelChoiceField:
+            form.fields[name] = SharedModelChoiceField(pk.queryset, initial=pk.initial, required=False, widget=pk.widget)
+
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        self._share_fields(form)
+        return form
+
+    @property
+    def empty_form(self):
+        form = super().empty_form
+        self._share_fields(form)
+        return form
+
+    def _share_fields(self, form):
+        for name, field in form.fields.items():
+            if not isinstance(field, SharedModelChoiceField):
+                continue
+            field.objects = _LazyObjects(self, name, field)
+            if isinstance(field.widget, TypeaheadSelect):
+                field.widget.objects = field.objects
+            elif isinstance(field.widget, forms.Select):
+                if name not in self._shared_choices:
+                    self._shared_choices[name] = list(field.choices)
+                field.choices = self._shared_choices[name]
+
+    def _objects(self, name, field):
+        """이 필드에 입력/초기값으로 들어온 모든 값 -> 객체 (쿼리 1회)"""
+        if name not in self._shared_objects:
+            key_field = field.key_field
+            keys = set()
+            for form in self.forms:
+                if self.is_bound:
+                    value = field.widget.value_from_datadict(self.data, self.files, form.add_prefix(name))
+                else:
+                    value = form.initial.get(name)
+                if value in field.empty_values:
+                    continue
+                try:
+                    keys.add(key_field.to_python(getattr(value, key_field.attname, value)))
+                except ValidationError:
+                    pass
+            self._shared_objects[name] = field.queryset.in_bulk(keys, field_name=key_field.name) if keys else {}
+        return self._shared_objects[name]
+
+
+class _LazyObjects:
+    """처음 필요할 때 폼셋 공유 맵을 읽음 (self.forms 생성 중 재귀 방지)"""
+    def __init__(self, formset, name, field):
+        self.formset = formset; self.name = name; self.field = field
+    def get(self, pk):
+        return self.formset._objects(self.name, self.field).get(pk)
+
+class PurchaseForm(ReferenceChoicesMixin, forms.ModelForm):
+    reference_choices = {'supplier': _suppliers}
     class Meta:
         model = Purchase
         fields = ['supplier', 'purchase_date', 'status', 'is_bill_published']
@@ -193,19 +419,21 @@ class PurchaseForm(forms.ModelForm):
             'status': forms.Select(attrs={'class': 'form-select'}),
             'is_bill_published': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
         }
-class PurchaseItemForm(forms.ModelForm):
+class PurchaseItemForm(SharedChoicesModelForm):
     class Meta:
         model = PurchaseItem
         fields = ['product', 'quantity', 'target_location', 'expiry_date']
+        field_classes = {'product': SharedModelChoiceField, 'target_location': SharedModelChoiceField}
         widgets = {
-            'product': forms.Select(attrs={'class': 'form-select product-select'}),
+            'product': TypeaheadSelect('product', 'fulfillment:product_search', attrs={'class': 'form-select product-select'}),
             'quantity': forms.NumberInput(attrs={'class': 'form-control'}),
-            'target_location': forms.Select(attrs={'class': 'form-select'}),
+            'target_location': TypeaheadSelect('location', 'fulfillment:location_search', attrs={'class': 'form-select'}),
             'expiry_date': forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
         }
-PurchaseCreateFormSet = inlineformset_factory(Purchase, PurchaseItem, form=PurchaseItemForm, extra=5, can_delete=True)
+PurchaseCreateFormSet = inlineformset_factory(Purchase, PurchaseItem, form=PurchaseItemForm, formset=SharedChoicesInlineFormSet, extra=5, can_delete=True)
 
-class OrderForm(forms.ModelForm):
+class OrderForm(ReferenceChoicesMixin, forms.ModelForm):
+    reference_choices = {'client': _clients}
     class Meta:
         model = Order
         fields = ['client', 'status', 'memo']
@@ -214,15 +442,16 @@ class OrderForm(forms.ModelForm):
             'status': forms.Select(attrs={'class': 'form-select'}),
             'memo': forms.TextInput(attrs={'class': 'form-control'}),
         }
-class OrderItemForm(forms.ModelForm):
+class OrderItemForm(SharedChoicesModelForm):
     class Meta:
         model = OrderItem
         fields = ['product', 'quantity']
+        field_classes = {'product': SharedModelChoiceField}
         widgets = {
-            'product': forms.Select(attrs={'class': 'form-select product-select', 'onchange': 'updateOrderRow(this)'}),
+            'product': TypeaheadSelect('product', 'fulfillment:product_search', attrs={'class': 'form-select product-select', 'onchange': 'updateOrderRow(this)'}),
             'quantity': forms.NumberInput(attrs={'class': 'form-control quantity-input', 'oninput': 'updateOrderRow(this)'}),
         }
-OrderCreateFormSet = inlineformset_factory(Order, OrderItem, form=OrderItemForm, extra=5, can_delete=True)
+OrderCreateFormSet = inlineformset_factory(Order, OrderItem, form=OrderItemForm, formset=SharedChoicesInlineFormSet, extra=5, can_delete=True)
 
 # --- ★ 추가된 부분: 창고/위치 관리 폼 ---
 class ZoneForm(forms.ModelForm):
@@ -254,4 +483,40 @@ class NoticeForm(forms.ModelForm):
             'content': forms.Textarea(attrs={'class': 'form-control', 'rows': 10, 'placeholder': '내용을 입력하세요'}),
             'file': forms.FileInput(attrs={'class': 'form-control'}),
             'is_important': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
-        }        
\ No newline at end of file
+        }        
+
+# --- 일괄 거래명세서 (주문 목록의 조회 조건을 그대로 받음) ---
+class InvoiceBatchForm(forms.Form):
+    start_date = forms.DateField(required=False, label="시작일")
+    end_date = forms.DateField(required=False, label="종료일")
+    client = forms.IntegerField(required=False, min_value=1, label="납품처")
+    ids = forms.RegexField(regex=r'^[\d,\s]*$', required=False, label="주문번호", error_messages={'invalid': "주문번호는 숫자와 쉼표만 입력하세요."})
+    format = forms.ChoiceField(choices=[('pdf', 'PDF'), ('zip', 'ZIP')], required=False, label="형식")
+
+    def clean(self):
+        data = super().clean()
+        start, end = data.get('start_date'), data.get('end_date')
+        if end and not start:
+            raise forms.ValidationError("종료일을 지정하면 시작일도 지정해야 합니다.")
+        if start and end and start > end:
+            raise forms.ValidationError("시작일이 종료일보다 늦습니다.")
+        data['ids'] = [int(i) for i in (data.get('ids') or '').split(',') if i.strip().isdigit()]
+        data['format'] = data.get('format') or 'pdf'
+        return data
+
+# --- 대량 업로드 (엑셀/CSV) ---
+class DataImportForm(forms.Form):
+    KIND_CHOICES = [('product', '상품'), ('partner', '거래처'), ('inventory', '기초 재고')]
+    kind = forms.ChoiceField(choices=KIND_CHOICES, label="업로드 대상", widget=forms.Select(attrs={'class': 'form-select'}))
+    file = forms.FileField(label="파일 (.xlsx / .csv)", widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.xlsx,.csv'}))
+    dry_run = forms.BooleanField(required=False, label="검증만 하기 (저장 안 함)", widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
+
+class OrderImportForm(forms.Form):
+    file = forms.FileField(label="주문서 파일 (.xlsx / .csv)", widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.xlsx,.csv'}))
+    memo = forms.CharField(required=False, max_length=200, label="메모 (파일에 메모 열이 없을 때)", widget=forms.TextInput(attrs={'class': 'form-control'}))
+    allocate = forms.BooleanField(required=False, label="등록 후 바로 피킹 지시 (재고 할당)", widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
+
+class BankStatementImportForm(forms.Form):
+    file = forms.FileField(label="통장 거래내역 파일 (.xlsx / .csv)", widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.xlsx,.csv'}))
+    window_days = forms.IntegerField(required=False, min_value=0, max_value=31, label="일자 허용 오차 (일, 비우면 기본값)",
+                                     widget=forms.NumberInput(attrs={'class': 'form-control'}))
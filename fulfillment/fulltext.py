@@ -0,0 +1,178 @@
+"""
+공지사항 / 업무일지 전문 검색 (icontains 전체 스캔 대신 역색인)
+
+- SQLite    : FTS5 가상 테이블 (external content) + 원본 테이블 트리거로 동기화 -> bulk_create/update() 도 반영
+              단어 단위 색인 + 접두어 검색 ('재고' -> '재고를', '재고조사'), bm25 순위, snippet() 발췌
+- PostgreSQL: SearchVector 식 GIN 색인 + SearchRank / SearchHeadline (접두어 검색 'term:*')
+- 그 외 DB  : icontains 로 대체 (순위 없음, 최신순)
+- 색인/트리거는 마이그레이션(0006)에서 생성 - INDEXES 의 필드/테이블을 바꾸면 색인을 다시 만드는 마이그레이션 추가
+- search() 결과는 Paginator 에 그대로 넘김 - 현재 페이지만 조회, 객체에 search_rank / search_snippet(강조 HTML) 추가
+"""
+import re
+from typing import NamedTuple
+
+from django.db import connections, router
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Notice, WorkLog
+
+# PostgreSQL 검색 설정 - 한국어 사전이 없으므로 형태소 분석 없이 공백 단위 ('simple')
+PG_CONFIG = 'simple'
+MAX_TERMS = 8
+# 순위를 매기는 최대 일치 건수 (최신순) - 더 많이 일치하면 검색어를 좁혀야 함
+MAX_RESULTS = 1000
+SNIPPET_TOKENS = 24
+# 발췌 강조 구분자 (사용자 글에 없는 사설 영역 문자) -> 이스케이프 후 <mark> 로 바꿈
+MARK_START, MARK_END = '\ue000', '\ue001'
+TERM_RE = re.compile(r'\w+')
+
+
+class FullTextIndex(NamedTuple):
+    model: type
+    fields: tuple
+    weights: tuple        # 필드별 bm25 가중치 (제목 우선 등)
+    related: tuple = ()   # 결과 표시용 select_related
+
+    @property
+    def table(self):
+        return f"{self.model._meta.db_table}_fts"
+
+
+INDEXES = {
+    'notice': FullTextIndex(Notice, ('title', 'content'), (5.0, 1.0), ('author',)),
+    'worklog': FullTextIndex(WorkLog, ('content', 'issues'), (1.0, 1.0), ('employee',)),
+}
+
+
+def terms(query):
+    return [term.lower() for term in TERM_RE.findall(query or '')][:MAX_TERMS]
+
+
+def highlight(raw):
+    if not raw:
+        return ''
+    return mark_safe(escape(raw).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>'))
+
+
+# ---------------------------------------------------------
+# 검색
+# ---------------------------------------------------------
+class SearchResults:
+    """
+    Paginator 용 결과 목록 - count() 와 슬라이스만 지원 (슬라이스할 때 그 페이지만 조회)
+    순위 계산은 일치하는 글 중 최신 MAX_RESULTS 건 안에서만 (흔한 단어로 수십만 건이 일치해도 응답 시간 일정)
+    """
+
+    def __init__(self, index, query, queryset=None):
+        self.index = index
+        self.terms = terms(query)
+        self.queryset = queryset
+        self.db = router.db_for_read(index.model)
+        self.vendor = connections[self.db].vendor
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            if not self.terms:
+                self._count = 0
+            elif self.vendor == 'sqlite':
+                self._count = self._sqlite('SELECT count(*) FROM picked', ())[0][0]
+            else:
+                self._count = self._orm().count()
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        if not self.terms:
+            return []
+        offset = key.start or 0
+        limit = (key.stop if key.stop is not None else self.count()) - offset
+        if limit <= 0:
+            return []
+        if self.vendor == 'sqlite':
+            return self._sqlite_page(offset, limit)
+        results = list(self._orm()[offset:offset + limit])
+        for obj in results:
+            obj.search_snippet = highlight(obj.search_snippet)
+        return results
+
+    def _base(self):
+        queryset = self.queryset if self.queryset is not None else self.index.model._default_manager.all()
+        return queryset.using(self.db).select_related(*self.index.related)
+
+    def _match(self):
+        return ' '.join(f'"{term}"*' for term in self.terms)  # 모든 단어 포함 (접두어 일치)
+
+    def _sqlite(self, tail, params):
+        """
+        picked = 일치하는 최신 MAX_RESULTS 건의 id (FTS 가 rowid 역순으로 읽다가 MAX_RESULTS 에서 멈춤)
+        추가 조건(queryset)은 scope 로 먼저 id 를 모은 뒤 그 id 범위만 FTS 에서 읽음
+        ('+rowid IN' - 그냥 rowid IN 이면 FTS 가 id 마다 MATCH 를 다시 계산해 매우 느림)
+        """
+        table = self.index.table
+        scope, condition, args = '', '', []
+        if self.queryset is not None:
+            sub, sub_params = self.queryset.order_by().values('pk').query.sql_with_params()
+            scope = f"scope(id) AS MATERIALIZED ({sub}), "
+            condition = (" AND +rowid IN (SELECT id FROM scope)"
+                         " AND rowid BETWEEN (SELECT min(id) FROM scope) AND (SELECT max(id) FROM scope)")
+            args += sub_params
+        picked = f"picked AS MATERIALIZED (SELECT rowid AS id FROM {table} WHERE {table} MATCH %s{condition} ORDER BY rowid DESC LIMIT %s)"
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(f"WITH {scope}{picked} {tail}", [*args, self._match(), MAX_RESULTS, *params])
+            return cursor.fetchall()
+
+    def _sqlite_page(self, offset, limit):
+        table = self.index.table
+        # bm25 는 picked 의 id 범위 안에서만 계산 -> 전체 일치 건수가 아니라 MAX_RESULTS 에 비례
+        rows = self._sqlite(
+            f", ranked AS MATERIALIZED (SELECT rowid AS id, bm25({table}, {', '.join(map(str, self.index.weights))}) AS score "
+            f"FROM {table} WHERE {table} MATCH %s AND rowid BETWEEN (SELECT min(id) FROM picked) AND (SELECT max(id) FROM picked)) "
+            f"SELECT ranked.id, ranked.score FROM ranked JOIN picked ON picked.id = ranked.id ORDER BY ranked.score, ranked.id DESC LIMIT %s OFFSET %s",
+            (self._match(), limit, offset))
+        if not rows:
+            return []
+        pks = [pk for pk, _ in rows]
+        with connections[self.db].cursor() as cursor:  # 발췌는 이 페이지 글만
+            cursor.execute(f"SELECT rowid, snippet({table}, -1, %s, %s, '…', {SNIPPET_TOKENS}) FROM {table} "
+                           f"WHERE {table} MATCH %s AND rowid IN ({', '.join(['%s'] * len(pks))})",
+                           [MARK_START, MARK_END, self._match(), *pks])
+            snippets = dict(cursor.fetchall())
+        objects = self._base().in_bulk(pks)
+        results = []
+        for pk, score in rows:
+            if pk in objects:
+                obj = objects[pk]
+                obj.search_rank, obj.search_snippet = -score, highlight(snippets.get(pk))
+                results.append(obj)
+        return results
+
+    def _orm(self):
+        fields = self.index.fields
+        if self.vendor == 'postgresql':
+            from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+            vector = SearchVector(*fields, config=PG_CONFIG)  # GIN 색인과 같은 식
+            query = SearchQuery(' & '.join(f"{term}:*" for term in self.terms), search_type='raw', config=PG_CONFIG)
+            text = Concat(*[part for f in fields for part in (F(f), Value(' '))][:-1])
+            picked = self._base().annotate(search_document=vector).filter(search_document=query).order_by('-pk').values('pk')[:MAX_RESULTS]
+            return (self._base().filter(pk__in=picked)
+                    .annotate(search_rank=SearchRank(vector, query),
+                              search_snippet=SearchHeadline(text, query, config=PG_CONFIG, start_sel=MARK_START, stop_sel=MARK_END,
+                                                            max_words=SNIPPET_TOKENS, min_words=SNIPPET_TOKENS // 2))
+                    .order_by('-search_rank', '-pk'))
+        condition = Q()
+        for term in self.terms:
+            condition &= Q(*[Q(**{f"{f}__icontains": term}) for f in fields], _connector=Q.OR)
+        return self._base().filter(condition).annotate(search_snippet=Value('')).order_by('-pk')
+
+
+def search(kind, query, queryset=None):
+    """kind: 'notice' / 'worklog', queryset: 추가 조건 (예: 날짜) -> SearchResults"""
+    return SearchResults(INDEXES[kind], query, queryset)
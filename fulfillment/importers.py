@@ -0,0 +1,466 @@
+"""
+대량 업로드 (엑셀/CSV) - 상품, 거래처, 기초 재고
+
+파일을 한 줄씩 스트리밍으로 읽어 CHUNK 단위로 검증/조회/저장하므로
+파일 크기와 관계없이 메모리 사용량이 일정합니다.
+"""
+import codecs
+import csv
+import zipfile
+import zlib
+from datetime import timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
+
+from .db import write_transaction
+from .models import Product, Partner, Inventory, Location, Order, OrderItem
+from .utils import get_openpyxl
+from .versions import mark_changed
+
+IMPORT_CHUNK_SIZE = 1000
+# 화면/메모리에 보관할 최대 오류 행 수 (초과분은 개수만 집계)
+MAX_REPORTED_ERRORS = 1000
+# CSV 인코딩 판별에 쓰는 앞부분 크기
+ENCODING_PROBE_SIZE = 64 * 1024
+
+
+class TableReadError(ValueError):
+    """파일 자체를 읽을 수 없음 (인코딩, 손상된 엑셀 등) - row_no: 읽기가 멈춘 행"""
+
+    def __init__(self, row_no, message):
+        super().__init__(message)
+        self.row_no = row_no
+
+
+def _xlsx_rows(file):
+    openpyxl = get_openpyxl()
+    from openpyxl.utils.exceptions import InvalidFileException
+    try:
+        wb = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, InvalidFileException, KeyError, OSError) as e:
+        raise TableReadError(1, "엑셀 파일을 열 수 없습니다 (손상되었거나 .xlsx 형식이 아님)") from e
+    try:
+        yield from wb.active.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def _csv_rows(file):
+    # 앞부분이 UTF-8 로 풀리지 않으면 CP949 (한글 엑셀의 'CSV' 기본 저장 형식)
+    head = file.read(ENCODING_PROBE_SIZE)
+    file.seek(0)
+    try:
+        codecs.getincrementaldecoder('utf-8-sig')().decode(head)  # final=False : 잘린 마지막 글자는 허용
+        encoding = 'utf-8-sig'
+    except UnicodeDecodeError:
+        encoding = 'cp949'
+    yield from csv.reader(codecs.iterdecode(file, encoding))
+
+
+def read_table(file, filename):
+    """
+    업로드 파일을 행(tuple) 단위로 스트리밍 (첫 행 = 헤더)
+    - .xlsx : openpyxl read_only 모드 (시트 전체를 메모리에 올리지 않음)
+    - 그 외 : CSV (UTF-8, BOM 허용 / 아니면 CP949)
+    파일을 읽을 수 없으면 TableReadError (iter_rows() 가 결과 오류로 기록)
+    """
+    rows = _xlsx_rows(file) if filename.lower().endswith(('.xlsx', '.xlsm')) else _csv_rows(file)
+    row_no = 0
+    try:
+        for row_no, values in enumerate(rows, start=1):
+            yield values
+    except UnicodeDecodeError as e:
+        raise TableReadError(row_no + 1, f"문자 인코딩을 읽을 수 없습니다 ({e.encoding}) - UTF-8 또는 CP949 CSV 로 저장하세요") from e
+    except csv.Error as e:
+        raise TableReadError(row_no + 1, f"CSV 형식 오류: {e}") from e
+    except (zipfile.BadZipFile, zlib.error) as e:
+        raise TableReadError(row_no + 1, "엑셀 파일이 손상되었습니다") from e
+
+
+def iter_rows(table, result):
+    """read_table() -> (행 번호, 값) 스트림. 파일 읽기 오류는 멈춘 행 번호로 result 에 기록하고 끝냄"""
+    try:
+        yield from enumerate(table, start=1)
+    except TableReadError as e:
+        result.add_error(e.row_no, e)
+
+
+def _as_text(value):
+    """엑셀 숫자 셀(예: SKU 1001.0)을 문자열로"""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+class ImportResult:
+    def __init__(self, max_errors=MAX_REPORTED_ERRORS):
+        self.valid = 0  # 검증/조회를 통과한 행 (검증만 하기에서도 집계)
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []  # [(행 번호, 메시지)]
+        self.max_errors = max_errors
+
+    def add_error(self, row_no, message):
+        if isinstance(message, ValidationError):
+            message = "; ".join(message.messages)
+        self.error_count += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append((row_no, str(message)))
+
+    @property
+    def ok(self):
+        return self.error_count == 0
+
+
+class BaseImporter:
+    """헤더 매핑 -> 행 검증 -> 청크 단위 일괄 조회(resolve) -> 일괄 저장(save)"""
+    model = None
+    fields = ()
+    required = ()
+    aliases = {}  # 추가 헤더 별칭 -> 필드명
+
+    def __init__(self, chunk_size=IMPORT_CHUNK_SIZE, dry_run=False, max_errors=MAX_REPORTED_ERRORS):
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.result = ImportResult(max_errors)
+        self.model_fields = {name: self.model._meta.get_field(name) for name in self.fields}
+        self.choice_maps = {
+            name: self._choice_map(field) for name, field in self.model_fields.items() if field.choices
+        }
+
+    @staticmethod
+    def _choice_map(field):
+        # 코드값('SEAFOOD') / 표시명('수산물') 모두 허용
+        mapping = {}
+        for value, label in field.flatchoices:
+            for key in (value, str(label)):
+                mapping[str(key).strip().lower()] = value
+        return mapping
+
+    def header_map(self):
+        mapping = {}
+        for name, field in self.model_fields.items():
+            mapping[name.lower()] = name
+            mapping[str(field.verbose_name).strip().lower()] = name
+        mapping.update({alias.lower(): name for alias, name in self.aliases.items()})
+        return mapping
+
+    def clean_value(self, name, raw):
+        field = self.model_fields[name]
+        if raw is None or (isinstance(raw, str) and not raw.strip()):
+            if name in self.required:
+                raise ValidationError(f"{name}: 필수 항목입니다.")
+            if field.has_default():
+                return field.to_python(field.get_default())
+            return None if field.null else ''
+        if name in self.choice_maps:
+            value = self.choice_maps[name].get(_as_text(raw).lower())
+            if value is None:
+                raise ValidationError(f"{name}: 허용되지 않는 값 '{raw}'")
+            return value
+        if isinstance(field, (models.CharField, models.TextField)):
+            raw = _as_text(raw)
+        elif isinstance(raw, str):
+            raw = raw.strip().replace(',', '') if isinstance(field, (models.DecimalField, models.IntegerField)) else raw.strip()
+        try:
+            return field.clean(raw, None)
+        except ValidationError as e:
+            raise ValidationError(f"{name}: {'; '.join(e.messages)}")
+
+    def clean_row(self, row):
+        data = {}; errors = []
+        for name in self.columns:
+            try:
+                data[name] = self.clean_value(name, row.get(name))
+            except ValidationError as e:
+                errors.extend(e.messages)
+        if errors:
+            raise ValidationError(errors)
+        return data
+
+    def resolve(self, rows):
+        """청크 단위 DB 조회 (하위 클래스에서 키 -> id 매핑). 문제 행은 제외하고 반환"""
+        return rows
+
+    def save(self, rows):
+        raise NotImplementedError
+
+    def run(self, table):
+        """table: read_table() 결과 (첫 행 헤더)"""
+        rows = iter_rows(table, self.result)
+        _, header = next(rows, (1, None))
+        if header is None:
+            if self.result.ok:
+                self.result.add_error(1, "빈 파일입니다.")
+            return self.result
+        mapping = self.header_map()
+        index = {}
+        for i, title in enumerate(header):
+            name = mapping.get(_as_text(title).lower()) if title is not None else None
+            if name and name not in index:
+                index[name] = i
+        missing = [name for name in self.required if name not in index]
+        if missing:
+            self.result.add_error(1, f"필수 열이 없습니다: {', '.join(missing)}")
+            return self.result
+        self.columns = list(index)
+
+        chunk = []
+        for row_no, values in rows:
+            if not any(v not in (None, '') for v in values):
+                continue
+            chunk.append((row_no, {name: values[i] if i < len(values) else None for name, i in index.items()}))
+            if len(chunk) >= self.chunk_size:
+                self._process(chunk); chunk = []
+        if chunk:
+            self._process(chunk)
+        return self.result
+
+    def _process(self, chunk):
+        cleaned = []
+        for row_no, raw in chunk:
+            try:
+                cleaned.append((row_no, self.clean_row(raw)))
+            except ValidationError as e:
+                self.result.add_error(row_no, e)
+        cleaned = self.resolve(cleaned)
+        self.result.valid += len(cleaned)
+        if not cleaned or self.dry_run:
+            return
+        try:
+            with transaction.atomic():
+                self.save(cleaned)
+                mark_changed(self.model)  # bulk 저장은 signal 이 없음
+        except (DatabaseError, ValidationError) as e:
+            for row_no, _ in cleaned:
+                self.result.add_error(row_no, f"저장 실패: {e}")
+
+
+class ProductImporter(BaseImporter):
+    """상품: SKU 기준 upsert (bulk_create update_conflicts)"""
+    model = Product
+    fields = ('sku', 'name', 'category', 'storage_type', 'unit', 'purchase_price', 'price', 'shelf_life_days', 'is_taxable')
+    required = ('sku', 'name', 'storage_type', 'price')
+    aliases = {'상품코드': 'sku', '상품명': 'name', '판매가': 'price', '매입가': 'purchase_price', '단위': 'unit'}
+
+    def resolve(self, rows):
+        # 같은 청크 안의 중복 SKU는 마지막 행 기준 (ON CONFLICT는 한 행을 두 번 갱신할 수 없음)
+        latest = {}
+        for row_no, data in rows:
+            latest[data['sku']] = (row_no, data)
+        self.existing = set(Product.objects.filter(sku__in=latest).values_list('sku', flat=True))
+        return list(latest.values())
+
+    def save(self, rows):
+        update_fields = [name for name in self.columns if name != 'sku']
+        Product.objects.bulk_create(
+            [Product(**data) for _, data in rows],
+            update_conflicts=True, unique_fields=['sku'], update_fields=update_fields,
+        )
+        updated = sum(1 for _, data in rows if data['sku'] in self.existing)
+        self.result.updated += updated
+        self.result.created += len(rows) - updated
+
+
+class PartnerImporter(BaseImporter):
+    """거래처: 상호명 기준 (기존 -> bulk_update, 신규 -> bulk_create)"""
+    model = Partner
+    fields = ('name', 'partner_type', 'biz_number', 'owner_name', 'phone', 'address',
+              'contact_person', 'contact_phone', 'initial_balance', 'email')
+    required = ('name', 'partner_type')
+    aliases = {'거래처명': 'name', '유형': 'partner_type'}
+
+    def resolve(self, rows):
+        latest = {}
+        for row_no, data in rows:
+            latest[data['name']] = (row_no, data)
+        # 상호명에 unique 제약이 없으므로 같은 이름이 여러 건이면 어느 쪽을 갱신할지 알 수 없음
+        ids = {}; duplicated = set()
+        for name, pk in Partner.objects.filter(name__in=latest).values_list('name', 'id'):
+            if name in ids:
+                duplicated.add(name)
+            ids[name] = pk
+        resolved = []
+        for name, (row_no, data) in latest.items():
+            if name in duplicated:
+                self.result.add_error(row_no, f"name: 같은 상호명의 거래처가 여러 건입니다 ('{name}')")
+                continue
+            data['id'] = ids.get(name)
+            resolved.append((row_no, data))
+        return resolved
+
+    def save(self, rows):
+        new = [Partner(**data) for _, data in rows if data['id'] is None]
+        existing = [Partner(**data) for _, data in rows if data['id'] is not None]
+        Partner.objects.bulk_create(new)
+        update_fields = [name for name in self.columns if name != 'name']
+        if existing and update_fields:
+            Partner.objects.bulk_update(existing, update_fields)
+        self.result.created += len(new)
+        self.result.updated += len(existing)
+
+
+class InventoryImporter(BaseImporter):
+    """기초 재고: SKU / 위치코드를 청크당 1회 조회하여 재고 로트 일괄 생성"""
+    model = Inventory
+    fields = ('product', 'location', 'quantity', 'batch_number', 'received_date', 'expiry_date')
+    required = ('product', 'location', 'quantity')
+    aliases = {'sku': 'product', '상품코드': 'product', '위치': 'location', '위치코드': 'location',
+               '수량': 'quantity', '유통기한': 'expiry_date', '입고일': 'received_date', '로트번호': 'batch_number'}
+
+    def clean_value(self, name, raw):
+        if name in ('product', 'location'):
+            if raw is None or not _as_text(raw):
+                raise ValidationError(f"{name}: 필수 항목입니다.")
+            return _as_text(raw)  # SKU / 위치코드 (resolve 단계에서 id로 변환)
+        return super().clean_value(name, raw)
+
+    def resolve(self, rows):
+        skus = {data['product'] for _, data in rows}
+        codes = {data['location'] for _, data in rows}
+        products = {sku: (pk, shelf) for sku, pk, shelf in
+                    Product.objects.filter(sku__in=skus).values_list('sku', 'id', 'shelf_life_days')}
+        locations = dict(Location.objects.filter(code__in=codes).values_list('code', 'id'))
+        today = timezone.now().date()
+        resolved = []
+        for row_no, data in rows:
+            sku = data.pop('product'); code = data.pop('location')
+            if sku not in products:
+                self.result.add_error(row_no, f"product: 등록되지 않은 SKU '{sku}'"); continue
+            if code not in locations:
+                self.result.add_error(row_no, f"location: 등록되지 않은 위치 '{code}'"); continue
+            product_id, shelf_life = products[sku]
+            data['product_id'] = product_id
+            data['location_id'] = locations[code]
+            data['received_date'] = data.get('received_date') or today
+            data['expiry_date'] = data.get('expiry_date') or data['received_date'] + timedelta(days=shelf_life)
+            data['batch_number'] = data.get('batch_number') or f"OPEN-{data['received_date'].strftime('%Y%m%d')}-{sku}"
+            resolved.append((row_no, data))
+        return resolved
+
+    def save(self, rows):
+        Inventory.objects.bulk_create([Inventory(**data) for _, data in rows])
+        self.result.created += len(rows)
+
+
+IMPORTERS = {
+    'product': ('상품', ProductImporter),
+    'partner': ('거래처', PartnerImporter),
+    'inventory': ('기초 재고', InventoryImporter),
+}
+
+
+def run_import(kind, file, filename, **options):
+    """kind: 'product' | 'partner' | 'inventory' -> ImportResult"""
+    importer = IMPORTERS[kind][1](**options)
+    return importer.run(read_table(file, filename))
+
+
+# ---------------------------------------------------------
+#  거래처 주문서 업로드 (client, SKU, quantity)
+# ---------------------------------------------------------
+ORDER_COLUMNS = {
+    'client': 'client', '거래처': 'client', '납품처': 'client', '상호명': 'client',
+    'sku': 'sku', '상품코드': 'sku',
+    'quantity': 'quantity', 'qty': 'quantity', '수량': 'quantity',
+    'memo': 'memo', '메모': 'memo',
+}
+
+
+def _cell(values, index, name):
+    i = index.get(name)
+    return values[i] if i is not None and i < len(values) else None
+
+
+def import_orders(file, filename, memo=None):
+    """
+    주문서 파일을 읽어 거래처별 주문 1건씩 생성 -> (ImportResult, [생성된 주문])
+    거래처/상품은 각각 1회 조회, 합계는 메모리에서 계산하고 주문/품목은 bulk insert 합니다.
+    한 행이라도 오류가 있으면 아무것도 저장하지 않습니다 (부분 주문 방지).
+    """
+    result = ImportResult()
+    rows = iter_rows(read_table(file, filename), result)
+    _, header = next(rows, (1, None))
+    if not result.ok:
+        return result, []
+    index = {}
+    for i, title in enumerate(header or ()):
+        name = ORDER_COLUMNS.get(_as_text(title).lower()) if title is not None else None
+        if name and name not in index:
+            index[name] = i
+    missing = [name for name in ('client', 'sku', 'quantity') if name not in index]
+    if missing:
+        result.add_error(1, f"필수 열이 없습니다: {', '.join(missing)}")
+        return result, []
+
+    # 1. 스트리밍 파싱 (행 -> 가벼운 tuple)
+    lines = []
+    for row_no, values in rows:
+        if not any(v not in (None, '') for v in values):
+            continue
+        client = _as_text(_cell(values, index, 'client') or ''); sku = _as_text(_cell(values, index, 'sku') or '')
+        raw_qty = _cell(values, index, 'quantity')
+        try:
+            number = float(str(raw_qty).replace(',', ''))
+        except (TypeError, ValueError):
+            number = 0.0
+        quantity = int(number) if number.is_integer() else 0  # 2.5 -> 2 로 자르지 않고 오류 ('2', 2.0, '1,000' 은 허용)
+        if not client or not sku:
+            result.add_error(row_no, "거래처와 SKU는 필수입니다."); continue
+        if quantity <= 0:
+            result.add_error(row_no, f"quantity: 1 이상의 정수여야 합니다 ('{raw_qty}')"); continue
+        lines.append((row_no, client, sku, quantity, _as_text(_cell(values, index, 'memo') or '')))
+
+    # 2. 거래처 / 상품 일괄 조회 (각 1회)
+    clients = {}
+    for pk, name in Partner.objects.filter(
+        partner_type__in=['CLIENT', 'BOTH'], name__in={line[1] for line in lines}
+    ).order_by('id').values_list('id', 'name'):
+        clients.setdefault(name, pk)
+    products = {sku: (pk, price, cost) for pk, sku, price, cost in Product.objects.filter(
+        sku__in={line[2] for line in lines}
+    ).values_list('id', 'sku', 'price', 'purchase_price')}
+    for row_no, client, sku, _, _ in lines:
+        if client not in clients:
+            result.add_error(row_no, f"client: 등록되지 않은 매출처 '{client}'")
+        if sku not in products:
+            result.add_error(row_no, f"sku: 등록되지 않은 SKU '{sku}'")
+        if client in clients and sku in products:
+            result.valid += 1
+    if not result.ok or not lines:
+        result.errors.sort(key=lambda e: e[0])
+        return result, []
+
+    # 3. 거래처별 주문 합계 (order_create 와 같은 규칙: 판매가 x 수량, 원가는 주문 시점 매입가로 고정)
+    grouped = {}
+    for _, client, sku, quantity, line_memo in lines:
+        order = grouped.setdefault(client, {'items': [], 'revenue': 0, 'cogs': 0, 'memo': line_memo or memo})
+        product_id, price, cost = products[sku]
+        order['items'].append((product_id, quantity, cost, quantity * price))
+        order['revenue'] += quantity * price
+        order['cogs'] += quantity * cost
+
+    # 4. 한 트랜잭션에서 주문 -> 품목 bulk insert
+    orders = _save_orders(grouped, clients)
+    result.created = len(orders)
+    return result, orders
+
+
+@write_transaction
+def _save_orders(grouped, clients):
+    """거래처별 주문/품목 bulk insert (잠금 오류 시 파일을 다시 읽지 않고 이 단계만 재시도)"""
+    orders = Order.objects.bulk_create([
+        Order(client_id=clients[client], status='PENDING', memo=data['memo'] or None,
+              total_revenue=data['revenue'], total_cogs=data['cogs'])
+        for client, data in grouped.items()
+    ])
+    OrderItem.objects.bulk_create([
+        OrderItem(order=order, product_id=product_id, quantity=quantity, cost_price=cost, final_amount=amount)
+        for order, data in zip(orders, grouped.values())
+        for product_id, quantity, cost, amount in data['items']
+    ])
+    mark_changed(Order, OrderItem)
+    return orders
@@ -0,0 +1,306 @@
+"""
+쓰기 경로 부하 테스트 (manage.py load_test)
+
+- 프로세스 N개가 동시에 주문 등록 / 피킹 지시 / 출고 계량 / 입금 등록 / 대시보드 조회를 비율대로 반복
+- 대상: 실행 중인 서버(--url, urllib + 세션 로그인) 또는 같은 설정의 WSGI 앱(프로세스마다 테스트 클라이언트)
+- 결과: 작업별 p50/p95/p99 지연, 처리량, 오류율, 잠금 오류(database is locked 등) 비율
+- 실행 전후 DB 비교로 초과 할당(같은 주문 이중 피킹) / 재고 음수 / 차감 누락(lost update) 검사
+- 대상 DB 에 실제로 주문/입금이 쌓이므로 개발/테스트 DB 에서만 사용
+"""
+import json
+import math
+import multiprocessing
+import random
+import re
+import time
+from collections import defaultdict
+from datetime import date
+from http.cookiejar import CookieJar
+from urllib import request as urlrequest
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+
+from django.urls import reverse
+
+from .db import is_lock_error
+
+DEFAULT_MIX = {'order_create': 35, 'order_allocate': 20, 'process_weight': 15, 'partner_payment_create': 10, 'dashboard': 20}
+WEIGHT_FIELD = re.compile(r'name="weight_(\d+)"')
+CSRF_FIELD = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+STARTUP_TIMEOUT = 300  # 워커 django.setup() + 로그인 대기 (초)
+
+
+def parse_mix(text):
+    """'order_create=40,dashboard=60' -> {작업: 비중}"""
+    if not text:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"알 수 없는 작업: {name} (가능: {', '.join(DEFAULT_MIX)})")
+        mix[name.strip()] = int(weight or 1)
+    return mix
+
+
+def percentile(sorted_values, p):
+    """nearest-rank 백분위수"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, math.ceil(p / 100 * len(sorted_values)) - 1))]
+
+
+# ---------------------------------------------------------
+#  전송 계층 (HTTP 서버 / 프로세스 내 WSGI)
+# ---------------------------------------------------------
+class _NoRedirect(urlrequest.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    """실행 중인 서버 - 로그인 폼으로 세션을 받고 CSRF 쿠키를 헤더로 전달"""
+    def __init__(self, base_url, username, password, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = urlrequest.build_opener(urlrequest.HTTPCookieProcessor(self.cookies), _NoRedirect)
+        _, body = self.request('get', reverse('login'))
+        match = CSRF_FIELD.search(body)
+        status, _ = self.request('post', reverse('login'), {
+            'username': username, 'password': password, 'csrfmiddlewaretoken': match.group(1) if match else '',
+        })
+        if status != 302:
+            raise RuntimeError(f"{self.base_url} 로그인 실패 ({status})")
+
+    def csrf_token(self):
+        return next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+
+    def request(self, method, path, data=None):
+        url = self.base_url + path
+        body = None
+        headers = {}
+        if method == 'post':
+            body = urlencode(data or {}, doseq=True).encode()
+            headers = {'X-CSRFToken': self.csrf_token(), 'Referer': url,
+                       'Content-Type': 'application/x-www-form-urlencoded'}
+        elif data:
+            url += '?' + urlencode(data)
+        try:
+            with self.opener.open(urlrequest.Request(url, body, headers), timeout=self.timeout) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except HTTPError as e:  # 3xx(리다이렉트 미추적) / 4xx / 5xx
+            return e.code, e.read().decode('utf-8', 'replace')
+
+
+class WsgiTransport:
+    """같은 설정의 Django 앱을 프로세스 안에서 직접 호출 (서버 없이 DB 경합만 측정)"""
+    def __init__(self, username):
+        from django.contrib.auth.models import User
+        from django.test import Client
+        self.client = Client(raise_request_exception=False)
+        self.client.force_login(User.objects.get(username=username))
+
+    def request(self, method, path, data=None):
+        response = getattr(self.client, method)(path, data or {})
+        if response.status_code >= 500 and getattr(response, 'exc_info', None):
+            return response.status_code, f"{response.exc_info[0].__name__}: {response.exc_info[1]}"
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response.status_code, body.decode('utf-8', 'replace')
+
+
+# ---------------------------------------------------------
+#  작업 (가상 사용자)
+# ---------------------------------------------------------
+class VirtualUser:
+    """대상 id 는 JSON API (세션 인증) 로 주기적으로 갱신 (워커는 django.setup() 후 생성 - reverse 사용 가능)"""
+    def __init__(self, transport, rng, refresh_every=50):
+        self.http = transport
+        self.rng = rng
+        self.refresh_every = refresh_every
+        self.done = 0
+        self.refresh()
+
+    def ids(self, path, field='id', **params):
+        status, body = self.http.request('get', path, {'fields': field, 'page_size': 1000, **params})
+        if status != 200:
+            raise RuntimeError(f"{path} 조회 실패 ({status})")
+        return sorted({row[field] for row in json.loads(body)['results']})
+
+    def refresh(self):
+        self.clients = self.ids(reverse('fulfillment:api_partner_balances'), partner_type='CLIENT')
+        self.products = self.ids(reverse('fulfillment:api_inventory'), 'product_id')  # 재고가 있는 상품
+        self.pending = self.ids(reverse('fulfillment:api_orders'), status='PENDING')
+        self.allocated = self.ids(reverse('fulfillment:api_orders'), status='ALLOCATED')
+        if not self.clients or not self.products:
+            raise RuntimeError("매출처/재고가 없습니다. 먼저 manage.py setup_data 로 데이터를 만드세요.")
+
+    def run(self, op):
+        if self.done and self.done % self.refresh_every == 0:
+            self.refresh()
+        self.done += 1
+        return getattr(self, op)()
+
+    def order_create(self):
+        products = self.rng.sample(self.products, min(len(self.products), self.rng.randint(1, 5)))
+        data = {'client': self.rng.choice(self.clients), 'status': 'PENDING', 'memo': 'load test',
+                'items-TOTAL_FORMS': len(products), 'items-INITIAL_FORMS': 0,
+                'items-MIN_NUM_FORMS': 0, 'items-MAX_NUM_FORMS': 1000}
+        for i, product in enumerate(products):
+            data[f'items-{i}-product'] = product
+            data[f'items-{i}-quantity'] = self.rng.randint(1, 20)
+        return self.http.request('post', reverse('fulfillment:order_create'), data)
+
+    def order_allocate(self):
+        if not self.pending:
+            return None
+        return self.http.request('get', reverse('fulfillment:order_allocate', args=[self.rng.choice(self.pending)]))
+
+    def process_weight(self):
+        if not self.allocated:
+            return None
+        path = reverse('fulfillment:process_weight', args=[self.rng.choice(self.allocated)])
+        status, body = self.http.request('get', path)
+        if status != 200:
+            return status, body
+        weights = {f'weight_{pk}': round(self.rng.uniform(0.5, 20), 2) for pk in WEIGHT_FIELD.findall(body)}
+        return self.http.request('post', path, weights)
+
+    def partner_payment_create(self):
+        return self.http.request('post', reverse('fulfillment:partner_payment_create', args=[self.rng.choice(self.clients)]), {
+            'date': date.today().isoformat(), 'payment_type': 'INBOUND', 'method': 'CASH',
+            'amount': self.rng.randrange(10, 500) * 10_000, 'memo': 'load test',
+        })
+
+    def dashboard(self):
+        return self.http.request('get', reverse('fulfillment:dashboard'))
+
+
+def worker(index, options, barrier, results):
+    """자식 프로세스 (spawn) - [(작업, 결과, ms, 오류 메시지)] 를 results 큐로 반환"""
+    rng = random.Random(options['seed'] * 1000 + index)
+    samples = []
+    try:
+        import django
+        django.setup()
+        if options['url']:
+            transport = HttpTransport(options['url'], options['username'], options['password'])
+        else:
+            transport = WsgiTransport(options['username'])
+        user = VirtualUser(transport, rng)
+    except Exception as e:
+        barrier.wait()
+        results.put((index, samples, f"{type(e).__name__}: {e}"))
+        return
+    ops, weights = zip(*options['mix'].items())
+    barrier.wait()
+    deadline = time.perf_counter() + options['duration']
+    while time.perf_counter() < deadline and (not options['requests'] or len(samples) < options['requests']):
+        op = rng.choices(ops, weights)[0]
+        started = time.perf_counter()
+        try:
+            outcome = user.run(op)
+        except Exception as e:  # 연결 끊김 등 - 오류로 집계하고 계속
+            outcome = (599, f"{type(e).__name__}: {e}")
+        elapsed = (time.perf_counter() - started) * 1000
+        if outcome is None:  # 대상 주문 없음
+            continue
+        status, body = outcome
+        result = 'ok' if status < 400 else 'lock' if is_lock_error(body) else 'error'
+        samples.append((op, result, elapsed, None if result == 'ok' else f"{status} {body[:200]}"))
+        if options['think_ms']:
+            time.sleep(rng.uniform(0, 2 * options['think_ms']) / 1000)
+    results.put((index, samples, None))
+
+
+# ---------------------------------------------------------
+#  실행 / 집계
+# ---------------------------------------------------------
+def run(options):
+    """options: url, username, password, concurrency, duration, requests, mix, seed, think_ms"""
+    context = multiprocessing.get_context('spawn')  # 부모의 DB 연결을 물려받지 않도록
+    barrier = context.Barrier(options['concurrency'] + 1)
+    results = context.Queue()
+    processes = [context.Process(target=worker, args=(i, options, barrier, results), daemon=True)
+                 for i in range(options['concurrency'])]
+    for process in processes:
+        process.start()
+    barrier.wait(timeout=STARTUP_TIMEOUT)
+    started = time.perf_counter()
+    collected = [results.get() for _ in processes]
+    wall = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    failures = [message for _, _, message in collected if message]
+    samples = [sample for _, worker_samples, _ in collected for sample in worker_samples]
+    return summarize(samples, wall, failures)
+
+
+def summarize(samples, wall, failures=()):
+    by_op = defaultdict(list)
+    for sample in samples:
+        by_op[sample[0]].append(sample)
+        by_op['total'].append(sample)
+    ops = {}
+    for op, rows in sorted(by_op.items()):
+        latencies = sorted(ms for _, _, ms, _ in rows)
+        counts = {key: sum(1 for _, result, _, _ in rows if result == key) for key in ('ok', 'error', 'lock')}
+        ops[op] = {
+            'count': len(rows), **counts,
+            'error_rate': round((counts['error'] + counts['lock']) / len(rows), 4),
+            'lock_rate': round(counts['lock'] / len(rows), 4),
+            'throughput': round(len(rows) / wall, 2) if wall else None,
+            **{f'p{p}_ms': round(percentile(latencies, p), 1) for p in (50, 95, 99)},
+        }
+    errors = defaultdict(int)
+    for _, result, _, message in samples:
+        if message:
+            errors[message.splitlines()[0][:120]] += 1
+    return {
+        'wall_seconds': round(wall, 2), 'ops': ops, 'worker_failures': list(failures),
+        'top_errors': sorted(errors.items(), key=lambda item: -item[1])[:10],
+    }
+
+
+def snapshot():
+    """실행 전 상태 (검사 기준점)"""
+    from .models import Inventory, Order, PickingList
+    return {
+        'max_order': Order.objects.order_by('-id').values_list('id', flat=True).first() or 0,
+        'max_picking': PickingList.objects.order_by('-id').values_list('id', flat=True).first() or 0,
+        'stock': dict(Inventory.objects.values_list('id', 'quantity')),
+    }
+
+
+def check_integrity(before):
+    """
+    실행 후 검사
+    - over_allocated : 주문 품목 수량보다 많이 피킹된 (주문, 상품) - 같은 주문 동시 피킹 지시
+    - negative_stock : 수량이 음수인 재고 로트
+    - lost_updates   : (이전 수량 - 현재 수량) != 이번에 생성된 피킹 수량 합 인 로트 - 차감 경합 누락
+    """
+    from django.db.models import Sum
+    from .models import Inventory, Order, OrderItem, PickingList
+
+    new_picks = PickingList.objects.filter(id__gt=before['max_picking'])
+    touched_orders = set(new_picks.values_list('order_id', flat=True))
+    picked = defaultdict(int)
+    for order_id, product_id, qty in (PickingList.objects.filter(order_id__in=touched_orders).order_by()
+                                      .values_list('order_id', 'inventory__product_id').annotate(s=Sum('allocated_qty'))):
+        picked[order_id, product_id] += qty
+    ordered = defaultdict(int)
+    for order_id, product_id, qty in (OrderItem.objects.filter(order_id__in=touched_orders).order_by()
+                                      .values_list('order_id', 'product_id').annotate(s=Sum('quantity'))):
+        ordered[order_id, product_id] += qty
+    over_allocated = sorted(key for key, qty in picked.items() if qty > ordered.get(key, 0))
+
+    taken = dict(new_picks.order_by().values_list('inventory_id').annotate(s=Sum('allocated_qty')))
+    current = dict(Inventory.objects.filter(id__in=taken).values_list('id', 'quantity'))
+    lost = sorted(pk for pk, qty in taken.items() if pk in before['stock'] and before['stock'][pk] - current.get(pk, 0) != qty)
+    return {
+        'orders_created': Order.objects.filter(id__gt=before['max_order']).count(),
+        'over_allocated': len(over_allocated), 'over_allocated_sample': over_allocated[:10],
+        'negative_stock': Inventory.objects.filter(quantity__lt=0).count(),
+        'lost_updates': len(lost), 'lost_updates_sample': lost[:10],
+    }
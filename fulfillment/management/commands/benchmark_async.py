@@ -0,0 +1,124 @@
+import importlib.util
+import json
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from fulfillment import loadtest, reports
+
+# (동기 뷰, 비동기 뷰)
+PAIRS = [('fulfillment:dashboard', 'fulfillment:dashboard_async'),
+         ('fulfillment:monthly_report', 'fulfillment:monthly_report_async')]
+SERVERS = {
+    'uvicorn': lambda port: ['-m', 'uvicorn', 'config.asgi:application', '--port', str(port), '--log-level', 'warning'],
+    'daphne': lambda port: ['-m', 'daphne', '-p', str(port), 'config.asgi:application'],
+}
+
+
+class Command(BaseCommand):
+    help = ("ASGI 서버(uvicorn/daphne)를 띄워 대시보드/월간 보고서의 동기 뷰와 비동기 뷰(집계 동시 실행) 지연을 비교합니다. "
+            "PostgreSQL 에서만 집계가 겹쳐 실행되고, SQLite 는 순서대로 실행됩니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="이미 실행 중인 ASGI 서버 주소 (생략 시 --server 로 직접 실행)")
+        parser.add_argument('--server', choices=list(SERVERS), default='uvicorn')
+        parser.add_argument('--port', type=int, help="서버 포트 (기본: 빈 포트)")
+        parser.add_argument('--username', help="로그인 계정 (기본: 첫 번째 superuser)")
+        parser.add_argument('--password', required=True)
+        parser.add_argument('--requests', type=int, default=50, help="URL 당 요청 수")
+        parser.add_argument('--concurrency', type=int, default=4, help="동시 클라이언트 수")
+        parser.add_argument('--month', help="월간 보고서 대상 월 (YYYY-MM)")
+        parser.add_argument('--output', help="결과 JSON 저장 경로")
+
+    def handle(self, *args, **opts):
+        username = opts['username'] or User.objects.filter(is_superuser=True).values_list('username', flat=True).first()
+        if not username:
+            raise CommandError("로그인할 계정이 없습니다. --username 을 지정하세요.")
+        server = None
+        url = opts['url']
+        if not url:
+            if not importlib.util.find_spec(opts['server']):
+                raise CommandError(f"{opts['server']} 가 설치되어 있지 않습니다 (pip install {opts['server']}).")
+            port = opts['port'] or self.free_port()
+            url = f"http://127.0.0.1:{port}"
+            server = subprocess.Popen([sys.executable, *SERVERS[opts['server']](port)], cwd=settings.BASE_DIR)
+        try:
+            self.wait_ready(url, server)
+            clients = [loadtest.HttpTransport(url, username, opts['password']) for _ in range(opts['concurrency'])]
+            self.stdout.write(f"{url} - 집계 동시 실행: {'예' if reports.runs_concurrently() else '아니오 (순서대로)'}, "
+                              f"클라이언트 {len(clients)}개 x URL 당 {opts['requests']}건")
+            query = {'month': opts['month']} if opts['month'] else None
+            results = {}
+            for pair in PAIRS:
+                for name in pair:
+                    results[name.split(':')[1]] = self.measure(clients, reverse(name), query, opts['requests'])
+        finally:
+            if server:
+                server.terminate()
+                server.wait(10)
+
+        self.stdout.write(f"\n{'URL':<24}{'건':>6}{'오류':>6}{'p50':>9}{'p95':>9}{'평균':>9}{'건/s':>8}")
+        for name, r in results.items():
+            self.stdout.write(f"{name:<24}{r['count']:>6}{r['errors']:>6}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['mean_ms']:>9}{r['throughput']:>8}")
+        for sync_name, async_name in PAIRS:
+            before, after = results[sync_name.split(':')[1]], results[async_name.split(':')[1]]
+            if before['p50_ms'] and after['p50_ms']:
+                self.stdout.write(f"{async_name.split(':')[1]}: p50 {after['p50_ms'] / before['p50_ms']:.2f}배")
+        if opts['output']:
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+
+    @staticmethod
+    def free_port():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            return sock.getsockname()[1]
+
+    @staticmethod
+    def wait_ready(url, server, timeout=60):
+        deadline = time.monotonic() + timeout
+        address = urlsplit(url)
+        while time.monotonic() < deadline:
+            if server and server.poll() is not None:
+                raise CommandError(f"서버가 종료되었습니다 (exit {server.returncode}).")
+            try:
+                with socket.create_connection((address.hostname, address.port or 80), 1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"{url} 가 {timeout}초 안에 응답하지 않습니다.")
+
+    @staticmethod
+    def measure(clients, path, query, count):
+        for client in clients:  # 예열 (템플릿/연결)
+            client.request('get', path, query)
+
+        def run(client, n):
+            samples, errors = [], 0
+            for _ in range(n):
+                started = time.perf_counter()
+                status, _ = client.request('get', path, query)
+                samples.append((time.perf_counter() - started) * 1000)
+                errors += status != 200
+            return samples, errors
+
+        shares = [count // len(clients) + (i < count % len(clients)) for i in range(len(clients))]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(len(clients)) as pool:
+            parts = list(pool.map(run, clients, shares))
+        elapsed = time.perf_counter() - started
+        samples = sorted(ms for part, _ in parts for ms in part)
+        return {
+            'count': len(samples), 'errors': sum(errors for _, errors in parts),
+            'p50_ms': round(loadtest.percentile(samples, 50), 1), 'p95_ms': round(loadtest.percentile(samples, 95), 1),
+            'mean_ms': round(statistics.fmean(samples), 1), 'throughput': round(len(samples) / elapsed, 1),
+        }
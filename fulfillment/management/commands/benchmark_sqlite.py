@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# (모드, 환경변수) - default 는 Django 기본값 (rollback journal, DEFERRED, busy 5초)
+MODES = [('default', {'SQLITE_TUNING': '0'}), ('tuned', {'SQLITE_TUNING': '1'})]
+PHASES = {
+    'read': 'dashboard=1',
+    'write': 'order_create=35,order_allocate=20,process_weight=15,partner_payment_create=10',
+    'mixed': None,  # load_test 기본 비율
+}
+
+
+class Command(BaseCommand):
+    help = ("SQLite 기본 설정과 운영 모드(WAL/busy_timeout/BEGIN IMMEDIATE)의 읽기/쓰기 처리량을 "
+            "DB 복사본에 load_test 를 돌려 비교합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', help="복사할 SQLite 파일 (기본: 현재 default DB)")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--phase', action='append', choices=list(PHASES), help="측정 단계 (기본: 전부)")
+        parser.add_argument('--username', help="load_test 로그인 계정")
+        parser.add_argument('--output', help="결과 JSON 저장 경로")
+
+    def handle(self, *args, **opts):
+        source = opts['source'] or connection.settings_dict['NAME']
+        if connection.vendor != 'sqlite' and not opts['source']:
+            raise CommandError("default DB 가 SQLite 가 아닙니다. --source 로 SQLite 파일을 지정하세요.")
+        if not os.path.exists(str(source)):
+            raise CommandError(f"{source} 가 없습니다. manage.py setup_data 로 데이터를 먼저 만드세요.")
+
+        results = {}
+        with tempfile.TemporaryDirectory() as workdir:
+            for mode, env in MODES:
+                for phase in opts['phase'] or list(PHASES):
+                    path = os.path.join(workdir, f"{mode}-{phase}.sqlite3")
+                    self.copy(source, path)
+                    results[f"{mode}/{phase}"] = self.load_test(path, env, PHASES[phase], opts, workdir)
+                    self.stdout.write(f"  {mode}/{phase}: {self.summary(results[f'{mode}/{phase}'])}")
+
+        self.stdout.write(f"\n{'모드/단계':<16}{'건/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'오류%':>8}{'잠금%':>8}")
+        for key, report in results.items():
+            total = report['ops'].get('total') if report else None
+            if not total:
+                self.stdout.write(f"{key:<16}{'실패':>9}")
+                continue
+            self.stdout.write(f"{key:<16}{total['throughput']:>9}{total['p50_ms']:>9}{total['p95_ms']:>9}{total['p99_ms']:>9}"
+                              f"{total['error_rate'] * 100:>8.1f}{total['lock_rate'] * 100:>8.1f}")
+        if opts['output']:
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
+
+    def copy(self, source, path):
+        """온라인 백업 API 로 복사 후 rollback journal 로 되돌림 (이전 WAL 설정이 before 측정에 섞이지 않도록)"""
+        with sqlite3.connect(source) as src, sqlite3.connect(path) as dst:
+            src.backup(dst)
+        with sqlite3.connect(path) as db:
+            db.execute('PRAGMA journal_mode=DELETE')
+
+    def load_test(self, path, env, mix, opts, workdir):
+        output = os.path.join(workdir, 'report.json')
+        command = [sys.executable, os.path.join(settings.BASE_DIR, 'manage.py'), 'load_test',
+                   '--concurrency', str(opts['concurrency']), '--duration', str(opts['duration']), '--output', output]
+        if mix:
+            command += ['--mix', mix]
+        if opts['username']:
+            command += ['--username', opts['username']]
+        env = {**os.environ, **env, 'DATABASE_URL': f"sqlite:///{path}"}
+        # 정합성 검사 실패(비정상 종료)도 결과는 기록
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+        if not os.path.exists(output):
+            self.stderr.write(result.stderr[-2000:])
+            return None
+        with open(output, encoding='utf-8') as f:
+            report = json.load(f)
+        os.remove(output)
+        return report
+
+    @staticmethod
+    def summary(report):
+        if not report or 'total' not in report['ops']:
+            return "실패"
+        total = report['ops']['total']
+        checks = report.get('checks') or {}
+        return (f"{total['throughput']}건/s, p95 {total['p95_ms']}ms, 잠금 {total['lock']}건, 오류 {total['error']}건, "
+                f"초과 할당 {checks.get('over_allocated', '-')}")
@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from fulfillment import benchmarks
+from fulfillment.models import Order
+
+
+class Command(BaseCommand):
+    help = ("테스트 DB 에 벤치마크 데이터를 만들고 주요 화면의 템플릿 렌더링 시간(ms)을 "
+            "로더/조각 캐시 설정별(no_cache / cached_loader / fragments)로 비교합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help="데이터 배수 (benchmarks.SEED_PARAMS 기준)")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=10, help="화면당 반복 요청 횟수")
+        parser.add_argument('--page', action='append', default=[], help="이 화면만 (URL 이름, 여러 번 지정 가능)")
+        parser.add_argument('--output', help="JSON 리포트 파일 ('-' 이면 표준출력)")
+        parser.add_argument('--keepdb', action='store_true', help="테스트 DB 유지/재사용 (파일 DB 일 때 시딩 생략)")
+
+    def handle(self, *args, **opts):
+        pages = opts['page'] or list(benchmarks.TEMPLATE_PAGES)
+        unknown = sorted(set(pages) - set(benchmarks.ROUTES))
+        if unknown:
+            raise CommandError(f"알 수 없는 화면: {', '.join(unknown)}")
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=opts['keepdb'])
+        try:
+            if not Order.objects.exists():
+                benchmarks.seed(opts['scale'], opts['seed'])
+            fixtures = benchmarks.load_fixtures()
+            results = {}
+            for profile, overrides in benchmarks.render_profiles().items():
+                with override_settings(**overrides):
+                    bench = benchmarks.Bench(fixtures)
+                    results[profile] = {page: benchmarks.measure_render(bench, page, opts['repeat']) for page in pages}
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=opts['keepdb'])
+            teardown_test_environment()
+
+        if opts['output']:
+            text = json.dumps(results, indent=2, sort_keys=True, ensure_ascii=False)
+            if opts['output'] == '-':
+                self.stdout.write(text)
+                return
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        self.print_table(pages, results)
+
+    def print_table(self, pages, results):
+        """화면별 반복 요청 렌더링 시간 중앙값 (괄호: 첫 요청)"""
+        profiles = list(results)
+        self.stdout.write(f"{'화면':<18}" + ''.join(f"{profile:>22}" for profile in profiles))
+        for page in pages:
+            cells = [f"{r['ms_median']:>9.2f}ms ({r['first_ms']:>7.2f})" for r in (results[p][page] for p in profiles)]
+            self.stdout.write(f"{page:<18}" + ''.join(f"{cell:>22}" for cell in cells))
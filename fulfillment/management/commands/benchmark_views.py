@@ -0,0 +1,83 @@
+import json
+import platform
+import time
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from fulfillment import benchmarks
+from fulfillment.models import Order, OrderItem, Product, Partner, Inventory
+
+
+class Command(BaseCommand):
+    help = ("테스트 DB 에 벤치마크 데이터를 만들고 모든 URL 의 응답 시간/쿼리 수/메모리를 JSON 으로 기록합니다. "
+            "--compare 로 이전 리포트와 비교, 쿼리 예산을 넘으면 실패합니다.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=int, default=1, help="데이터 배수 (benchmarks.SEED_PARAMS 기준)")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--repeat', type=int, default=5, help="URL 당 시간 측정 반복 횟수")
+        parser.add_argument('--route', action='append', default=[], help="이 접두어로 시작하는 URL 이름만 (여러 번 지정 가능)")
+        parser.add_argument('--no-memory', action='store_true', help="tracemalloc 측정 생략")
+        parser.add_argument('--output', default='benchmark.json', help="리포트 파일 ('-' 이면 표준출력)")
+        parser.add_argument('--compare', help="비교할 이전 리포트 (JSON)")
+        parser.add_argument('--threshold', type=float, default=1.25, help="이 배수 이상 느려지면 회귀로 표시")
+        parser.add_argument('--keepdb', action='store_true', help="테스트 DB 유지/재사용 (파일 DB 일 때 시딩 생략)")
+
+    def handle(self, *args, **opts):
+        missing = sorted(set(benchmarks.route_names()) - set(benchmarks.ROUTES))
+        if missing:
+            raise CommandError(f"benchmarks.ROUTES 에 예산이 없는 URL: {', '.join(missing)}")
+        names = [name for name in benchmarks.ROUTES if not opts['route'] or name.startswith(tuple(opts['route']))]
+
+        setup_test_environment()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, keepdb=opts['keepdb'])
+        try:
+            if not Order.objects.exists():
+                started = time.perf_counter()
+                benchmarks.seed(opts['scale'], opts['seed'])
+                self.stderr.write(f"데이터 생성: {time.perf_counter() - started:.1f}s")
+            bench = benchmarks.Bench(benchmarks.load_fixtures())
+            results = bench.run(names, opts['repeat'], memory=not opts['no_memory'])
+            report = {'meta': self.meta(opts), 'routes': results}
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=opts['keepdb'])
+            teardown_test_environment()
+
+        text = json.dumps(report, indent=2, sort_keys=True, ensure_ascii=False)
+        if opts['output'] == '-':
+            self.stdout.write(text)
+        else:
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+            self.stdout.write(self.style.SUCCESS(f"리포트 저장: {opts['output']} ({len(results)}개 URL)"))
+
+        if opts['compare']:
+            with open(opts['compare'], encoding='utf-8') as f:
+                self.compare(json.load(f)['routes'], results, opts['threshold'])
+        failed = benchmarks.over_budget(results)
+        if failed:
+            raise CommandError("쿼리 예산 초과/오류: " + ', '.join(f"{name} ({queries}/{budget})" for name, queries, budget in failed))
+
+    def meta(self, opts):
+        return {
+            'scale': opts['scale'], 'seed': opts['seed'], 'repeat': opts['repeat'],
+            'vendor': connection.vendor, 'django': django.get_version(), 'python': platform.python_version(),
+            'rows': {model._meta.model_name: model.objects.count() for model in (Order, OrderItem, Product, Partner, Inventory)},
+        }
+
+    def compare(self, before, after, threshold):
+        """쿼리 수 변화 + threshold 배 이상 느려진 URL 출력"""
+        lines = []
+        for name, new in sorted(after.items()):
+            old = before.get(name)
+            if not old or 'skipped' in old or 'skipped' in new:
+                continue
+            if new['queries'] != old['queries']:
+                lines.append(f"  {name}: 쿼리 {old['queries']} -> {new['queries']}")
+            if old.get('ms_median') and new.get('ms_median', 0) >= old['ms_median'] * threshold:
+                lines.append(f"  {name}: {old['ms_median']}ms -> {new['ms_median']}ms")
+        self.stdout.write("\n".join(["이전 리포트 대비 변경:"] + lines) if lines else "이전 리포트 대비 변경 없음")
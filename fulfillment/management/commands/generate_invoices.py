@@ -0,0 +1,40 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from fulfillment.services import get_invoice_pdfs, invoice_batch_queryset, bundle_invoices
+
+
+class Command(BaseCommand):
+    help = "기간(기본: 오늘) 또는 주문번호 목록의 거래명세서를 PDF 1개 또는 ZIP으로 일괄 생성합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start', type=date.fromisoformat, help="시작일 (YYYY-MM-DD)")
+        parser.add_argument('--end', type=date.fromisoformat, help="종료일 (YYYY-MM-DD, 기본: 시작일)")
+        parser.add_argument('--ids', help="주문번호 목록 (쉼표 구분, 지정 시 기간 무시)")
+        parser.add_argument('--client', type=int, help="거래처 ID")
+        parser.add_argument('--format', choices=['pdf', 'zip'], default='pdf')
+        parser.add_argument('--workers', type=int, help="렌더링 프로세스 수 (기본: INVOICE_BATCH_WORKERS)")
+        parser.add_argument('-o', '--output', help="저장 경로 (기본: invoices_<시작일>.<pdf|zip>)")
+
+    def handle(self, *args, **opts):
+        try:
+            ids = [int(i) for i in opts['ids'].split(',')] if opts['ids'] else None
+        except ValueError:
+            raise CommandError("--ids 는 쉼표로 구분한 숫자여야 합니다.")
+        orders = list(invoice_batch_queryset(opts['start'], opts['end'], ids, opts['client']))
+        if not orders:
+            raise CommandError("대상 주문이 없습니다.")
+
+        started = time.perf_counter()
+        content, _, ext = bundle_invoices(get_invoice_pdfs(orders, workers=opts['workers']), opts['format'])
+        elapsed = time.perf_counter() - started
+
+        output = opts['output'] or f"invoices_{(opts['start'] or timezone.now().date()).strftime('%Y%m%d')}.{ext}"
+        with open(output, 'wb') as f:
+            f.write(content)
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(orders)}건 -> {output} ({len(content):,} bytes, {elapsed:.2f}s)"
+        ))
@@ -0,0 +1,42 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fulfillment.importers import IMPORTERS, IMPORT_CHUNK_SIZE, run_import
+
+
+class Command(BaseCommand):
+    help = "상품/거래처/기초 재고를 엑셀(.xlsx) 또는 CSV에서 스트리밍으로 일괄 등록합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE)
+        parser.add_argument('--dry-run', action='store_true', help="검증만 하고 저장하지 않음")
+        parser.add_argument('--errors', help="오류 행 리포트 CSV 저장 경로")
+
+    def handle(self, *args, **opts):
+        started = time.perf_counter()
+        try:
+            with open(opts['path'], 'rb') as f:
+                result = run_import(opts['kind'], f, opts['path'], chunk_size=opts['chunk_size'],
+                                    dry_run=opts['dry_run'], max_errors=float('inf') if opts['errors'] else 1000)
+        except FileNotFoundError:
+            raise CommandError(f"파일이 없습니다: {opts['path']}")
+        elapsed = time.perf_counter() - started
+
+        if opts['errors']:
+            with open(opts['errors'], 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow(['row', 'error'])
+                writer.writerows(result.errors)
+        else:
+            for row_no, message in result.errors[:20]:
+                self.stderr.write(f"  {row_no}행: {message}")
+
+        style = self.style.SUCCESS if result.ok else self.style.WARNING
+        self.stdout.write(style(
+            f"{IMPORTERS[opts['kind']][0]}: 검증 통과 {result.valid:,} / 신규 {result.created:,} / 수정 {result.updated:,} / "
+            f"오류 {result.error_count:,} ({elapsed:.2f}s)"
+        ))
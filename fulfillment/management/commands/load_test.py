@@ -0,0 +1,72 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from fulfillment import loadtest
+
+
+class Command(BaseCommand):
+    help = ("주문 등록/피킹/계량/입금/대시보드를 여러 프로세스로 동시에 실행해 지연(p50/p95/p99), 처리량, "
+            "오류/잠금 비율과 초과 할당 여부를 측정합니다. 대상 DB 에 데이터가 쌓이므로 개발 DB 에서만 사용하세요.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', help="실행 중인 서버 주소 (예: http://127.0.0.1:8000). 생략 시 프로세스 안에서 WSGI 앱 직접 호출")
+        parser.add_argument('--username', help="로그인 계정 (기본: 첫 번째 superuser)")
+        parser.add_argument('--password', default='', help="--url 사용 시 비밀번호")
+        parser.add_argument('--concurrency', type=int, default=4, help="동시 사용자(프로세스) 수")
+        parser.add_argument('--duration', type=float, default=30, help="측정 시간 (초)")
+        parser.add_argument('--requests', type=int, default=0, help="프로세스당 최대 작업 수 (0: 시간 제한만)")
+        parser.add_argument('--mix', help=f"작업 비중 (기본: {','.join(f'{k}={v}' for k, v in loadtest.DEFAULT_MIX.items())})")
+        parser.add_argument('--think-ms', type=float, default=0, help="작업 사이 평균 대기 (ms)")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--no-checks', action='store_true', help="실행 전후 DB 검사 생략 (다른 DB 를 쓰는 원격 서버 대상)")
+        parser.add_argument('--output', help="결과 JSON 저장 경로")
+
+    def handle(self, *args, **opts):
+        try:
+            mix = loadtest.parse_mix(opts['mix'])
+        except ValueError as e:
+            raise CommandError(e)
+        username = opts['username'] or User.objects.filter(is_superuser=True).values_list('username', flat=True).first()
+        if not username:
+            raise CommandError("로그인할 계정이 없습니다. --username 을 지정하거나 superuser 를 만드세요.")
+        if opts['url'] and not opts['password']:
+            raise CommandError("--url 사용 시 --password 가 필요합니다.")
+
+        before = None if opts['no_checks'] else loadtest.snapshot()
+        self.stdout.write(f"{opts['concurrency']} 프로세스 x {opts['duration']}s -> {opts['url'] or 'WSGI (프로세스 내)'}")
+        report = loadtest.run({
+            'url': opts['url'], 'username': username, 'password': opts['password'], 'mix': mix, 'seed': opts['seed'],
+            'concurrency': opts['concurrency'], 'duration': opts['duration'], 'requests': opts['requests'],
+            'think_ms': opts['think_ms'],
+        })
+        report['options'] = {key: opts[key] for key in ('url', 'concurrency', 'duration', 'requests', 'think_ms', 'seed')}
+        report['options']['mix'] = mix
+        if before is not None:
+            report['checks'] = loadtest.check_integrity(before)
+
+        self.print_report(report)
+        if opts['output']:
+            with open(opts['output'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        if report['worker_failures']:
+            raise CommandError("워커 시작 실패: " + '; '.join(report['worker_failures']))
+        checks = report.get('checks') or {}
+        if checks.get('over_allocated') or checks.get('negative_stock') or checks.get('lost_updates'):
+            raise CommandError("재고 정합성 검사 실패 (초과 할당/음수 재고/차감 누락)")
+
+    def print_report(self, report):
+        self.stdout.write(f"{'작업':<24}{'건수':>7}{'오류':>7}{'잠금':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'건/s':>9}")
+        for op, row in report['ops'].items():
+            self.stdout.write(f"{op:<24}{row['count']:>7}{row['error']:>7}{row['lock']:>7}"
+                              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['throughput']:>9}")
+        for message, count in report['top_errors']:
+            self.stdout.write(self.style.WARNING(f"  {count}x {message}"))
+        checks = report.get('checks')
+        if checks:
+            ok = not (checks['over_allocated'] or checks['negative_stock'] or checks['lost_updates'])
+            style = self.style.SUCCESS if ok else self.style.ERROR
+            self.stdout.write(style(
+                f"주문 생성 {checks['orders_created']}건 / 초과 할당 {checks['over_allocated']} / "
+                f"음수 재고 {checks['negative_stock']} / 차감 누락 {checks['lost_updates']}"))
@@ -0,0 +1,330 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from fulfillment.models import (
+    Partner, Zone, Location, Product, Purchase, PurchaseItem, Inventory, Order, OrderItem,
+    Payment, Expense, ExpenseCategory, BankAccount, BankTransaction, Employee, Payroll, PickingList, WorkLog,
+    ProductCategory, StorageType,
+)
+from fulfillment.posting import post_payments, post_expenses, post_payrolls
+from fulfillment.versions import mark_changed
+
+# --- 이름 재료 ---
+REGIONS = ['강남', '해운대', '자갈치', '노량진', '마포', '수원', '인천', '대구', '광주', '제주', '속초', '통영', '여수', '목포', '포항']
+CLIENT_KINDS = ['포차', '횟집', '식당', '마트', '정육점', '호텔', '급식', '주점', '뷔페', '도매']
+SUPPLIER_KINDS = ['수산', '축산', '유통', '상사', '식품', '주류', '농산']
+PRODUCTS = {
+    ProductCategory.SEAFOOD: (['갈치', '고등어', '오징어', '새우', '연어', '참치', '가리비', '광어', '전복', '낙지'], [StorageType.FROZEN, StorageType.COLD, StorageType.LIVE_TANK]),
+    ProductCategory.MEAT: (['삼겹살', '목살', '닭가슴살', '소갈비', '차돌박이', '항정살', '닭다리'], [StorageType.FROZEN, StorageType.COLD]),
+    ProductCategory.LIQUOR: (['소주', '맥주', '막걸리', '청주', '와인'], [StorageType.DRY]),
+    ProductCategory.INDUSTRIAL: (['종이컵', '물티슈', '위생장갑', '비닐봉투', '랩'], [StorageType.DRY]),
+    ProductCategory.DAILY: (['세제', '휴지', '수세미', '고무장갑'], [StorageType.DRY]),
+    ProductCategory.VEGETABLE: (['양파', '대파', '마늘', '상추', '깻잎', '고추'], [StorageType.COLD, StorageType.DRY]),
+}
+MODIFIERS = ['', '냉동', '손질', '국내산', '수입', '특대', '대', '중', '소', '프리미엄', '업소용']
+UNITS = ['EA', 'BOX', 'KG', 'PACK']
+SHELF_LIFE = {StorageType.LIVE_TANK: 3, StorageType.COLD: 10, StorageType.FROZEN: 365, StorageType.DRY: 540}
+EXPENSE_KINDS = [(ExpenseCategory.RENT, '창고 임차료'), (ExpenseCategory.UTILITY, '전기요금'), (ExpenseCategory.LOGISTICS, '화물 운송비'),
+                 (ExpenseCategory.MEAL, '직원 식대'), (ExpenseCategory.TAX, '세금'), (ExpenseCategory.ETC, '소모품')]
+POSITIONS = ['사원', '주임', '대리', '과장', '팀장']
+
+
+@contextmanager
+def historical_dates():
+    """order_date(auto_now_add) 를 과거 날짜로 넣을 수 있도록 잠시 해제"""
+    field = Order._meta.get_field('order_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = "프로파일링용 대용량 가상 데이터를 생성합니다 (같은 --seed / --end 이면 같은 데이터)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--years', type=float, default=1, help="주문/입출금 이력 기간 (년)")
+        parser.add_argument('--end', type=date.fromisoformat, default=None, help="이력 마지막 날짜 (기본: 오늘)")
+        parser.add_argument('--partners', type=int, default=200)
+        parser.add_argument('--products', type=int, default=2000)
+        parser.add_argument('--zones', type=int, default=6)
+        parser.add_argument('--locations-per-zone', type=int, default=50)
+        parser.add_argument('--lots', type=int, default=20000, help="재고 로트 수")
+        parser.add_argument('--orders-per-day', type=int, default=100)
+        parser.add_argument('--lines', type=int, default=5, help="주문당 평균 품목 수")
+        parser.add_argument('--purchases-per-day', type=int, default=10)
+        parser.add_argument('--payments-per-day', type=int, default=20)
+        parser.add_argument('--expenses-per-day', type=int, default=5)
+        parser.add_argument('--employees', type=int, default=30)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true', help="기존 거래/기초 데이터를 모두 삭제 후 생성")
+
+    def handle(self, *args, **opts):
+        self.rng = random.Random(opts['seed'])
+        self.chunk = opts['chunk_size']
+        self.end = opts['end'] or date.today()
+        self.start = self.end - timedelta(days=max(1, int(opts['years'] * 365)))
+        self.days = [self.start + timedelta(days=i) for i in range((self.end - self.start).days + 1)]
+
+        if opts['clear']:
+            self.clear()
+        elif Order.objects.exists() or Product.objects.exists():
+            raise CommandError("이미 데이터가 있습니다. 재현 가능한 결과를 원하면 --clear 로 비운 뒤 생성하세요.")
+
+        started = time.perf_counter()
+        with self.fast_load():
+            self.step('계좌/직원', self.make_banks_and_employees, opts['employees'])
+            self.step('거래처', self.make_partners, opts['partners'])
+            self.step('창고/위치', self.make_locations, opts['zones'], opts['locations_per_zone'])
+            self.step('상품', self.make_products, opts['products'])
+            self.step('재고 로트', self.make_inventory, opts['lots'])
+            self.step('매입', self.make_purchases, opts['purchases_per_day'])
+            with historical_dates():
+                self.step('주문', self.make_orders, opts['orders_per_day'], opts['lines'])
+            self.step('입출금', self.make_payments, opts['payments_per_day'])
+            self.step('비용', self.make_expenses, opts['expenses_per_day'])
+            self.step('급여', self.make_payroll)
+        mark_changed(Partner, Zone, Location, Product, Purchase, PurchaseItem, Inventory, Order, OrderItem,
+                     Payment, Expense, BankAccount, BankTransaction, Employee, Payroll)
+        self.stdout.write(self.style.SUCCESS(f"완료: {time.perf_counter() - started:.1f}s"))
+
+    # -----------------------------------------------------
+    #  공통
+    # -----------------------------------------------------
+    @contextmanager
+    def fast_load(self):
+        """SQLite: 적재 중에만 fsync 생략 (실패 시 DB 를 다시 만들면 되는 생성 데이터 전용, 트랜잭션 안에서는 변경 불가)"""
+        if connection.vendor != 'sqlite' or connection.in_atomic_block:
+            yield
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA synchronous')
+            previous = cursor.fetchone()[0]
+            cursor.execute('PRAGMA synchronous=OFF')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute(f'PRAGMA synchronous={int(previous)}')
+
+    def step(self, label, func, *args):
+        started = time.perf_counter()
+        count = func(*args)
+        self.stdout.write(f"  {label}: {count:,}건 ({time.perf_counter() - started:.1f}s)")
+
+    def bulk(self, model, rows):
+        """청크 단위 트랜잭션 + bulk_create, 생성된 객체(pk 포함) 반환"""
+        created = []
+        for i in range(0, len(rows), self.chunk):
+            with transaction.atomic():
+                created.extend(model.objects.bulk_create(rows[i:i + self.chunk]))
+        return created
+
+    def amount(self, low, high, step=100):
+        return Decimal(self.rng.randrange(low // step, high // step + 1) * step)
+
+    def clear(self):
+        """참조하는 쪽부터 비우고 id 시퀀스도 초기화 (같은 seed -> 같은 id)"""
+        models = (Payroll, Payment, BankTransaction, Expense, WorkLog, Employee, BankAccount, PickingList, OrderItem,
+                  Order, PurchaseItem, Purchase, Inventory, Product, Location, Zone, Partner)
+        tables = [model._meta.db_table for model in models]
+        connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True))
+
+    # -----------------------------------------------------
+    #  기초 정보
+    # -----------------------------------------------------
+    def make_banks_and_employees(self, count):
+        self.banks = self.bulk(BankAccount, [
+            BankAccount(bank_name=name, account_number=f"{self.rng.randrange(100, 999)}-{self.rng.randrange(10**6, 10**7)}",
+                        initial_balance=self.amount(50_000_000, 200_000_000, 1_000_000))
+            for name in ('국민', '신한', '우리')
+        ])
+        self.employees = self.bulk(Employee, [
+            Employee(name=f"직원{i + 1:03}", position=self.rng.choice(POSITIONS),
+                     join_date=self.start - timedelta(days=self.rng.randrange(0, 2000)),
+                     base_salary=self.amount(2_500_000, 6_000_000, 50_000))
+            for i in range(count)
+        ])
+        return len(self.banks) + len(self.employees)
+
+    def make_partners(self, count):
+        rows = []
+        for i in range(count):
+            roll = self.rng.random()
+            ptype = 'CLIENT' if roll < 0.7 else 'SUPPLIER' if roll < 0.95 else 'BOTH'
+            kinds = CLIENT_KINDS if ptype == 'CLIENT' else SUPPLIER_KINDS
+            rows.append(Partner(
+                name=f"{self.rng.choice(REGIONS)}{self.rng.choice(kinds)} {i + 1}호", partner_type=ptype,
+                biz_number=f"{self.rng.randrange(100, 999)}-{self.rng.randrange(10, 99)}-{self.rng.randrange(10000, 99999)}",
+                phone=f"010-{self.rng.randrange(1000, 9999)}-{self.rng.randrange(1000, 9999)}",
+                initial_balance=self.amount(0, 5_000_000, 10_000),
+            ))
+        partners = self.bulk(Partner, rows)
+        self.clients = [p.pk for p in partners if p.partner_type in ('CLIENT', 'BOTH')]
+        self.suppliers = [p.pk for p in partners if p.partner_type in ('SUPPLIER', 'BOTH')]
+        self.partner_objs = {p.pk: p for p in partners}
+        if not self.clients or not self.suppliers:
+            raise CommandError("--partners 가 너무 적어 매출처/매입처가 모두 생성되지 않았습니다.")
+        return len(partners)
+
+    def make_locations(self, zones, per_zone):
+        storage = list(StorageType.values)
+        zone_objs = self.bulk(Zone, [Zone(name=f"{chr(65 + i % 26)}{i // 26 or ''}구역", storage_type=storage[i % len(storage)])
+                                     for i in range(zones)])
+        self.locations = [loc.pk for loc in self.bulk(Location, [
+            Location(zone=zone, code=f"{zone.name[:-2]}-{j // 10 + 1:02}-{j % 10 + 1:02}", is_active=self.rng.random() > 0.03)
+            for zone in zone_objs for j in range(per_zone)
+        ])]
+        return len(zone_objs) + len(self.locations)
+
+    def make_products(self, count):
+        rows = []
+        categories = list(PRODUCTS)
+        for i in range(count):
+            category = categories[i % len(categories)]
+            names, storages = PRODUCTS[category]
+            storage = self.rng.choice(storages)
+            cost = self.amount(1_000, 200_000)
+            name = ' '.join(filter(None, [self.rng.choice(MODIFIERS), self.rng.choice(names), f"{self.rng.choice([1, 2, 5, 10, 20])}{self.rng.choice(['kg', '입', '팩', 'L'])}"]))
+            rows.append(Product(
+                sku=f"{category[:3]}-{i + 1:06}", name=name, category=category, storage_type=storage,
+                unit=self.rng.choice(UNITS), purchase_price=cost,
+                price=(cost * Decimal(self.rng.uniform(1.1, 1.6))).quantize(Decimal('100')),
+                shelf_life_days=SHELF_LIFE[storage],
+            ))
+        products = self.bulk(Product, rows)
+        self.products = [(p.pk, p.sku, p.price, p.purchase_price, p.shelf_life_days) for p in products]
+        # 일부 인기 상품에 주문이 몰리도록 가중치
+        self.product_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(self.products))]
+        self.rng.shuffle(self.product_weights)
+        return len(products)
+
+    def make_inventory(self, count):
+        rows = []
+        for i in range(count):
+            pk, sku, _, _, shelf = self.rng.choice(self.products)
+            received = self.end - timedelta(days=self.rng.randrange(0, 120))
+            rows.append(Inventory(
+                product_id=pk, location_id=self.rng.choice(self.locations), quantity=self.rng.randrange(0, 500),
+                batch_number=f"{received:%Y%m%d}-{sku}", received_date=received,
+                expiry_date=received + timedelta(days=shelf + self.rng.randrange(-5, 30)),
+            ))
+        return len(self.bulk(Inventory, rows))
+
+    # -----------------------------------------------------
+    #  거래 이력 (일 단위로 만들어 청크 적재 - 메모리 일정)
+    # -----------------------------------------------------
+    def pick_products(self, n):
+        return self.rng.choices(self.products, weights=self.product_weights, k=n)
+
+    def make_purchases(self, per_day):
+        total = 0
+        headers, lines = [], []
+
+        def flush():
+            nonlocal total
+            purchases = self.bulk(Purchase, headers)
+            self.bulk(PurchaseItem, [PurchaseItem(purchase=purchases[i], **line) for i, line in lines])
+            total += len(purchases) + len(lines)
+            headers.clear(); lines.clear()
+
+        for day in self.days:
+            for _ in range(self.rng.randint(0, per_day * 2)):
+                index = len(headers); amount = Decimal(0)
+                for pk, sku, _, cost, shelf in self.pick_products(self.rng.randint(1, 5)):
+                    qty = self.rng.randrange(10, 300)
+                    lines.append((index, dict(product_id=pk, quantity=qty, unit_cost=cost,
+                                              target_location_id=self.rng.choice(self.locations),
+                                              expiry_date=day + timedelta(days=shelf))))
+                    amount += qty * cost
+                headers.append(Purchase(supplier_id=self.rng.choice(self.suppliers), purchase_date=day, total_amount=amount,
+                                        status='RECEIVED' if day < self.end - timedelta(days=2) else 'ORDERED',
+                                        is_bill_published=self.rng.random() < 0.8))
+            if len(lines) >= self.chunk:
+                flush()
+        flush()
+        return total
+
+    def make_orders(self, per_day, avg_lines):
+        total = 0
+        headers, lines = [], []
+
+        def flush():
+            nonlocal total
+            orders = self.bulk(Order, headers)
+            self.bulk(OrderItem, [OrderItem(order=orders[i], **line) for i, line in lines])
+            total += len(orders) + len(lines)
+            headers.clear(); lines.clear()
+
+        for day in self.days:
+            recent = (self.end - day).days
+            weekend = day.weekday() >= 5
+            for _ in range(self.rng.randint(per_day // 2, per_day * 3 // 2) // (2 if weekend else 1)):
+                index = len(headers); revenue = cogs = Decimal(0)
+                for pk, _, price, cost, _ in self.pick_products(self.rng.randint(1, max(1, avg_lines * 2 - 1))):
+                    qty = self.rng.randrange(1, 50)
+                    lines.append((index, dict(product_id=pk, quantity=qty, cost_price=cost, final_amount=qty * price)))
+                    revenue += qty * price; cogs += qty * cost
+                status = 'SHIPPED' if recent > 2 else self.rng.choice(['PENDING', 'ALLOCATED', 'SHIPPED'])
+                ordered_at = datetime.combine(day, datetime.min.time()) + timedelta(seconds=self.rng.randrange(6 * 3600, 22 * 3600))
+                headers.append(Order(client_id=self.rng.choice(self.clients), order_date=ordered_at, status=status,
+                                     total_revenue=revenue, total_cogs=cogs))
+            if len(lines) >= self.chunk:
+                flush()
+        flush()
+        return total
+
+    def make_payments(self, per_day):
+        """계좌이체 건은 posting.post_payments 가 통장 입출금 내역 생성/연결 (Payment.save 와 같은 결과)"""
+        total = 0
+        for chunk_start in range(0, len(self.days), 30):
+            payments = []
+            for day in self.days[chunk_start:chunk_start + 30]:
+                for _ in range(self.rng.randint(0, per_day * 2)):
+                    inbound = self.rng.random() < 0.6
+                    partner = self.rng.choice(self.clients if inbound else self.suppliers)
+                    payment = Payment(partner=self.partner_objs[partner], date=day, payment_type='INBOUND' if inbound else 'OUTBOUND',
+                                      amount=self.amount(100_000, 10_000_000, 10_000), method=self.rng.choice(['CASH', 'BANK', 'BANK', 'CARD']))
+                    if payment.method == 'BANK':
+                        payment.bank_account = self.rng.choice(self.banks)
+                    payments.append(payment)
+            post_payments(payments, batch_size=self.chunk)
+            total += len(payments) + sum(1 for p in payments if p.related_bank_trx_id)
+        return total
+
+    def make_expenses(self, per_day):
+        """출금 계좌 지정 건은 posting.post_expenses 가 출금 내역 생성 (Expense.save 와 같은 결과)"""
+        rows = []
+        for day in self.days:
+            for _ in range(self.rng.randint(0, per_day * 2)):
+                category, description = self.rng.choice(EXPENSE_KINDS)
+                account = self.rng.choice(self.banks) if self.rng.random() < 0.7 else None
+                rows.append(Expense(date=day, category=category, description=description,
+                                    amount=self.amount(10_000, 3_000_000), has_proof=self.rng.random() < 0.9, payment_account=account))
+        post_expenses(rows, batch_size=self.chunk)
+        return len(rows) + sum(1 for e in rows if e.payment_account_id)
+
+    def make_payroll(self):
+        """posting.post_payrolls 가 급여 1건당 SALARY 비용 1건 생성/연결 (Payroll.save 와 같은 결과)"""
+        months = sorted({(d.year, d.month) for d in self.days})
+        pays = []
+        for year, month in months:
+            paid = date(year, month, min(25, self.end.day if (year, month) == (self.end.year, self.end.month) else 25))
+            label = f"{year}-{month:02}"
+            for emp in self.employees:
+                if emp.join_date > paid:
+                    continue
+                bonus = self.amount(0, 500_000, 10_000) if self.rng.random() < 0.2 else Decimal(0)
+                deduction = (emp.base_salary * Decimal('0.09')).quantize(Decimal('1'))
+                pays.append(Payroll(employee=emp, payment_date=paid, month_label=label, base_pay=emp.base_salary,
+                                    bonus=bonus, deduction=deduction))
+        return len(post_payrolls(pays, batch_size=self.chunk)) * 2
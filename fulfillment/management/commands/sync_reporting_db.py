@@ -0,0 +1,34 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from fulfillment.routers import REPORTING_ALIAS
+
+
+class Command(BaseCommand):
+    help = ("로컬 테스트용: default SQLite DB 를 reporting 복제본 파일로 복사합니다. "
+            "--interval 을 주면 그 주기로 반복 (복제 지연 흉내). PostgreSQL 은 DB 의 스트리밍 복제를 사용하세요.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help="이 간격(초)마다 반복 복사 (Ctrl+C 로 종료)")
+
+    def handle(self, *args, **opts):
+        if REPORTING_ALIAS not in connections.databases:
+            raise CommandError("REPORTING_DATABASE_URL 이 설정되어 있지 않습니다.")
+        source, target = connections['default'].settings_dict, connections[REPORTING_ALIAS].settings_dict
+        if 'sqlite3' not in source['ENGINE'] or 'sqlite3' not in target['ENGINE']:
+            raise CommandError("SQLite 끼리만 복사합니다. PostgreSQL 은 스트리밍 복제로 reporting DB 를 구성하세요.")
+        if str(source['NAME']) == str(target['NAME']):
+            raise CommandError("default 와 reporting 이 같은 파일입니다.")
+
+        while True:
+            started = time.perf_counter()
+            # 온라인 백업 API - 복사 중에도 default 쓰기 가능 (WAL)
+            with sqlite3.connect(source['NAME']) as src, sqlite3.connect(target['NAME']) as dst:
+                src.backup(dst)
+            self.stdout.write(f"{target['NAME']} 동기화 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+            if not opts['interval']:
+                return
+            time.sleep(opts['interval'])
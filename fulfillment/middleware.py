@@ -0,0 +1,158 @@
+"""
+요청별 SQL / 시간 계측 (REQUEST_PROFILING=1 일 때만 동작)
+
+- connection.execute_wrapper 로 쿼리 수, DB 시간, 가장 느린 쿼리 N개 수집
+- 템플릿 렌더링 시간 (render() 안에서 실행된 지연 쿼리 시간 포함)
+- 응답 헤더 Server-Timing + 'fulfillment.profiling' 로거에 JSON 한 줄
+- PROFILING_SLOW_QUERY_MS 이상 걸린 쿼리는 호출 위치(스택)와 EXPLAIN 을 경고 로그로
+- 비활성화 시 MiddlewareNotUsed -> 미들웨어 체인에서 빠지므로 오버헤드 없음
+"""
+import heapq
+import json
+import logging
+import traceback
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('fulfillment.profiling')
+
+_current = ContextVar('request_profile', default=None)
+_template_patched = False
+
+EXPLAIN_PREFIX = {'sqlite': 'EXPLAIN QUERY PLAN ', 'postgresql': 'EXPLAIN ', 'mysql': 'EXPLAIN '}
+
+
+class RequestProfile:
+    """한 요청 동안의 계측값 (execute_wrapper 로 등록)"""
+    def __init__(self, slowest=5, slow_ms=None, explain=False):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.slowest = []  # (duration, seq, alias, sql) 최소 힙
+        self.slow = []
+        self.keep = slowest; self.slow_ms = slow_ms; self.explain = explain
+        self._explaining = False
+
+    def __call__(self, execute, sql, params, many, context):
+        if self._explaining:
+            return execute(sql, params, many, context)
+        start = perf_counter()
+        failed = False
+        try:
+            return execute(sql, params, many, context)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.record(perf_counter() - start, sql, params, many, context, failed)
+
+    def record(self, duration, sql, params, many, context, failed):
+        self.queries += 1
+        self.db_time += duration
+        alias = context['connection'].alias
+        entry = (duration, self.queries, alias, sql)
+        if len(self.slowest) < self.keep:
+            heapq.heappush(self.slowest, entry)
+        elif duration > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+        if self.slow_ms is not None and duration * 1000 >= self.slow_ms:
+            self.slow.append({
+                'ms': round(duration * 1000, 2), 'db': alias, 'sql': sql,
+                'stack': self.project_stack(),
+                'explain': None if failed or many else self.run_explain(context['connection'], sql, params),
+            })
+
+    @staticmethod
+    def project_stack(limit=8):
+        """프로젝트 코드 프레임만 (django/site-packages 제외)"""
+        frames = [f for f in traceback.extract_stack()[:-3]
+                  if str(settings.BASE_DIR) in f.filename and 'site-packages' not in f.filename]
+        return [f"{f.filename.replace(str(settings.BASE_DIR), '.')}:{f.lineno} {f.name}" for f in frames[-limit:]]
+
+    def run_explain(self, connection, sql, params):
+        prefix = EXPLAIN_PREFIX.get(connection.vendor)
+        if not self.explain or not prefix or not sql.lstrip().upper().startswith('SELECT'):
+            return None
+        self._explaining = True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return [' '.join(str(col) for col in row) for row in cursor.fetchall()]
+        except Exception as e:  # 계측 실패가 요청을 깨면 안 됨
+            return [f"EXPLAIN 실패: {e}"]
+        finally:
+            self._explaining = False
+
+    def server_timing(self, total):
+        return ', '.join([
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f}',
+            f'total;dur={total * 1000:.1f}',
+        ])
+
+    def summary(self, request, response, total):
+        match = getattr(request, 'resolver_match', None)
+        return {
+            'method': request.method, 'path': request.path, 'status': response.status_code,
+            'view': match.view_name if match else None,
+            'total_ms': round(total * 1000, 1), 'db_ms': round(self.db_time * 1000, 1),
+            'tpl_ms': round(self.template_time * 1000, 1), 'queries': self.queries,
+            'slowest': [{'ms': round(d * 1000, 2), 'db': alias, 'sql': sql[:300]}
+                        for d, _, alias, sql in sorted(self.slowest, reverse=True)],
+        }
+
+
+def _patch_template_render():
+    """Django 템플릿 백엔드 render() 시간 누적 (최상위 렌더링 1회 = render()/TemplateResponse 1회)"""
+    global _template_patched
+    if _template_patched:
+        return
+    from django.template.backends.django import Template
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        profile = _current.get()
+        if profile is None:
+            return original(self, context, request)
+        start = perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            profile.template_time += perf_counter() - start
+
+    Template.render = render
+    _template_patched = True
+
+
+class RequestProfilingMiddleware:
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILING', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slowest = getattr(settings, 'PROFILING_SLOWEST', 5)
+        self.slow_ms = getattr(settings, 'PROFILING_SLOW_QUERY_MS', None)
+        self.explain = getattr(settings, 'PROFILING_EXPLAIN', False)
+        _patch_template_render()
+
+    def __call__(self, request):
+        profile = RequestProfile(self.slowest, self.slow_ms, self.explain)
+        token = _current.set(profile)
+        start = perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(profile))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = perf_counter() - start
+        response['Server-Timing'] = profile.server_timing(total)
+        logger.info(json.dumps(profile.summary(request, response, total), ensure_ascii=False))
+        for slow in profile.slow:
+            logger.warning(json.dumps({'slow_query': slow, 'path': request.path}, ensure_ascii=False))
+        return response
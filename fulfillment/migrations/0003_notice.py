@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulfillment', '0002_orderitem_cost_price_alter_orderitem_final_amount_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='제목')),
+                ('content', models.TextField(verbose_name='내용')),
+                ('is_important', models.BooleanField(default=False, verbose_name='중요 공지(상단고정)')),
+                ('file', models.FileField(blank=True, null=True, upload_to='notices/', verbose_name='첨부파일')),
+                ('views', models.PositiveIntegerField(default=0, verbose_name='조회수')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='작성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='작성자')),
+            ],
+        ),
+    ]
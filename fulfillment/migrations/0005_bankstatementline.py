@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 09:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fulfillment', '0004_tableversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='거래일')),
+                ('transaction_type', models.CharField(choices=[('DEPOSIT', '입금'), ('WITHDRAWAL', '출금')], max_length=20, verbose_name='구분')),
+                ('amount', models.DecimalField(decimal_places=0, max_digits=15, verbose_name='금액')),
+                ('description', models.CharField(blank=True, max_length=200, verbose_name='적요')),
+                ('balance', models.DecimalField(blank=True, decimal_places=0, max_digits=15, null=True, verbose_name='거래 후 잔액')),
+                ('fingerprint', models.CharField(editable=False, max_length=40, unique=True)),
+                ('status', models.CharField(choices=[('DRAFT', '전표 초안'), ('MATCHED', '장부 일치'), ('POSTED', '초안 확정')], default='DRAFT', max_length=10, verbose_name='상태')),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+                ('bank_account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statement_lines', to='fulfillment.bankaccount', verbose_name='계좌')),
+                ('matched_transaction', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_line', to='fulfillment.banktransaction', verbose_name='장부 내역')),
+                ('suggested_partner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='fulfillment.partner', verbose_name='추정 거래처')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['bank_account', 'date'], name='fulfillment_bank_ac_f94b03_idx')],
+            },
+        ),
+    ]
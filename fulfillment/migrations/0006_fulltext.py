@@ -0,0 +1,72 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+# 이 마이그레이션 시점의 색인 대상 (fulfillment.fulltext.INDEXES 를 읽지 않음 - 색인 필드가 바뀌면 새 마이그레이션 추가)
+# 모델 -> (원본 테이블, 필드)
+FTS_INDEXES = {
+    'notice': ('fulfillment_notice', ('title', 'content')),
+    'worklog': ('fulfillment_worklog', ('content', 'issues')),
+}
+PG_CONFIG = 'simple'
+
+
+def _sqlite_ddl(db_table, fields):
+    table = f"{db_table}_fts"
+    cols = ', '.join(fields)
+    new = ', '.join(f"new.{f}" for f in fields)
+    old = ', '.join(f"old.{f}" for f in fields)
+    delete = f"INSERT INTO {table}({table}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {table}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE {table} USING fts5({cols}, content='{db_table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='1 2 3')",
+        f"CREATE TRIGGER {table}_ai AFTER INSERT ON {db_table} BEGIN {insert} END",
+        f"CREATE TRIGGER {table}_ad AFTER DELETE ON {db_table} BEGIN {delete} END",
+        # 조회수 등 다른 열만 바뀌는 UPDATE 에는 실행되지 않음
+        f"CREATE TRIGGER {table}_au AFTER UPDATE OF {cols} ON {db_table} BEGIN {delete} {insert} END",
+        f"INSERT INTO {table}({table}) VALUES ('rebuild')",
+    ]
+
+
+def _pg_index(model_name, fields):
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+    return GinIndex(SearchVector(*fields, config=PG_CONFIG), name=f"{model_name}_fts_gin")
+
+
+def install(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for model_name, (db_table, fields) in FTS_INDEXES.items():
+        if vendor == 'sqlite':
+            for sql in _sqlite_ddl(db_table, fields):
+                schema_editor.execute(sql)
+        elif vendor == 'postgresql':
+            schema_editor.add_index(apps.get_model('fulfillment', model_name), _pg_index(model_name, fields))
+
+
+def uninstall(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for model_name, (db_table, fields) in FTS_INDEXES.items():
+        if vendor == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {db_table}_fts_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {db_table}_fts")
+        elif vendor == 'postgresql':
+            schema_editor.remove_index(apps.get_model('fulfillment', model_name), _pg_index(model_name, fields))
+
+
+class Migration(migrations.Migration):
+    """공지사항/업무일지 전문 검색 색인 (SQLite FTS5 + 트리거 / PostgreSQL GIN)"""
+
+    dependencies = [
+        ('fulfillment', '0005_bankstatementline'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='worklog',
+            name='date',
+            field=models.DateField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(install, uninstall),
+    ]
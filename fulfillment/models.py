@@ -68,6 +68,29 @@ class BankTransaction(models.Model):
     def __str__(self):
         return f"[{self.get_transaction_type_display()}] {self.amount} - {self.description}"
 
+class BankStatementLine(models.Model):
+    """은행 거래내역(통장 원본) 한 줄 - 장부(BankTransaction)와 대사 (fulfillment/reconcile.py)"""
+    STATUS_CHOICES = [('DRAFT', '전표 초안'), ('MATCHED', '장부 일치'), ('POSTED', '초안 확정')]
+    bank_account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='statement_lines', verbose_name="계좌")
+    date = models.DateField(verbose_name="거래일")
+    transaction_type = models.CharField(max_length=20, choices=BankTransaction.TYPE_CHOICES, verbose_name="구분")
+    amount = models.DecimalField(max_digits=15, decimal_places=0, verbose_name="금액")
+    description = models.CharField(max_length=200, blank=True, verbose_name="적요")
+    balance = models.DecimalField(max_digits=15, decimal_places=0, null=True, blank=True, verbose_name="거래 후 잔액")
+    # 같은 파일을 다시 올려도 중복 저장되지 않도록 (계좌/일자/금액/적요/잔액 + 파일 내 순번)
+    fingerprint = models.CharField(max_length=40, unique=True, editable=False)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='DRAFT', verbose_name="상태")
+    matched_transaction = models.OneToOneField(BankTransaction, on_delete=models.SET_NULL, null=True, blank=True,
+                                               related_name='statement_line', verbose_name="장부 내역")
+    suggested_partner = models.ForeignKey('Partner', on_delete=models.SET_NULL, null=True, blank=True, verbose_name="추정 거래처")
+    imported_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['bank_account', 'date'])]
+
+    def __str__(self):
+        return f"{self.date} [{self.get_transaction_type_display()}] {self.amount} - {self.description}"
+
 # --- 3. 거래처 및 창고 ---
 class Partner(models.Model):
     name = models.CharField(max_length=100, verbose_name="상호명")
@@ -235,20 +258,20 @@ class Expense(models.Model):
     has_proof = models.BooleanField(default=True, verbose_name="적격증빙 유무")
     payment_account = models.ForeignKey(BankAccount, on_delete=models.SET_NULL, null=True, blank=True, verbose_name="출금 계좌")
 
+    def bank_trx_fields(self):
+        """연동 출금 내역 값 (save() 와 posting.post_expenses 공용, 신규 생성 시 WITHDRAWAL 추가)"""
+        return {'bank_account_id': self.payment_account_id, 'date': self.date, 'amount': self.amount,
+                'description': f"[지출] {self.description}"}
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
-        if self.payment_account:
+        if self.payment_account_id:
             if hasattr(self, 'bank_trx') and self.bank_trx:
-                self.bank_trx.bank_account = self.payment_account
-                self.bank_trx.date = self.date
-                self.bank_trx.amount = self.amount
-                self.bank_trx.description = f"[지출] {self.description}"
+                for field, value in self.bank_trx_fields().items():
+                    setattr(self.bank_trx, field, value)
                 self.bank_trx.save()
             else:
-                BankTransaction.objects.create(
-                    bank_account=self.payment_account, date=self.date, transaction_type='WITHDRAWAL',
-                    amount=self.amount, description=f"[지출] {self.description}", related_expense=self
-                )
+                BankTransaction.objects.create(transaction_type='WITHDRAWAL', related_expense=self, **self.bank_trx_fields())
     def __str__(self): return f"[{self.get_category_display()}] {self.description}"
 
 # --- 8. 인사/급여 (HR) ---
@@ -273,18 +296,24 @@ class Payroll(models.Model):
     total_amount = models.DecimalField(max_digits=12, decimal_places=0, default=0)
     related_expense = models.OneToOneField(Expense, on_delete=models.SET_NULL, null=True, blank=True, editable=False)
 
-    def save(self, *args, **kwargs):
+    def calc_total(self):
         self.total_amount = (self.base_pay + self.bonus + self.leave_pay) - self.deduction
+
+    def expense_fields(self):
+        """연동 급여 비용 값 (save() 와 posting.post_payrolls 공용, 신규 생성 시 SALARY/증빙 추가)"""
+        return {'date': self.payment_date, 'amount': self.total_amount,
+                'description': f"급여 지급 - {self.employee.name} ({self.month_label})"}
+
+    def save(self, *args, **kwargs):
+        self.calc_total()
         super().save(*args, **kwargs)
         
-        description = f"급여 지급 - {self.employee.name} ({self.month_label})"
         if self.related_expense:
-            self.related_expense.amount = self.total_amount
-            self.related_expense.date = self.payment_date
-            self.related_expense.description = description
+            for field, value in self.expense_fields().items():
+                setattr(self.related_expense, field, value)
             self.related_expense.save()
         else:
-            exp = Expense.objects.create(date=self.payment_date, category=ExpenseCategory.SALARY, description=description, amount=self.total_amount, has_proof=True)
+            exp = Expense.objects.create(category=ExpenseCategory.SALARY, has_proof=True, **self.expense_fields())
             self.related_expense = exp
             super().save(update_fields=['related_expense'])
 
@@ -308,50 +337,36 @@ class Payment(models.Model):
     # 내부적으로 생성된 BankTransaction을 추적하기 위한 필드 (선택사항, 1:1 연결)
     related_bank_trx = models.OneToOneField('BankTransaction', on_delete=models.SET_NULL, null=True, blank=True, editable=False)
 
+    def bank_trx_fields(self):
+        """연동 통장 내역 값 (save() 와 posting.post_payments 공용)"""
+        # 수금(INBOUND) -> 통장에선 입금(DEPOSIT) / 지급(OUTBOUND) -> 통장에선 출금(WITHDRAWAL)
+        # 적요 자동 생성 (예: [수금 (입금)] 강남포차 - 메모)
+        desc = f"[{self.get_payment_type_display()}] {self.partner.name}"
+        if self.memo:
+            desc += f" - {self.memo}"
+        return {'bank_account_id': self.bank_account_id, 'date': self.date, 'amount': self.amount, 'description': desc,
+                'transaction_type': 'DEPOSIT' if self.payment_type == 'INBOUND' else 'WITHDRAWAL'}
+
     def save(self, *args, **kwargs):
         super().save(*args, **kwargs)
         
         # 계좌가 선택되었다면 -> 통장 내역(BankTransaction) 자동 생성/수정
-        if self.bank_account:
-            # 1. 거래 유형 결정 (Partner Payment 기준 -> Bank 기준 변환)
-            # 수금(INBOUND) -> 통장에선 입금(DEPOSIT)
-            # 지급(OUTBOUND) -> 통장에선 출금(WITHDRAWAL)
-            trx_type = 'DEPOSIT' if self.payment_type == 'INBOUND' else 'WITHDRAWAL'
-            
-            # 적요 자동 생성 (예: [수금] 강남포차)
-            desc = f"[{self.get_payment_type_display()}] {self.partner.name}"
-            if self.memo:
-                desc += f" - {self.memo}"
-
+        if self.bank_account_id:
             if self.related_bank_trx:
                 # 이미 연결된 내역이 있으면 업데이트
-                self.related_bank_trx.bank_account = self.bank_account
-                self.related_bank_trx.date = self.date
-                self.related_bank_trx.transaction_type = trx_type
-                self.related_bank_trx.amount = self.amount
-                self.related_bank_trx.description = desc
+                for field, value in self.bank_trx_fields().items():
+                    setattr(self.related_bank_trx, field, value)
                 self.related_bank_trx.save()
             else:
-                # 없으면 새로 생성
-                # BankTransaction 모델을 가져와야 함 (문자열 참조 회피)
-                from .models import BankTransaction 
-                
-                trx = BankTransaction.objects.create(
-                    bank_account=self.bank_account,
-                    date=self.date,
-                    transaction_type=trx_type,
-                    amount=self.amount,
-                    description=desc
-                )
-                self.related_bank_trx = trx
-                # 다시 저장 (연결 정보 업데이트)
+                # 없으면 새로 생성 후 다시 저장 (연결 정보 업데이트)
+                self.related_bank_trx = BankTransaction.objects.create(**self.bank_trx_fields())
                 super().save(update_fields=['related_bank_trx'])
 
     def __str__(self):
         return f"[{self.get_payment_type_display()}] {self.partner.name} - {self.amount}"
 
 class WorkLog(models.Model):
-    date = models.DateField(default=timezone.now)
+    date = models.DateField(default=timezone.now, db_index=True)  # 날짜 조회 + 검색 조건
     employee = models.ForeignKey(Employee, on_delete=models.CASCADE)
     content = models.TextField()
     issues = models.TextField(blank=True)
@@ -382,4 +397,18 @@ class Notice(models.Model):
     updated_at = models.DateTimeField(auto_now=True, verbose_name="수정일")
 
     def __str__(self):
-        return self.title        
\ No newline at end of file
+        return self.title        
+
+    @property
+    def file_is_image(self):
+        """목록 미리보기 대상 (이미지 첨부)"""
+        from .attachments import is_image
+        return bool(self.file) and is_image(self.file.name)
+
+# --- 테이블 변경 카운터 (조건부 GET / 캐시 무효화용, fulfillment/versions.py 참고) ---
+class TableVersion(models.Model):
+    label = models.CharField(max_length=100, unique=True)  # 'fulfillment.product'
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self): return f"{self.label} v{self.version}"
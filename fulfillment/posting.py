@@ -0,0 +1,149 @@
+"""
+재무 전기(posting) 서비스 - 입출금/비용/급여를 묶음으로 저장
+
+- 모델 save() 는 1건마다 연동 행(BankTransaction / 급여 Expense)을 만들거나 고치느라 쿼리가 2~3개 더 나가고,
+  bulk_create 로는 그 로직이 실행되지 않음 -> 대량 등록(import, setup_data)은 이 모듈을 사용
+- 연동 값은 save() 와 같은 모델 메서드(bank_trx_fields / expense_fields)로 계산 -> 결과 동일
+- 신규(pk 없음)는 bulk_create, 기존(pk 있음)은 bulk_update. 연동 행도 같은 방식으로 한 트랜잭션에서 저장
+- 호출 수와 무관하게 모델별 쿼리 몇 개 (batch_size 로 나눠 보낼 수 있음)
+- 월 급여 일괄 지급: payroll_run_rows() 미리보기 -> run_payroll() 확정 (귀속월당 직원 1건, 다시 실행해도 중복 없음)
+"""
+from typing import NamedTuple
+
+from django.db import transaction
+
+from .db import write_transaction
+from .models import BankTransaction, Expense, ExpenseCategory, Payment, Payroll, Partner, Employee
+from .versions import mark_changed
+
+
+def _fields(model):
+    return [f.name for f in model._meta.concrete_fields if not f.primary_key]
+
+
+def _save(model, objs, batch_size):
+    """pk 없는 객체는 bulk_create, 있는 객체는 전체 필드 bulk_update (save() 와 같은 결과)"""
+    new = [obj for obj in objs if obj.pk is None]
+    old = [obj for obj in objs if obj.pk is not None]
+    if new:
+        model.objects.bulk_create(new, batch_size=batch_size)
+    if old:
+        model.objects.bulk_update(old, _fields(model), batch_size=batch_size)
+
+
+def _attach(objs, field, model, only=()):
+    """FK 대상이 아직 로드되지 않은 객체들에 한 번의 쿼리로 채움 (연동 값 계산용)"""
+    pending = [obj for obj in objs if getattr(obj, f"{field}_id") is not None and not getattr(type(obj), field).is_cached(obj)]
+    if pending:
+        queryset = model.objects.only(*only) if only else model.objects.all()
+        loaded = queryset.in_bulk({getattr(obj, f"{field}_id") for obj in pending})
+        for obj in pending:
+            setattr(obj, field, loaded[getattr(obj, f"{field}_id")])
+
+
+def _apply(target, values):
+    for field, value in values.items():
+        setattr(target, field, value)
+    return target
+
+
+@transaction.atomic
+def post_payments(payments, batch_size=None):
+    """Payment 묶음 저장 + 연동 계좌가 있으면 통장 입출금 내역 생성/수정 (Payment.save 와 동일)"""
+    payments = list(payments)
+    _attach(payments, 'partner', Partner, ('name',))
+    _attach([p for p in payments if p.bank_account_id], 'related_bank_trx', BankTransaction)
+    transactions = []
+    for payment in payments:
+        if not payment.bank_account_id:
+            continue
+        if payment.related_bank_trx_id:
+            transactions.append(_apply(payment.related_bank_trx, payment.bank_trx_fields()))
+        else:
+            payment.related_bank_trx = BankTransaction(**payment.bank_trx_fields())
+            transactions.append(payment.related_bank_trx)
+    _save(BankTransaction, transactions, batch_size)
+    _save(Payment, payments, batch_size)
+    mark_changed(Payment, BankTransaction)
+    return payments
+
+
+def _post_expenses(expenses, batch_size):
+    # 기존 비용만 연결된 출금 내역이 있을 수 있음 (신규는 저장 전에 골라 둠)
+    saved = [e.pk for e in expenses if e.pk is not None and e.payment_account_id]
+    _save(Expense, expenses, batch_size)
+    existing = {trx.related_expense_id: trx for trx in BankTransaction.objects.filter(related_expense__in=saved)} if saved else {}
+    linked = [e for e in expenses if e.payment_account_id]
+    transactions = []
+    for expense in linked:
+        trx = existing.get(expense.pk)
+        if trx:
+            transactions.append(_apply(trx, expense.bank_trx_fields()))
+        else:
+            transactions.append(BankTransaction(transaction_type='WITHDRAWAL', related_expense=expense, **expense.bank_trx_fields()))
+    _save(BankTransaction, transactions, batch_size)
+    mark_changed(Expense, BankTransaction)
+    return expenses
+
+
+@transaction.atomic
+def post_expenses(expenses, batch_size=None):
+    """Expense 묶음 저장 + 출금 계좌가 있으면 출금 내역 생성/수정 (Expense.save 와 동일)"""
+    return _post_expenses(list(expenses), batch_size)
+
+
+@transaction.atomic
+def post_payrolls(payrolls, batch_size=None, payment_account=None):
+    """
+    Payroll 묶음 저장 + 급여 비용(SALARY Expense) 생성/수정 (Payroll.save 와 동일, 비용의 출금 내역까지)
+    payment_account: 새로 만드는 급여 비용의 출금 계좌 (지정 시 출금 내역도 생성)
+    """
+    payrolls = list(payrolls)
+    _attach(payrolls, 'employee', Employee, ('name',))
+    _attach(payrolls, 'related_expense', Expense)
+    expenses = []
+    for payroll in payrolls:
+        payroll.calc_total()
+        if payroll.related_expense_id:
+            expenses.append(_apply(payroll.related_expense, payroll.expense_fields()))
+        else:
+            payroll.related_expense = Expense(category=ExpenseCategory.SALARY, has_proof=True, payment_account=payment_account,
+                                              **payroll.expense_fields())
+            expenses.append(payroll.related_expense)
+    _post_expenses(expenses, batch_size)
+    _save(Payroll, payrolls, batch_size)
+    mark_changed(Payroll)
+    return payrolls
+
+
+# ---------------------------------------------------------
+# 월 급여 일괄 지급
+# ---------------------------------------------------------
+class PayrollRunRow(NamedTuple):
+    payroll: Payroll  # 저장 전 (paid 이면 표시용)
+    paid: bool        # 이 귀속월 급여가 이미 있음 -> 지급 대상 제외
+
+
+def payroll_run_rows(month_label, payment_date, overrides=None, lock=False):
+    """
+    재직 직원별 급여 미리보기 (쿼리 2개, 인원 수 무관)
+    overrides: {직원 pk: {'bonus': .., 'leave_pay': .., 'deduction': ..}} - 없으면 기본급만
+    """
+    employees = Employee.objects.filter(is_active=True).order_by('department', 'name')
+    if lock:  # 같은 귀속월 동시 확정 직렬화 (SQLite 는 BEGIN IMMEDIATE 가 대신함)
+        employees = employees.select_for_update()
+    paid = set(Payroll.objects.filter(month_label=month_label).values_list('employee_id', flat=True))
+    rows = []
+    for employee in employees:
+        payroll = Payroll(employee=employee, payment_date=payment_date, month_label=month_label, base_pay=employee.base_salary,
+                          **(overrides or {}).get(employee.pk, {}))
+        payroll.calc_total()
+        rows.append(PayrollRunRow(payroll, employee.pk in paid))
+    return rows
+
+
+@write_transaction
+def run_payroll(month_label, payment_date, overrides=None, payment_account=None):
+    """귀속월 급여 확정 - 아직 지급되지 않은 재직 직원만 Payroll/Expense/출금 내역을 묶음 저장, 생성된 Payroll 반환"""
+    rows = payroll_run_rows(month_label, payment_date, overrides, lock=True)
+    return post_payrolls([row.payroll for row in rows if not row.paid], payment_account=payment_account)
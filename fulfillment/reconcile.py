@@ -0,0 +1,327 @@
+"""
+은행 거래내역(통장 원본) 업로드 + 장부 대사
+
+- import_statement(): CSV/XLSX 를 스트리밍으로 읽어 청크 단위 bulk insert (같은 파일을 다시 올려도 중복 없음)
+- reconcile(): 미대사 줄을 장부와 맞춤
+  1) 같은 계좌의 BankTransaction - (구분, 금액) 해시 -> 날짜순 목록에서 ±window 일을 이분 탐색
+  2) 통장 연동이 없는 Payment - 같은 방식 + 거래처명/메모 토큰이 적요에 있어야 함 -> 계좌 연결 후 posting 으로 통장 내역 생성
+  3) 나머지는 전표 초안(DRAFT) - 적요 토큰으로 거래처 추정
+  후보 쌍을 (토큰 일치 수, 날짜 차이) 순으로 정렬해 한 번씩만 배정 -> O(n log n)
+- post_drafts(): 확인한 초안을 장부에 반영 (거래처 추정이 있으면 Payment, 없으면 BankTransaction)
+- reconciliation_report(): 상태별 건수/금액, 초안 목록, 장부에만 있는 내역
+"""
+import hashlib
+import re
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Sum
+
+from .importers import IMPORT_CHUNK_SIZE, ImportResult, iter_rows, read_table, _as_text
+from .models import BankStatementLine, BankTransaction, Partner, Payment
+from .posting import post_payments
+from .versions import mark_changed
+
+STATEMENT_COLUMNS = {
+    'date': 'date', '날짜': 'date', '거래일': 'date', '거래일자': 'date', '거래일시': 'date',
+    'description': 'description', '적요': 'description', '내용': 'description', '기재내용': 'description', '거래내용': 'description',
+    'deposit': 'deposit', '입금': 'deposit', '입금액': 'deposit', '맡기신금액': 'deposit',
+    'withdrawal': 'withdrawal', '출금': 'withdrawal', '출금액': 'withdrawal', '찾으신금액': 'withdrawal',
+    'amount': 'amount', '금액': 'amount', '거래금액': 'amount',  # 부호 있는 금액 (음수 = 출금)
+    'type': 'type', '구분': 'type',
+    'balance': 'balance', '잔액': 'balance', '거래후잔액': 'balance',
+}
+WITHDRAWAL_WORDS = {'출금', 'withdrawal', '지급', 'out'}
+DATE_FORMATS = ('%Y-%m-%d', '%Y.%m.%d', '%Y/%m/%d', '%Y%m%d', '%Y-%m-%d %H:%M:%S', '%Y.%m.%d %H:%M:%S', '%Y/%m/%d %H:%M:%S', '%Y-%m-%d %H:%M')
+
+TOKEN_RE = re.compile(r'[0-9a-z가-힣]+')
+# 장부 적요 자동 문구 (Payment/Expense 연동 내역) - 대사 근거가 아님
+STOP_TOKENS = {'수금', '입금', '지급', '출금', '지출', '통장'}
+REPORT_LIMIT = 500
+
+
+def tokens(text):
+    return frozenset(t for t in TOKEN_RE.findall((text or '').lower()) if len(t) > 1 and t not in STOP_TOKENS)
+
+
+def _date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    text = _as_text(value)
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError(f"date: 날짜 형식이 아닙니다 ('{value}')")
+
+
+def _amount(value, name):
+    if value is None or _as_text(value) == '':
+        return None
+    try:
+        return Decimal(_as_text(value).replace(',', ''))
+    except InvalidOperation:
+        raise ValueError(f"{name}: 숫자가 아닙니다 ('{value}')")
+
+
+def parse_line(values, index):
+    """행 -> (일자, 구분, 금액, 적요, 잔액)"""
+    cell = lambda name: values[index[name]] if name in index and index[name] < len(values) else None
+    deposit, withdrawal = _amount(cell('deposit'), 'deposit'), _amount(cell('withdrawal'), 'withdrawal')
+    if deposit or withdrawal:
+        if deposit and withdrawal:
+            raise ValueError("입금과 출금이 한 줄에 모두 있습니다.")
+        trx_type, amount = ('DEPOSIT', deposit) if deposit else ('WITHDRAWAL', withdrawal)
+    else:
+        amount = _amount(cell('amount'), 'amount')
+        if not amount:
+            raise ValueError("금액이 없습니다.")
+        kind = _as_text(cell('type') or '').lower()
+        trx_type = 'WITHDRAWAL' if amount < 0 or any(word in kind for word in WITHDRAWAL_WORDS) else 'DEPOSIT'
+    if amount < 0 and trx_type == 'WITHDRAWAL':
+        amount = -amount
+    if amount <= 0 or amount != amount.to_integral_value():
+        raise ValueError(f"금액이 올바르지 않습니다 ('{amount}')")
+    return _date(cell('date')), trx_type, amount, _as_text(cell('description') or '')[:200], _amount(cell('balance'), 'balance')
+
+
+def _fingerprint(account_id, line, occurrence):
+    key = '|'.join(str(v) for v in (account_id, *line, occurrence))
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+def import_statement(account, file, filename, chunk_size=IMPORT_CHUNK_SIZE):
+    """통장 거래내역 파일 -> BankStatementLine (ImportResult.created = 새로 저장된 줄, 나머지 valid 는 이미 있던 줄)"""
+    result = ImportResult()
+    rows = iter_rows(read_table(file, filename), result)
+    _, header = next(rows, (1, None))
+    if not result.ok:
+        return result
+    index = {}
+    for i, title in enumerate(header or ()):
+        name = STATEMENT_COLUMNS.get(_as_text(title).replace(' ', '').lower()) if title is not None else None
+        if name and name not in index:
+            index[name] = i
+    if 'date' not in index or not ({'deposit', 'withdrawal'} & index.keys() or 'amount' in index):
+        result.add_error(1, "필수 열이 없습니다: 날짜, 입금/출금 (또는 금액)")
+        return result
+
+    seen = Counter()  # 같은 날 같은 금액/적요가 여러 번 -> 순번으로 구분
+
+    def flush(chunk):
+        existing = set(BankStatementLine.objects.filter(fingerprint__in=[line.fingerprint for line in chunk])
+                       .values_list('fingerprint', flat=True))
+        new = [line for line in chunk if line.fingerprint not in existing]
+        BankStatementLine.objects.bulk_create(new, ignore_conflicts=True)
+        if new:
+            mark_changed(BankStatementLine)  # bulk 저장은 signal 이 없음
+        result.created += len(new)
+
+    chunk = []
+    for row_no, values in rows:
+        if not any(v not in (None, '') for v in values):
+            continue
+        try:
+            line = parse_line(values, index)
+        except ValueError as e:
+            result.add_error(row_no, e)
+            continue
+        seen[line] += 1
+        line_date, trx_type, amount, description, balance = line
+        chunk.append(BankStatementLine(bank_account=account, date=line_date, transaction_type=trx_type, amount=amount,
+                                       description=description, balance=balance,
+                                       fingerprint=_fingerprint(account.pk, line, seen[line])))
+        result.valid += 1
+        if len(chunk) >= chunk_size:
+            flush(chunk); chunk = []
+    if chunk:
+        flush(chunk)
+    return result
+
+
+# ---------------------------------------------------------
+# 대사
+# ---------------------------------------------------------
+class ReconcileResult(NamedTuple):
+    lines: int
+    matched: int           # 기존 BankTransaction 과 일치
+    matched_payments: int  # 통장 연동이 없던 Payment 와 일치 -> 계좌 연결
+    drafts: int
+    seconds: float
+
+
+def _match(lines, candidates, window, require_tokens=False):
+    """
+    lines / candidates: [(id, date, 구분, 금액, 토큰)]
+    (구분, 금액) 해시 + 날짜 정렬 목록 이분 탐색으로 후보 쌍을 모은 뒤 점수순으로 1:1 배정 -> {line_id: candidate_id}
+    """
+    index = defaultdict(list)
+    for cand in sorted(candidates, key=lambda c: (c[1], c[0])):
+        index[cand[2], cand[3]].append(cand)
+    ordinals = {key: [cand[1].toordinal() for cand in bucket] for key, bucket in index.items()}
+    pairs = []
+    for line_id, line_date, trx_type, amount, line_tokens in lines:
+        bucket = index.get((trx_type, amount))
+        if not bucket:
+            continue
+        day = line_date.toordinal()
+        days = ordinals[trx_type, amount]
+        for cand_id, cand_date, _, _, cand_tokens in bucket[bisect_left(days, day - window):bisect_right(days, day + window)]:
+            overlap = len(line_tokens & cand_tokens)
+            if require_tokens and not overlap:
+                continue
+            pairs.append((-overlap, abs(cand_date.toordinal() - day), cand_id, line_id))
+    pairs.sort()
+    matched = {}; used = set()
+    for _, _, cand_id, line_id in pairs:
+        if line_id not in matched and cand_id not in used:
+            matched[line_id] = cand_id
+            used.add(cand_id)
+    return matched
+
+
+def _partner_index():
+    """적요 토큰 -> 거래처 (이름 토큰이 한 거래처에만 속할 때만)"""
+    owners = defaultdict(set)
+    types = {}
+    for pk, name, partner_type in Partner.objects.values_list('id', 'name', 'partner_type'):
+        types[pk] = partner_type
+        for token in tokens(name):
+            owners[token].add(pk)
+    return {token: next(iter(pks)) for token, pks in owners.items() if len(pks) == 1}, types
+
+
+def _suggest(line_tokens, trx_type, partner_tokens, partner_types):
+    allowed = ('CLIENT', 'BOTH') if trx_type == 'DEPOSIT' else ('SUPPLIER', 'BOTH')
+    hits = Counter(partner_tokens[t] for t in line_tokens if t in partner_tokens)
+    hits = [(count, pk) for pk, count in hits.items() if partner_types[pk] in allowed]
+    if not hits:
+        return None
+    hits.sort(reverse=True)
+    return hits[0][1] if len(hits) == 1 or hits[0][0] > hits[1][0] else None
+
+
+def _save_lines(rows):
+    """
+    [(상태, 장부 내역 pk, 추정 거래처 pk, 줄 pk)] 일괄 저장
+    bulk_update 는 줄마다 CASE WHEN 식을 만들어 수만 줄에서 수십 초 -> 같은 UPDATE 문 하나를 executemany
+    """
+    table = connection.ops.quote_name(BankStatementLine._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.executemany(f"UPDATE {table} SET status = %s, matched_transaction_id = %s, suggested_partner_id = %s WHERE id = %s", rows)
+    if rows:
+        mark_changed(BankStatementLine)
+
+
+@transaction.atomic
+def reconcile(account, window_days=None):
+    """미대사 줄(초안 + 장부 내역이 삭제된 일치 줄)을 장부와 대사"""
+    started = time.perf_counter()
+    window = settings.RECONCILE_DATE_WINDOW_DAYS if window_days is None else window_days
+    pending = BankStatementLine.objects.filter(bank_account=account, status__in=['DRAFT', 'MATCHED'], matched_transaction__isnull=True)
+    lines = [(pk, d, t, a, tokens(desc)) for pk, d, t, a, desc in
+             pending.values_list('id', 'date', 'transaction_type', 'amount', 'description')]
+    if not lines:
+        return ReconcileResult(0, 0, 0, 0, time.perf_counter() - started)
+    span = (min(line[1] for line in lines) - timedelta(days=window), max(line[1] for line in lines) + timedelta(days=window))
+
+    # 1. 장부 통장 내역 (다른 줄과 이미 대사된 내역 제외)
+    book = BankTransaction.objects.filter(bank_account=account, date__range=span, statement_line__isnull=True)
+    to_trx = _match(lines, [(pk, d, t, a, tokens(desc)) for pk, d, t, a, desc in
+                            book.values_list('id', 'date', 'transaction_type', 'amount', 'description')], window)
+
+    # 2. 통장 연동 없는 거래처 입출금 - 적요에 거래처명/메모가 있어야 함
+    rest = [line for line in lines if line[0] not in to_trx]
+    unlinked = Payment.objects.filter(bank_account__isnull=True, date__range=span)
+    to_payment = _match(rest, [(pk, d, 'DEPOSIT' if t == 'INBOUND' else 'WITHDRAWAL', a, tokens(f"{name} {memo}")) for pk, d, t, a, memo, name in
+                               unlinked.values_list('id', 'date', 'payment_type', 'amount', 'memo', 'partner__name')],
+                        window, require_tokens=True)
+    payments = Payment.objects.select_related('partner').in_bulk(to_payment.values())
+    for payment in payments.values():
+        payment.bank_account = account
+    post_payments(payments.values())
+
+    # 3. 나머지는 초안 + 거래처 추정
+    partner_tokens, partner_types = _partner_index()
+    rows = []
+    for line_id, _, trx_type, _, line_tokens in lines:
+        if line_id in to_trx:
+            rows.append(('MATCHED', to_trx[line_id], None, line_id))
+        elif line_id in to_payment:
+            payment = payments[to_payment[line_id]]
+            rows.append(('MATCHED', payment.related_bank_trx_id, payment.partner_id, line_id))
+        else:
+            rows.append(('DRAFT', None, _suggest(line_tokens, trx_type, partner_tokens, partner_types), line_id))
+    _save_lines(rows)
+    drafts = len(lines) - len(to_trx) - len(to_payment)
+    return ReconcileResult(len(lines), len(to_trx), len(to_payment), drafts, time.perf_counter() - started)
+
+
+@transaction.atomic
+def post_drafts(lines):
+    """
+    확인한 초안을 장부에 반영 -> 반영된 줄 수
+    추정 거래처가 있으면 거래처 입출금(Payment, 원장 반영) / 없으면 통장 내역만 (수수료, 이자 등)
+    """
+    lines = list(lines.filter(status='DRAFT').select_for_update())
+    payments = {}; transactions = {}
+    for line in lines:
+        if line.suggested_partner_id:
+            payments[line.pk] = Payment(partner_id=line.suggested_partner_id, date=line.date, amount=line.amount, method='BANK',
+                                        payment_type='INBOUND' if line.transaction_type == 'DEPOSIT' else 'OUTBOUND',
+                                        bank_account_id=line.bank_account_id, memo=line.description[:100])
+        else:
+            transactions[line.pk] = BankTransaction(bank_account_id=line.bank_account_id, date=line.date, amount=line.amount,
+                                                    transaction_type=line.transaction_type, description=f"[통장] {line.description}"[:100])
+    post_payments(payments.values())
+    BankTransaction.objects.bulk_create(transactions.values())
+    if transactions:
+        mark_changed(BankTransaction)
+    _save_lines([('POSTED', payments[line.pk].related_bank_trx_id if line.pk in payments else transactions[line.pk].pk,
+                  line.suggested_partner_id, line.pk) for line in lines])
+    return len(lines)
+
+
+def reconciliation_report(account, start=None, end=None):
+    """대사 결과 요약 - 기간 기본값은 업로드된 통장 내역의 처음~끝"""
+    lines = BankStatementLine.objects.filter(bank_account=account)
+    if not (start and end):
+        span = lines.aggregate(first=Min('date'), last=Max('date'))
+        start, end = start or span['first'], end or span['last']
+    if start:
+        lines = lines.filter(date__gte=start)
+    if end:
+        lines = lines.filter(date__lte=end)
+    summary = {(row['status'], row['transaction_type']): row for row in
+               lines.values('status', 'transaction_type').annotate(count=Count('id'), total=Sum('amount'))}
+    statuses = []
+    for status, label in BankStatementLine.STATUS_CHOICES:
+        deposit = summary.get((status, 'DEPOSIT'), {}); withdrawal = summary.get((status, 'WITHDRAWAL'), {})
+        statuses.append({'status': status, 'label': label, 'count': deposit.get('count', 0) + withdrawal.get('count', 0),
+                         'deposit': deposit.get('total') or 0, 'withdrawal': withdrawal.get('total') or 0})
+    book_only = BankTransaction.objects.filter(bank_account=account, statement_line__isnull=True)
+    if start:
+        book_only = book_only.filter(date__gte=start)
+    if end:
+        book_only = book_only.filter(date__lte=end)
+    book_totals = {row['transaction_type']: row for row in book_only.values('transaction_type').annotate(count=Count('id'), total=Sum('amount'))}
+    drafts = lines.filter(status='DRAFT').select_related('suggested_partner').order_by('date', 'id')
+    return {
+        'start': start, 'end': end, 'statuses': statuses,
+        'drafts': drafts[:REPORT_LIMIT], 'draft_count': next(s['count'] for s in statuses if s['status'] == 'DRAFT'),
+        'book_only': book_only.order_by('date', 'id')[:REPORT_LIMIT],
+        'book_only_count': sum(row['count'] for row in book_totals.values()),
+        'book_only_deposit': (book_totals.get('DEPOSIT') or {}).get('total') or 0,
+        'book_only_withdrawal': (book_totals.get('WITHDRAWAL') or {}).get('total') or 0,
+        'closing_balance': lines.exclude(balance=None).order_by('-date', '-id').values_list('balance', flat=True).first(),
+        'limit': REPORT_LIMIT,
+    }
@@ -0,0 +1,82 @@
+"""
+기준 데이터 캐시 - 상품 / 위치 / 거래처 선택 목록
+
+화면마다 Product.objects.all() 등을 다시 조회하던 것을 압축 튜플로 캐시합니다.
+- 캐시 키에 테이블 변경 카운터(versions.py)를 포함 -> 저장/삭제 시 자동 무효화
+- 프로세스별 LRU -> Django 캐시 -> DB 순으로 조회
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+from django.core.cache import cache
+
+from .models import Product, Location, Partner, ProductCategory, StorageType, PartnerType
+from .versions import has_pending, version_key
+
+REFDATA_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+class ProductRef(namedtuple('ProductRef', 'id sku name unit price purchase_price category storage_type shelf_life_days')):
+    __slots__ = ()
+    def __str__(self): return self.name
+    def get_category_display(self): return ProductCategory(self.category).label
+    def get_storage_type_display(self): return StorageType(self.storage_type).label
+
+
+class LocationRef(namedtuple('LocationRef', 'id code is_active')):
+    __slots__ = ()
+    def __str__(self): return self.code
+
+
+class PartnerRef(namedtuple('PartnerRef', 'id name partner_type')):
+    __slots__ = ()
+    def __str__(self): return f"[{self.get_partner_type_display()}] {self.name}"
+    def get_partner_type_display(self): return PartnerType(self.partner_type).label
+
+
+# 종류 -> (의존 테이블, 튜플 타입, 조회)
+SOURCES = {
+    'product': ((Product,), ProductRef, lambda: Product.objects.order_by('id').values_list(*ProductRef._fields)),
+    'location': ((Location,), LocationRef, lambda: Location.objects.order_by('id').values_list(*LocationRef._fields)),
+    'partner': ((Partner,), PartnerRef, lambda: Partner.objects.order_by('id').values_list(*PartnerRef._fields)),
+}
+
+
+def _query(kind):
+    _, ref_type, query = SOURCES[kind]
+    return tuple(ref_type(*row) for row in query())
+
+
+@lru_cache(maxsize=16)
+def _load(kind, version):
+    """(종류, 버전) 단위 캐시 - 버전이 바뀌면 이전 항목은 LRU 에서 자연히 밀려남"""
+    key = f"refdata:{kind}:{version}"
+    rows = cache.get(key)
+    if rows is None:
+        rows = _query(kind)
+        cache.set(key, rows, REFDATA_CACHE_TIMEOUT)
+    return rows
+
+
+def get_refs(kind):
+    tables = SOURCES[kind][0]
+    if has_pending(tables):
+        # 커밋 전 변경은 이 스레드에서만 보이므로 캐시하지 않음
+        return _query(kind)
+    return _load(kind, version_key(tables))
+
+
+def products():
+    return get_refs('product')
+
+
+def locations(active_only=False):
+    refs = get_refs('location')
+    return tuple(ref for ref in refs if ref.is_active) if active_only else refs
+
+
+def partners(*types):
+    """types 지정 시 해당 구분만 (예: partners('CLIENT', 'BOTH'))"""
+    refs = get_refs('partner')
+    return tuple(ref for ref in refs if ref.partner_type in types) if types else refs
+
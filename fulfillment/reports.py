@@ -0,0 +1,241 @@
+"""
+대시보드 / 월간 보고서 집계 (동기 뷰와 비동기 뷰가 같은 블록을 사용)
+
+- 블록 = 다른 블록과 독립적인 읽기 함수 하나 (쿼리 1~2개) -> context 일부 dict 반환
+- collect(): 순서대로 실행 (동기 뷰)
+- acollect(): PostgreSQL 등은 블록마다 별도 스레드/DB 연결에서 동시에 실행 (asyncio.gather)
+  SQLite 는 연결을 나눠도 같은 파일을 읽어 이득이 없으므로 한 스레드에서 순서대로 실행
+- Django 비동기 ORM(aaggregate 등)은 쿼리를 전부 한 스레드(thread_sensitive)에서 실행해 gather 해도 겹치지 않음
+  -> 블록 단위로 thread_sensitive=False 스레드에 보냄
+- 대시보드 화면은 조각(DASHBOARD_FRAGMENTS) 단위로 {% cache %} - 캐시가 빈 조각의 블록만 실행
+  (동기 뷰는 lazy_dashboard(), 비동기 뷰는 adashboard())
+"""
+import asyncio
+from datetime import timedelta
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.cache.utils import make_template_fragment_key
+from django.db import close_old_connections, connections, router
+from django.db.models import Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+
+from .models import OrderItem, Order, Expense, Purchase, Inventory, Partner, Payment, Product, Location, Notice
+from .services import partner_balance_queryset, partner_balance, BALANCE_FIELDS
+from .versions import get_versions, version_key
+
+# 블록을 동시에 실행할 DB (SQLite 는 순서대로)
+CONCURRENT_VENDORS = ('postgresql', 'mysql', 'oracle')
+
+
+def _total(queryset, field):
+    return queryset.aggregate(s=Sum(field))['s'] or 0
+
+
+# ---------------------------------------------------------
+# 대시보드
+# ---------------------------------------------------------
+def dashboard_blocks(today):
+    month_start = today.replace(day=1)
+    last_7_days = today - timedelta(days=6)
+
+    def today_sales():
+        items = OrderItem.objects.filter(order__order_date__date=today, order__status='SHIPPED')
+        return {'today_revenue': _total(items, 'final_amount')}
+
+    def month_orders():
+        sums = Order.objects.filter(order_date__date__gte=month_start, status='SHIPPED').aggregate(
+            revenue=Sum('total_revenue'), cogs=Sum('total_cogs'))
+        return {'month_revenue': sums['revenue'] or 0, 'month_cogs': sums['cogs'] or 0}
+
+    def month_expenses():
+        return {'month_expenses': _total(Expense.objects.filter(date__gte=month_start), 'amount')}
+
+    def balances():
+        receivable = payable = 0
+        for row in partner_balance_queryset().values_list(*BALANCE_FIELDS):
+            balance = partner_balance(*row)
+            if balance > 0: receivable += balance
+            elif balance < 0: payable += abs(balance)
+        return {'total_receivable': receivable, 'total_payable': payable}
+
+    def sales_chart():
+        rows = list(Order.objects.filter(order_date__date__gte=last_7_days, status='SHIPPED')
+                    .annotate(day=TruncDay('order_date')).values('day').annotate(total=Sum('total_revenue')).order_by('day'))
+        return {'chart_dates': [d['day'].strftime('%m-%d') for d in rows], 'chart_revenues': [int(d['total']) for d in rows]}
+
+    def expense_chart():
+        rows = list(Expense.objects.filter(date__gte=month_start).values('category').annotate(total=Sum('amount')))
+        return {'expense_labels': [ex['category'] for ex in rows], 'expense_data': [int(ex['total']) for ex in rows]}
+
+    def expiring():
+        return {'expiring': list(Inventory.objects.select_related('product', 'location')
+                                 .filter(expiry_date__lte=today + timedelta(days=7), quantity__gt=0).order_by('expiry_date')[:5])}
+
+    def recent_orders():
+        return {'recent_orders': list(Order.objects.select_related('client').order_by('-order_date')[:5])}
+
+    def recent_notices():
+        return {'notices': list(Notice.objects.select_related('author').order_by('-is_important', '-created_at')[:5])}
+
+    return [today_sales, month_orders, month_expenses, balances, sales_chart, expense_chart, expiring, recent_orders,
+            recent_notices]
+
+
+# 대시보드 템플릿 조각 -> (블록, 의존 테이블). 조각 캐시 키 = 날짜 + 의존 테이블 버전
+DASHBOARD_FRAGMENTS = {
+    'kpi': (('today_sales', 'month_orders', 'month_expenses', 'balances'), (Order, OrderItem, Expense, Partner, Purchase, Payment)),
+    'charts': (('sales_chart', 'expense_chart'), (Order, Expense)),
+    'expiring': (('expiring',), (Inventory, Product, Location)),
+    'recent_orders': (('recent_orders',), (Order, Partner)),
+    'notices': (('recent_notices',), (Notice,)),
+}
+
+
+def dashboard_context(data):
+    data['month_profit'] = (data['month_revenue'] - data['month_cogs']) - data['month_expenses']
+    return data
+
+
+def dashboard_keys(today):
+    """조각별 캐시 키 (TableVersion 조회 1회)"""
+    get_versions({table for _, tables in DASHBOARD_FRAGMENTS.values() for table in tables})  # 요청 단위 memo 에 한 번에 적재
+    return {name: f"{today.isoformat()}:{version_key(tables)}" for name, (_, tables) in DASHBOARD_FRAGMENTS.items()}
+
+
+def missing_fragments(keys):
+    """
+    템플릿 {% cache %} 에 아직 없는 조각 이름 (태그와 같은 캐시/키 규칙: dashboard_<조각> + 조각 키)
+    태그는 조각 이름 토큰을 그대로 키에 쓰므로 dashboard.html 에서는 따옴표 없이 적음
+    """
+    try:
+        cache = caches['template_fragments']
+    except InvalidCacheBackendError:
+        cache = caches['default']
+    cache_keys = {make_template_fragment_key(f'dashboard_{name}', [key]): name for name, key in keys.items()}
+    found = cache.get_many(list(cache_keys))
+    return [name for cache_key, name in cache_keys.items() if cache_key not in found]
+
+
+def fragment_blocks(today, fragments):
+    blocks = {block.__name__: block for block in dashboard_blocks(today)}
+    return [blocks[name] for fragment in fragments for name in DASHBOARD_FRAGMENTS[fragment][0]]
+
+
+def _fragment_data(data):
+    return dashboard_context(data) if 'month_revenue' in data else data
+
+
+def lazy_dashboard(today):
+    """
+    동기 대시보드 context - 조각마다 템플릿이 처음 값을 읽을 때 블록 실행
+    ({% cache %} 조각이 적중하면 그 조각의 쿼리는 실행되지 않음)
+    """
+    def run(fragment):
+        return _fragment_data(collect(fragment_blocks(today, [fragment])))
+
+    context = {name: SimpleLazyObject(partial(run, name)) for name in DASHBOARD_FRAGMENTS}
+    context['fragment_keys'] = dashboard_keys(today)
+    return context
+
+
+def _dashboard_plan(today):
+    context = lazy_dashboard(today)
+    return context, missing_fragments(context['fragment_keys'])
+
+
+async def adashboard(today):
+    """
+    비동기 대시보드 context - 캐시가 빈 조각의 블록만 acollect() 로 미리 실행
+    적중한 조각은 lazy_dashboard 그대로 (확인 후 렌더링 전에 만료되어도 그 조각만 동기로 실행)
+    """
+    context, missing = await sync_to_async(_dashboard_plan)(today)
+    if missing:
+        data = _fragment_data(await acollect(fragment_blocks(today, missing)))
+        context.update({name: data for name in missing})
+    return context
+
+
+# ---------------------------------------------------------
+# 월간 손익 보고서
+# ---------------------------------------------------------
+def month_range(query_month=None):
+    """'YYYY-MM' (없으면 이번 달) -> (1일, 다음 달 1일)"""
+    if query_month:
+        year, month = map(int, query_month.split('-'))
+        start = timezone.datetime(year, month, 1).date()
+    else:
+        start = timezone.now().date().replace(day=1)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def monthly_blocks(start, end):
+    expenses = Expense.objects.filter(date__gte=start, date__lt=end)
+
+    def sales():
+        sums = Order.objects.filter(order_date__gte=start, order_date__lt=end, status='SHIPPED').aggregate(
+            revenue=Sum('total_revenue'), cogs=Sum('total_cogs'))
+        return {'total_revenue': sums['revenue'] or 0, 'total_cogs': sums['cogs'] or 0}
+
+    def expense_total():
+        return {'total_expense': _total(expenses, 'amount')}
+
+    def expense_list():
+        return {'expense_list': list(expenses.values('category').annotate(sum=Sum('amount')).order_by('-sum'))}
+
+    def purchases():
+        received = Purchase.objects.filter(purchase_date__gte=start, purchase_date__lt=end, status='RECEIVED')
+        return {'total_purchase_amount': _total(received, 'total_amount')}
+
+    return [sales, expense_total, expense_list, purchases]
+
+
+def monthly_context(start, data):
+    gross_profit = data['total_revenue'] - data['total_cogs']
+    operating_profit = gross_profit - data['total_expense']
+    data.update({
+        'target_date': start, 'query_month': start.strftime('%Y-%m'),
+        'gross_profit': gross_profit, 'operating_profit': operating_profit,
+        'op_margin': round((operating_profit / data['total_revenue'] * 100), 1) if data['total_revenue'] > 0 else 0,
+    })
+    return data
+
+
+# ---------------------------------------------------------
+# 실행
+# ---------------------------------------------------------
+def collect(blocks):
+    data = {}
+    for block in blocks:
+        data.update(block())
+    return data
+
+
+def _own_connection(block):
+    """스레드풀 스레드에서 실행 - 그 스레드의 연결을 CONN_MAX_AGE 규칙대로 재사용/정리 (요청 시작/종료 신호 대신)"""
+    def run():
+        close_old_connections()
+        try:
+            return block()
+        finally:
+            close_old_connections()
+    return run
+
+
+def runs_concurrently(model=Order):
+    """읽기 DB(reporting 라우팅 반영)가 블록 동시 실행을 지원하는지"""
+    return connections[router.db_for_read(model)].vendor in CONCURRENT_VENDORS
+
+
+async def acollect(blocks):
+    if not runs_concurrently():
+        return await sync_to_async(collect)(blocks)
+    results = await asyncio.gather(*(sync_to_async(_own_connection(block), thread_sensitive=False)() for block in blocks))
+    data = {}
+    for part in results:
+        data.update(part)
+    return data
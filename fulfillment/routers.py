@@ -0,0 +1,121 @@
+"""
+읽기 전용 복제본(reporting) 라우팅
+
+- REPORTING_DATABASE_URL 이 설정되어 DATABASES['reporting'] 이 있을 때만 동작 (없으면 전부 default)
+- @use_reporting 뷰 / with reporting(): 블록 안의 '읽기'만 reporting 으로 (보고서, 엑셀, 원장 인쇄, 대시보드, API 목록)
+- 쓰기는 항상 default. 다음 경우 읽기도 default 유지 (방금 쓴 내용을 복제 지연 때문에 못 보는 일 방지)
+  - default 트랜잭션 안
+  - 같은 요청에서 이미 쓰기가 있었음
+  - 사용자가 최근 REPORTING_STICKY_SECONDS 초 안에 쓰기를 함 (ReplicaStickinessMiddleware 쿠키)
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPORTING_ALIAS = 'reporting'
+STICKY_COOKIE = 'primary_until'
+
+
+class RoutingState:
+    __slots__ = ('reporting', 'pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.reporting = False  # reporting 읽기 허용 구간
+        self.pinned = pinned    # 최근 쓰기 -> 이 요청은 primary 고정
+        self.wrote = False      # 이 요청에서 쓰기 발생
+
+
+_state = ContextVar('db_routing_state', default=None)
+
+
+def replica_configured():
+    return REPORTING_ALIAS in settings.DATABASES
+
+
+def current_state():
+    return _state.get()
+
+
+@contextmanager
+def reporting():
+    """블록 안의 읽기를 reporting 으로 (요청 밖 - 관리 명령 등 - 에서도 사용 가능)"""
+    state = _state.get()
+    token = None
+    if state is None:
+        token = _state.set(state := RoutingState())
+    previous, state.reporting = state.reporting, True
+    try:
+        yield
+    finally:
+        state.reporting = previous
+        if token is not None:
+            _state.reset(token)
+
+
+def use_reporting(view):
+    """무거운 읽기 뷰 표시 - 쓰기가 없는 화면에만 사용 (async 뷰도 가능)"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with reporting():
+                return await view(*args, **kwargs)
+        return markcoroutinefunction(async_wrapper)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with reporting():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReportingRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if (state is None or not state.reporting or state.pinned or state.wrote
+                or not replica_configured() or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return None
+        return REPORTING_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None and model._meta.app_label != 'sessions':
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, REPORTING_ALIAS}:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # 복제본 스키마는 primary 에서 복제 (sync_reporting_db / DB 복제 기능)
+        return False if db == REPORTING_ALIAS else None
+
+
+class ReplicaStickinessMiddleware:
+    """쓰기 후 REPORTING_STICKY_SECONDS 동안 이 사용자의 읽기를 primary 로 고정 (쿠키)"""
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPORTING_STICKY_SECONDS', 10)
+
+    def __call__(self, request):
+        try:
+            pinned = float(request.COOKIES.get(STICKY_COOKIE) or 0) > time.time()
+        except ValueError:
+            pinned = False
+        state = RoutingState(pinned)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and self.sticky_seconds:
+            response.set_cookie(STICKY_COOKIE, f"{time.time() + self.sticky_seconds:.0f}",
+                                max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
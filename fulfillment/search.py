@@ -0,0 +1,185 @@
+"""
+상품 / 위치 타입어헤드 - 메모리 접두어 색인
+
+- SKU(위치코드), 상품명, 상품명의 각 단어, 초성 목록을 정렬 리스트로 보관하고 bisect 로 접두어 검색
+- 한글은 자모 단위로 분해해서 비교 ('갈' 입력 중에도 '가리비', '갈치' 모두 일치, 'ㄱㅊ' -> '갈치')
+- 원본은 refdata 캐시 튜플 -> 버전이 바뀌면 달라진 항목만 색인에서 빼고 다시 넣음
+- 결과 수는 limit 으로 제한 (카탈로그 크기와 무관하게 응답 크기 일정)
+"""
+import threading
+from bisect import bisect_left, insort
+
+from . import refdata
+
+CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+JUNGSEONG = 'ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ'
+JONGSEONG = ('', 'ㄱ', 'ㄲ', 'ㄳ', 'ㄴ', 'ㄵ', 'ㄶ', 'ㄷ', 'ㄹ', 'ㄺ', 'ㄻ', 'ㄼ', 'ㄽ', 'ㄾ', 'ㄿ', 'ㅀ',
+             'ㅁ', 'ㅂ', 'ㅄ', 'ㅅ', 'ㅆ', 'ㅇ', 'ㅈ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ')
+# 겹받침/이중모음은 입력 순서대로 풀어서 비교 ('달' 입력 중 -> '닭')
+COMPOUND_JAMO = {
+    'ㄳ': 'ㄱㅅ', 'ㄵ': 'ㄴㅈ', 'ㄶ': 'ㄴㅎ', 'ㄺ': 'ㄹㄱ', 'ㄻ': 'ㄹㅁ', 'ㄼ': 'ㄹㅂ', 'ㄽ': 'ㄹㅅ',
+    'ㄾ': 'ㄹㅌ', 'ㄿ': 'ㄹㅍ', 'ㅀ': 'ㄹㅎ', 'ㅄ': 'ㅂㅅ',
+    'ㅘ': 'ㅗㅏ', 'ㅙ': 'ㅗㅐ', 'ㅚ': 'ㅗㅣ', 'ㅝ': 'ㅜㅓ', 'ㅞ': 'ㅜㅔ', 'ㅟ': 'ㅜㅣ', 'ㅢ': 'ㅡㅣ',
+}
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+# 이 비율 이상 바뀌면 하나씩 넣고 빼는 것보다 다시 정렬하는 편이 빠름
+REBUILD_RATIO = 0.1
+
+
+def decompose(text):
+    """소문자 + 한글 자모 분해 ('닭 가슴살' -> 'ㄷㅏㄹㄱ ㄱㅏㅅㅡㅁㅅㅏㄹ')"""
+    out = []
+    for ch in text.lower():
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            code -= HANGUL_BASE
+            jung = JUNGSEONG[code % 588 // 28]; jong = JONGSEONG[code % 28]
+            out.append(CHOSEONG[code // 588] + COMPOUND_JAMO.get(jung, jung) + COMPOUND_JAMO.get(jong, jong))
+        else:
+            out.append(COMPOUND_JAMO.get(ch, ch))
+    return ''.join(out)
+
+
+def initials(text):
+    """초성만 ('갈치 필렛' -> 'ㄱㅊ') - 한글 음절만 대상"""
+    return ''.join(CHOSEONG[(ord(ch) - HANGUL_BASE) // 588] for ch in text
+                   if HANGUL_BASE <= ord(ch) <= HANGUL_LAST)
+
+
+def is_initials(query):
+    return len(query) >= 2 and all(ch in CHOSEONG for ch in query)
+
+
+class PrefixIndex:
+    """
+    refdata 튜플용 접두어 색인.
+    lists: 우선순위 순서의 정렬 리스트 [(key, id)] - 앞 리스트의 결과가 먼저 나옴
+    """
+    LISTS = ('code', 'name', 'word', 'initials')
+
+    def __init__(self, kind, code_attr, name_attr=None, searchable=None):
+        self.kind = kind; self.code_attr = code_attr; self.name_attr = name_attr
+        self.searchable = searchable  # 검색 결과 포함 조건 (선택된 값 표시용 조회는 전체)
+        self.source = None
+        self.refs = {}
+        self.lists = {name: [] for name in self.LISTS}
+        self.lock = threading.Lock()
+
+    def keys_for(self, ref):
+        if self.searchable and not self.searchable(ref):
+            return []
+        code = getattr(ref, self.code_attr) or ''
+        keys = [('code', decompose(code))]
+        if self.name_attr:
+            name = getattr(ref, self.name_attr) or ''
+            words = name.split()
+            keys.append(('name', decompose(name)))
+            keys.extend(('word', decompose(word)) for word in words[1:])
+            if initials(name):
+                keys.append(('initials', initials(name)))
+            keys.extend(('initials', initials(word)) for word in words[1:] if initials(word))
+        return keys
+
+    def rebuild(self, refs):
+        self.refs = {ref.id: ref for ref in refs}
+        lists = {name: [] for name in self.LISTS}
+        for ref in refs:
+            for list_name, key in self.keys_for(ref):
+                lists[list_name].append((key, ref.id))
+        for entries in lists.values():
+            entries.sort()
+        self.lists = lists
+
+    def _remove(self, ref):
+        for list_name, key in self.keys_for(ref):
+            entries = self.lists[list_name]
+            i = bisect_left(entries, (key, ref.id))
+            if i < len(entries) and entries[i] == (key, ref.id):
+                del entries[i]
+
+    def _add(self, ref):
+        for list_name, key in self.keys_for(ref):
+            insort(self.lists[list_name], (key, ref.id))
+
+    def sync(self, refs):
+        """refdata 튜플이 바뀌었으면 달라진 항목만 반영"""
+        with self.lock:
+            if refs is self.source:
+                return
+            new = {ref.id: ref for ref in refs}
+            old = self.refs
+            removed = [ref for pk, ref in old.items() if new.get(pk) != ref]
+            added = [ref for pk, ref in new.items() if old.get(pk) != ref]
+            if len(removed) + len(added) > max(len(new), 1) * REBUILD_RATIO:
+                self.rebuild(refs)
+            else:
+                for ref in removed:
+                    self._remove(ref)
+                for ref in added:
+                    self._add(ref)
+                self.refs = new
+            self.source = refs
+
+    def _scan(self, list_name, key, limit, found):
+        entries = self.lists[list_name]
+        i = bisect_left(entries, (key,))
+        while i < len(entries) and len(found) < limit:
+            entry_key, pk = entries[i]
+            if not entry_key.startswith(key):
+                break
+            if pk not in found:
+                found[pk] = None
+            i += 1
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """순위: 코드 일치 > 코드 접두어 > 이름 접두어 > 단어 접두어 > 초성 (같은 순위는 짧은/가나다 순)"""
+        query = query.strip()
+        found = {}
+        with self.lock:
+            if not query:
+                self._scan('name' if self.name_attr else 'code', '', limit, found)
+            else:
+                key = decompose(query)
+                for list_name in ('code', 'name', 'word'):
+                    self._scan(list_name, key, limit, found)
+                if is_initials(query):
+                    self._scan('initials', query, limit, found)
+            return [self.refs[pk] for pk in found]
+
+
+INDEXES = {
+    'product': PrefixIndex('product', 'sku', 'name'),
+    'location': PrefixIndex('location', 'code', searchable=lambda ref: ref.is_active),
+}
+
+
+def get_index(kind):
+    index = INDEXES[kind]
+    index.sync(refdata.get_refs(kind))
+    return index
+
+
+def search(kind, query, limit=DEFAULT_LIMIT):
+    return get_index(kind).search(query, max(1, min(limit, MAX_LIMIT)))
+
+
+def result_text(kind, ref):
+    return f"{ref.name} ({ref.sku})" if kind == 'product' else ref.code
+
+
+def result_data(kind, ref):
+    """선택 시 화면 계산에 쓰는 값"""
+    if kind == 'product':
+        return {'sku': ref.sku, 'price': ref.price, 'unit': ref.unit}
+    return {}
+
+
+def get_ref(kind, pk):
+    """선택된 값 표시용 (색인에 없으면 None)"""
+    try:
+        return get_index(kind).refs.get(int(pk))
+    except (TypeError, ValueError):
+        return None
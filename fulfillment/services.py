@@ -1,54 +1,335 @@
-from django.db import transaction
+import hashlib
+import logging
+import os
+import time
+import zipfile
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from io import BytesIO
+
+from django.conf import settings
+from django.db.models import Sum, Q, OuterRef, Subquery, Value, DecimalField
+from django.db.models.functions import Coalesce
 from django.core.exceptions import ValidationError
-from .models import Inventory, PickingList
+from django.template.loader import render_to_string
+from django.utils import timezone
+from .models import Inventory, PickingList, Order, Payment, CompanyInfo, Partner, Purchase
+from .utils import render_pdf, render_pdfs, merge_pdfs
+from .db import write_transaction
+
+logger = logging.getLogger(__name__)
 
+@write_transaction
 def create_picking_list(order):
     """
     주문을 받아 FEFO 원칙으로 피킹 리스트를 생성하고,
     ★ 재고를 실시간으로 차감(점유)합니다.
+    상태는 트랜잭션 안에서 다시 읽음 - 같은 주문을 동시에 피킹 지시해도 한 번만 할당
+    """
+    current = Order.objects.select_for_update().only('status').get(pk=order.pk)
+    # 이미 처리된 주문이면 패스
+    if current.status != 'PENDING':
+        order.status = current.status
+        return
+
+    for item in order.items.select_related('product'):
+        qty_needed = item.quantity
+        product = item.product
+
+        # FEFO: 유통기한 임박순으로 재고 찾기
+        candidates = Inventory.objects.select_for_update().filter(
+            product=product, 
+            quantity__gt=0
+        ).order_by('expiry_date', 'received_date')
+
+        # 재고가 아예 없으면 에러
+        if not candidates.exists():
+            raise ValidationError(f"'{product.name}'의 재고가 없습니다.")
+
+        for stock in candidates:
+            if qty_needed <= 0:
+                break
+
+            take_qty = min(qty_needed, stock.quantity)
+
+            # 피킹 리스트 생성 (작업 지시서)
+            PickingList.objects.create(
+                order=order,
+                inventory=stock,
+                allocated_qty=take_qty
+            )
+
+            # ★★★ 핵심: 여기서 재고를 차감합니다! (선점) ★★★
+            stock.quantity -= take_qty
+            stock.save()
+
+            qty_needed -= take_qty
+
+        # 재고가 부족해서 다 못 채운 경우 에러 발생
+        if qty_needed > 0:
+            raise ValidationError(f"'{product.name}' 재고가 부족합니다. (부족수량: {qty_needed})")
+
+    # 상태 변경: 접수(PENDING) -> 피킹지시(ALLOCATED)
+    order.status = 'ALLOCATED'
+    order.save()
+
+
+# ---------------------------------------------------------
+#  거래처 잔액 일괄 계산 (Partner.current_balance 의 N+1 대체)
+# ---------------------------------------------------------
+def _sum_subquery(queryset, fk, value_field):
+    totals = queryset.filter(**{fk: OuterRef('pk')}).order_by().values(fk).annotate(s=Sum(value_field)).values('s')
+    return Coalesce(Subquery(totals), Value(0), output_field=DecimalField(max_digits=15, decimal_places=0))
+
+def partner_balance_queryset(queryset=None):
+    """거래처별 매출/매입/수금/지급 합계를 서브쿼리로 한 번에 annotate"""
+    if queryset is None:
+        queryset = Partner.objects.all()
+    return queryset.annotate(
+        sales_total=_sum_subquery(Order.objects.filter(status='SHIPPED'), 'client', 'total_revenue'),
+        purchase_total=_sum_subquery(Purchase.objects.filter(status='RECEIVED'), 'supplier', 'total_amount'),
+        deposit_total=_sum_subquery(Payment.objects.filter(payment_type='INBOUND'), 'partner', 'amount'),
+        withdrawal_total=_sum_subquery(Payment.objects.filter(payment_type='OUTBOUND'), 'partner', 'amount'),
+    )
+
+# partner_balance() 인자 순서 (partner_balance_queryset 의 값 이름)
+BALANCE_FIELDS = ('partner_type', 'initial_balance', 'sales_total', 'purchase_total', 'deposit_total', 'withdrawal_total')
+
+def partner_balance(partner_type, initial_balance, sales_total, purchase_total, deposit_total, withdrawal_total):
+    """Partner.current_balance 와 같은 규칙 (매출처: 받을 돈 +, 매입처: 줄 돈 -, 혼합: 0)"""
+    if partner_type == 'CLIENT':
+        return (initial_balance + sales_total) - deposit_total
+    if partner_type == 'SUPPLIER':
+        return ((initial_balance + purchase_total) - withdrawal_total) * -1
+    return 0
+
+
+# ---------------------------------------------------------
+#  거래명세서 (Invoice) PDF 렌더링 + 디스크 캐시
+# ---------------------------------------------------------
+INVOICE_TEMPLATE = 'fulfillment/invoice_pdf.html'
+# 템플릿 레이아웃을 바꾸면 이 값을 올려서 기존 캐시를 무효화합니다.
+INVOICE_LAYOUT_VERSION = 1
+
+_invoice_stats = {'hits': 0, 'misses': 0, 'renders': 0, 'render_seconds': 0.0}
+
+def get_company_info():
+    """회사 정보 (미설정 시 저장되지 않은 기본 객체)"""
+    return CompanyInfo.objects.first() or CompanyInfo(name="(회사정보 미설정)")
+
+def calc_previous_balance(order):
+    """해당 주문 직전까지의 거래처 미수금 (기초 + 이전 매출 - 수금)"""
+    if not order.client:
+        return 0
+    initial = order.client.initial_balance
+    past_sales = Order.objects.filter(client=order.client, status='SHIPPED').filter(
+        Q(order_date__lt=order.order_date) | Q(order_date=order.order_date, id__lt=order.id)
+    ).aggregate(s=Sum('total_revenue'))['s'] or 0
+    total_paid = Payment.objects.filter(
+        partner=order.client, payment_type='INBOUND', date__lte=order.order_date.date()
+    ).aggregate(s=Sum('amount'))['s'] or 0
+    return (initial + past_sales) - total_paid
+
+def calc_previous_balances(orders):
     """
-    with transaction.atomic():
-        # 이미 처리된 주문이면 패스
-        if order.status != 'PENDING':
-            return
+    여러 주문의 직전 미수금을 한 번에 계산 -> {order_id: 잔액}
+    거래처별 출고 매출/수금 누적합을 각각 1회 조회로 만든 뒤 이분 탐색으로 구합니다.
+    (calc_previous_balance 와 같은 결과)
+    """
+    orders = list(orders)
+    balances = {o.id: 0 for o in orders}
+    clients = {o.client_id: o.client for o in orders if o.client_id}
+    if not clients:
+        return balances
 
-        for item in order.items.all():
-            qty_needed = item.quantity
-            product = item.product
+    # 거래처별 (주문일시, id) 순 매출 누적합
+    sales = defaultdict(lambda: ([], [0]))
+    for client_id, order_date, order_id, revenue in Order.objects.filter(
+        client_id__in=clients, status='SHIPPED'
+    ).order_by('order_date', 'id').values_list('client_id', 'order_date', 'id', 'total_revenue'):
+        keys, sums = sales[client_id]
+        keys.append((order_date, order_id)); sums.append(sums[-1] + revenue)
 
-            # FEFO: 유통기한 임박순으로 재고 찾기
-            candidates = Inventory.objects.filter(
-                product=product, 
-                quantity__gt=0
-            ).order_by('expiry_date', 'received_date')
+    # 거래처별 일자순 수금 누적합
+    paid = defaultdict(lambda: ([], [0]))
+    for partner_id, date, amount in Payment.objects.filter(
+        partner_id__in=clients, payment_type='INBOUND'
+    ).values_list('partner_id', 'date').annotate(s=Sum('amount')).order_by('date'):
+        dates, sums = paid[partner_id]
+        dates.append(date); sums.append(sums[-1] + amount)
 
-            # 재고가 아예 없으면 에러
-            if not candidates.exists():
-                raise ValidationError(f"'{product.name}'의 재고가 없습니다.")
+    for o in orders:
+        if not o.client_id:
+            continue
+        keys, sale_sums = sales[o.client_id]
+        dates, paid_sums = paid[o.client_id]
+        past_sales = sale_sums[bisect_left(keys, (o.order_date, o.id))]
+        total_paid = paid_sums[bisect_right(dates, o.order_date.date())]
+        balances[o.id] = (clients[o.client_id].initial_balance + past_sales) - total_paid
+    return balances
 
-            for stock in candidates:
-                if qty_needed <= 0:
-                    break
+def get_invoice_context(order, company=None, previous_balance=None, items=None):
+    """거래명세서 템플릿 컨텍스트 (company / previous_balance / items를 넘기면 재조회하지 않음)"""
+    if company is None:
+        company = get_company_info()
+    if previous_balance is None:
+        previous_balance = calc_previous_balance(order)
+    total_balance = previous_balance + order.total_revenue if order.client else 0
+    return {
+        'order': order, 'company': company,
+        'items': list(items) if items is not None else list(order.items.select_related('product')),
+        'previous_balance': previous_balance, 'total_balance': total_balance,
+    }
 
-                take_qty = min(qty_needed, stock.quantity)
+def invoice_version(context):
+    """
+    명세서에 찍히는 값(주문/품목/회사정보/잔액)으로 만든 버전 스탬프
+    명세서 날짜는 거래일자(order_date)만 표시 - 발행일(오늘)을 찍으면 캐시된 PDF 의 날짜가 고정되므로 context 에 넣지 않음
+    """
+    order = context['order']; company = context['company']; client = order.client
+    parts = [INVOICE_LAYOUT_VERSION, order.id, order.status, order.order_date, order.total_revenue, order.memo]
+    if client:
+        parts += [client.name, client.biz_number, client.owner_name, client.phone, client.address]
+    parts += [company.name, company.biz_number, company.ceo_name, company.address, company.phone, company.bank_account]
+    for item in context['items']:
+        parts += [item.id, item.product.name, item.product.unit, item.product.price,
+                  item.quantity, item.supplied_weight, item.final_amount]
+    parts += [context['previous_balance'], context['total_balance']]
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:16]
 
-                # 피킹 리스트 생성 (작업 지시서)
-                PickingList.objects.create(
-                    order=order,
-                    inventory=stock,
-                    allocated_qty=take_qty
-                )
+def render_invoice_pdf(context):
+    """명세서 PDF 렌더링 (캐시 없이, 소요시간 집계)"""
+    started = time.perf_counter()
+    html = render_to_string(INVOICE_TEMPLATE, context)
+    pdf = render_pdf(html, base_url=str(settings.BASE_DIR))
+    elapsed = time.perf_counter() - started
+    _invoice_stats['renders'] += 1
+    _invoice_stats['render_seconds'] += elapsed
+    logger.info("invoice #%s rendered in %.3fs (%d bytes)", context['order'].id, elapsed, len(pdf))
+    return pdf
 
-                # ★★★ 핵심: 여기서 재고를 차감합니다! (선점) ★★★
-                stock.quantity -= take_qty
-                stock.save()
+def _invoice_cache_path(order_id, version):
+    return os.path.join(settings.INVOICE_CACHE_DIR, f"{order_id}-{version}.pdf")
 
-                qty_needed -= take_qty
+def clear_invoice_cache(order_id, keep=None):
+    """해당 주문의 캐시 파일 삭제 (keep 경로는 남김)"""
+    cache_dir = settings.INVOICE_CACHE_DIR
+    if not os.path.isdir(cache_dir):
+        return
+    prefix = f"{order_id}-"
+    for name in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and name.endswith('.pdf') and path != keep:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+def _read_cached_invoice(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def _store_invoice(order_id, path, pdf):
+    os.makedirs(settings.INVOICE_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(pdf)
+    os.replace(tmp_path, path)  # 동시 요청에도 반쯤 쓰인 파일이 보이지 않도록 원자적 교체
+    clear_invoice_cache(order_id, keep=path)
+
+def get_invoice_pdf(order, context=None):
+    """
+    거래명세서 PDF를 반환합니다. -> (pdf bytes, 캐시 적중 여부)
+    출고완료(SHIPPED) 주문만 '주문번호-버전' 파일명으로 디스크에 캐시하며,
+    주문/품목/회사정보/입금이 바뀌면 버전이 달라져 자동으로 다시 렌더링됩니다.
+    """
+    if context is None:
+        context = get_invoice_context(order)
+    if order.status != 'SHIPPED':
+        return render_invoice_pdf(context), False
 
-            # 재고가 부족해서 다 못 채운 경우 에러 발생
-            if qty_needed > 0:
-                raise ValidationError(f"'{product.name}' 재고가 부족합니다. (부족수량: {qty_needed})")
+    path = _invoice_cache_path(order.id, invoice_version(context))
+    pdf = _read_cached_invoice(path)
+    if pdf is not None:
+        _invoice_stats['hits'] += 1
+        return pdf, True
+
+    _invoice_stats['misses'] += 1
+    pdf = render_invoice_pdf(context)
+    _store_invoice(order.id, path, pdf)
+    return pdf, False
+
+def get_invoice_pdfs(orders, workers=None):
+    """
+    여러 주문의 거래명세서를 한 번에 생성 -> [(order, pdf bytes)] (입력 순서 유지)
+    회사정보/직전 잔액은 1회씩만 조회하고, 캐시에 없는 건만 워커 프로세스에서 병렬 렌더링합니다.
+    orders 는 select_related('client').prefetch_related('items__product') 된 쿼리셋을 권장합니다.
+    """
+    orders = list(orders)
+    if workers is None:
+        workers = settings.INVOICE_BATCH_WORKERS
+    company = get_company_info()
+    balances = calc_previous_balances(orders)
+
+    pdfs = {}; pending = []
+    for order in orders:
+        context = get_invoice_context(order, company, balances[order.id], items=order.items.all())
+        path = _invoice_cache_path(order.id, invoice_version(context)) if order.status == 'SHIPPED' else None
+        cached = _read_cached_invoice(path) if path else None
+        if cached is not None:
+            _invoice_stats['hits'] += 1
+            pdfs[order.id] = cached
+        else:
+            _invoice_stats['misses'] += int(path is not None)
+            pending.append((context, path))
+
+    if pending:
+        started = time.perf_counter()
+        htmls = [render_to_string(INVOICE_TEMPLATE, context) for context, _ in pending]
+        rendered = render_pdfs(htmls, base_url=str(settings.BASE_DIR), workers=workers)
+        elapsed = time.perf_counter() - started
+        _invoice_stats['renders'] += len(pending)
+        _invoice_stats['render_seconds'] += elapsed
+        logger.info("batch rendered %d invoices in %.3fs (%d workers)", len(pending), elapsed, workers)
+        for (context, path), pdf in zip(pending, rendered):
+            order_id = context['order'].id
+            if path:
+                _store_invoice(order_id, path, pdf)
+            pdfs[order_id] = pdf
+    return [(order, pdfs[order.id]) for order in orders]
+
+def invoice_batch_queryset(start_date=None, end_date=None, ids=None, client_id=None):
+    """일괄 명세서 대상 주문 (ids 지정 시 해당 주문, 아니면 기간 내 출고완료 주문 / 기본: 오늘)"""
+    orders = Order.objects.select_related('client').prefetch_related('items__product').order_by('order_date', 'id')
+    if ids:
+        return orders.filter(id__in=ids)
+    start_date = start_date or timezone.now().date()
+    end_date = end_date or start_date
+    orders = orders.filter(status='SHIPPED', order_date__date__gte=start_date, order_date__date__lte=end_date)
+    if client_id:
+        orders = orders.filter(client_id=client_id)
+    return orders
+
+def bundle_invoices(results, fmt='pdf'):
+    """
+    get_invoice_pdfs 결과를 인쇄용 파일 하나로 묶기 -> (bytes, content_type, 확장자)
+    fmt='pdf' : 한 개의 PDF로 병합 / fmt='zip' : 주문별 PDF 압축
+    """
+    if fmt == 'zip':
+        buf = BytesIO()
+        with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for order, pdf in results:
+                zf.writestr(f"invoice_{order.order_date:%Y%m%d}_{order.id}.pdf", pdf)
+        return buf.getvalue(), 'application/zip', 'zip'
+    return merge_pdfs([pdf for _, pdf in results]), 'application/pdf', 'pdf'
 
-        # 상태 변경: 접수(PENDING) -> 피킹지시(ALLOCATED)
-        order.status = 'ALLOCATED'
-        order.save()
\ No newline at end of file
+def invoice_cache_stats():
+    """명세서 캐시 적중률 / 평균 렌더링 시간 (프로세스 단위)"""
+    stats = dict(_invoice_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else 0.0
+    stats['avg_render_seconds'] = round(stats['render_seconds'] / stats['renders'], 3) if stats['renders'] else 0.0
+    return stats
@@ -1,3 +1,1235 @@
-from django.test import TestCase
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from unittest import mock
+from datetime import date, datetime
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.exceptions import MiddlewareNotUsed, ValidationError
+from django.core.files.base import ContentFile
+from django.db import OperationalError, connection, connections, models, transaction
+from django.http import HttpResponse
+from django.template import engines
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from . import attachments, benchmarks, counters, db, fulltext, importers, middleware, posting, reconcile, refdata, reports, routers, search, services, versions
+from .forms import InboundForm, OrderForm, PurchaseForm, PurchaseCreateFormSet, OrderCreateFormSet
+from .models import (
+    Partner, Product, Zone, Location, Inventory, Purchase, PurchaseItem, Order, OrderItem,
+    PickingList, BankAccount, BankTransaction, BankStatementLine, Expense, Employee, Payroll, Payment, Notice, WorkLog,
+)
+from .utils import HEAVY_LIBRARIES
+
+
+# ---------------------------------------------------------
+#  워커 부팅 비용 (import 시간 / 메모리) 회귀 방지
+# ---------------------------------------------------------
+BOOT_PROBE = """
+import json, os, resource, sys
+os.environ['DJANGO_SETTINGS_MODULE'] = 'config.settings'
+os.environ.pop('PRELOAD_HEAVY_LIBS', None)
+import django
+django.setup()
+import fulfillment.views, fulfillment.urls, fulfillment.admin
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'modules': sorted(sys.modules), 'rss_kb': rss_kb}))
+"""
+
+# django.setup() + 뷰 import 후 허용하는 최대 RSS (MB)
+BOOT_RSS_BUDGET_MB = 120
+
+
+def summarize_importtime(stderr, top=10):
+    """python -X importtime 출력에서 누적 시간이 큰 모듈 상위 N개 -> [(모듈, ms)]"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(cumulative_us) / 1000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+
+
+class WorkerBootTests(SimpleTestCase):
+    def run_probe(self):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', BOOT_PROBE],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        )
+        return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+    def test_heavy_libraries_not_imported_at_boot(self):
+        report, stderr = self.run_probe()
+        loaded = [name for name in HEAVY_LIBRARIES if name in report['modules']]
+        self.assertEqual(loaded, [], f"eagerly imported: {loaded}\n{summarize_importtime(stderr)}")
+
+    def test_boot_rss_budget(self):
+        report, stderr = self.run_probe()
+        rss_mb = report['rss_kb'] / 1024
+        self.assertLess(rss_mb, BOOT_RSS_BUDGET_MB, f"RSS {rss_mb:.1f}MB\n{summarize_importtime(stderr)}")
+
+
+def load_settings(expression, **env):
+    """환경 변수를 바꿔 settings 를 새 프로세스에서 읽음 (stdout = expression 값)"""
+    env = {key: value for key, value in {**os.environ, **env}.items() if value is not None}
+    return subprocess.run([sys.executable, '-c', f'import config.settings as s; print({expression})'],
+                          cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+
+
+class ProductionSettingsTests(SimpleTestCase):
+    def load_settings(self, **env):
+        return load_settings('s.ALLOWED_HOSTS', **{'DJANGO_ENV': 'production', 'DJANGO_SECRET_KEY': 'x' * 50, **env})
+
+    def test_allowed_hosts_required(self):
+        for value in (None, '', '*', 'erp.example.com,*'):
+            with self.subTest(value=value):
+                result = self.load_settings(ALLOWED_HOSTS=value)
+                self.assertNotEqual(result.returncode, 0)
+                self.assertIn('ALLOWED_HOSTS', result.stderr)
+        result = self.load_settings(ALLOWED_HOSTS='erp.example.com, .example.org')
+        self.assertEqual(result.stdout.strip(), "['erp.example.com', '.example.org']")
+        self.assertIn('DJANGO_SECRET_KEY', self.load_settings(DJANGO_SECRET_KEY=None, ALLOWED_HOSTS='erp.example.com').stderr)
+
+
+# ---------------------------------------------------------
+#  폼셋 선택지 공유 - 행 수와 무관한 쿼리 수
+# ---------------------------------------------------------
+class SharedChoicesFormSetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.supplier = Partner.objects.create(name='공급사', partner_type='SUPPLIER')
+        cls.client_partner = Partner.objects.create(name='매출처', partner_type='CLIENT')
+        zone = Zone.objects.create(name='냉동')
+        cls.locations = [Location.objects.create(zone=zone, code=f'F-{i:02}') for i in range(10)]
+        cls.products = [Product.objects.create(sku=f'SKU-{i}', name=f'상품 {i}', storage_type='FROZEN', price=1000 + i)
+                        for i in range(50)]
+
+    def make_purchase(self, rows):
+        purchase = Purchase.objects.create(supplier=self.supplier)
+        PurchaseItem.objects.bulk_create([
+            PurchaseItem(purchase=purchase, product=self.products[i % 50], quantity=i + 1, unit_cost=500,
+                         target_location=self.locations[i % 10], expiry_date='2030-01-01')
+            for i in range(rows)
+        ])
+        return purchase
+
+    def make_order(self, rows):
+        order = Order.objects.create(client=self.client_partner)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=self.products[i % 50], quantity=i + 1) for i in range(rows)
+        ])
+        return order
+
+    def post_data(self, formset, fields):
+        """수정 화면 제출값 (기존 행 + 빈 행)"""
+        data = {f'{formset.prefix}-{key}': value for key, value in formset.management_form.initial.items()}
+        for i, form in enumerate(formset.forms):
+            data[form.add_prefix('id')] = form.instance.pk or ''
+            for name in fields:
+                value = form.initial.get(name)
+                data[form.add_prefix(name)] = '' if value is None else value
+        return data
+
+    def count_queries(self, formset_class, instance, fields):
+        with CaptureQueriesContext(connection) as render:
+            formset = formset_class(instance=instance)
+            str(formset); str(formset.empty_form)
+        data = self.post_data(formset, fields)
+        with CaptureQueriesContext(connection) as validate:
+            bound = formset_class(data, instance=instance)
+            self.assertTrue(bound.is_valid(), bound.errors)
+        return len(render), len(validate)
+
+    def test_purchase_formset_queries_independent_of_rows(self):
+        fields = ('product', 'quantity', 'target_location', 'expiry_date')
+        small = self.count_queries(PurchaseCreateFormSet, self.make_purchase(3), fields)
+        large = self.count_queries(PurchaseCreateFormSet, self.make_purchase(40), fields)
+        self.assertEqual(small, large)
+
+    def test_order_formset_queries_independent_of_rows(self):
+        fields = ('product', 'quantity')
+        small = self.count_queries(OrderCreateFormSet, self.make_order(3), fields)
+        large = self.count_queries(OrderCreateFormSet, self.make_order(40), fields)
+        self.assertEqual(small, large)
+
+    def test_unknown_product_is_rejected(self):
+        purchase = self.make_purchase(2)
+        formset = PurchaseCreateFormSet(instance=purchase)
+        data = self.post_data(formset, ('product', 'quantity', 'target_location', 'expiry_date'))
+        data[formset.forms[1].add_prefix('product')] = 999999
+        bound = PurchaseCreateFormSet(data, instance=purchase)
+        self.assertFalse(bound.is_valid())
+        self.assertIn('product', bound.errors[1])
+
+    def test_unique_constraints_still_include_shared_fks(self):
+        # 공유 맵으로 존재 확인을 건너뛴 FK 도 unique / 제약 검사에는 포함
+        constraints = [models.UniqueConstraint(fields=['order', 'product'], name='orderitem_product_once'),
+                       models.UniqueConstraint(fields=['product', 'quantity'], name='orderitem_product_quantity')]
+        for name, value in (('constraints', constraints), ('total_unique_constraints', constraints)):
+            patcher = mock.patch.object(OrderItem._meta, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        order = self.make_order(2)
+        formset = OrderCreateFormSet(instance=order)
+        data = self.post_data(formset, ('product', 'quantity'))
+        with self.subTest('같은 주문에 같은 상품 (폼셋 단위)'):
+            bound = OrderCreateFormSet({**data, formset.forms[1].add_prefix('product'): self.products[0].pk}, instance=order)
+            self.assertFalse(bound.is_valid())
+            self.assertTrue(bound.non_form_errors())
+        with self.subTest('다른 주문에 있는 상품+수량 (행 단위 DB 검사)'):
+            OrderItem.objects.create(order=self.make_order(0), product=self.products[5], quantity=7)
+            row = formset.forms[2]
+            bound = OrderCreateFormSet({**data, row.add_prefix('product'): self.products[5].pk, row.add_prefix('quantity'): 7}, instance=order)
+            self.assertFalse(bound.is_valid())
+            self.assertIn('__all__', bound.errors[2])
+
+
+# ---------------------------------------------------------
+#  모든 URL 쿼리 예산 (benchmarks.ROUTES) - N+1 회귀 방지
+# ---------------------------------------------------------
+class TempMediaMixin:
+    """업로드/썸네일을 임시 폴더에 (저장소의 media/, cache/ 를 건드리지 않음)"""
+    @classmethod
+    def setUpClass(cls):
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        override = override_settings(MEDIA_ROOT=tmp.name, THUMBNAIL_CACHE_DIR=os.path.join(tmp.name, 'thumbnails'))
+        override.enable()
+        cls.addClassCleanup(override.disable)
+        super().setUpClass()
+
+
+class ViewQueryBudgetTests(TempMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            benchmarks.seed()
+        cls.fixtures = benchmarks.load_fixtures()
+
+    def test_every_named_route_has_budget(self):
+        names = set(benchmarks.route_names())
+        self.assertEqual(sorted(names - set(benchmarks.ROUTES)), [], "ROUTES 에 예산 추가 필요")
+        self.assertEqual(sorted(set(benchmarks.ROUTES) - names), [], "urls.py 에 없는 ROUTES 항목")
+
+    def test_query_budgets(self):
+        # 운영과 같이 요청마다 커밋 후 처리(on_commit)까지 실행
+        bench = benchmarks.Bench(self.fixtures, around=lambda: self.captureOnCommitCallbacks(execute=True))
+        for name, route in benchmarks.ROUTES.items():
+            with self.subTest(route=name):
+                if route.requires and not benchmarks.available(route.requires):
+                    self.skipTest(f"{route.requires} 사용 불가")
+                result = bench.measure(name, repeat=0, memory=False)
+                self.assertLess(result['status'], 400, result['path'])
+                self.assertLessEqual(result['queries'], route.budget, result['path'])
+
+
+# ---------------------------------------------------------
+#  재무 전기 묶음 저장 (posting) == 모델 save() 1건씩
+# ---------------------------------------------------------
+class PostingEquivalenceTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.client_partner = Partner.objects.create(name='강남포차', partner_type='CLIENT')
+        cls.supplier = Partner.objects.create(name='노량진수산', partner_type='SUPPLIER')
+        cls.banks = [BankAccount.objects.create(bank_name=name, account_number=f'100-{i}') for i, name in enumerate(['국민', '신한'])]
+        cls.employees = [Employee.objects.create(name=name, position='사원', join_date=date(2024, 1, 1), base_salary=3_000_000)
+                         for name in ('김철수', '이영희')]
+
+    def payments(self):
+        a, b = self.banks
+        return [
+            Payment(partner=self.client_partner, date=date(2026, 9, 1), payment_type='INBOUND', amount=500_000, method='BANK', bank_account=a),
+            Payment(partner=self.supplier, date=date(2026, 9, 2), payment_type='OUTBOUND', amount=200_000, method='BANK', bank_account=b, memo='9월분'),
+            Payment(partner=self.client_partner, date=date(2026, 9, 3), payment_type='INBOUND', amount=70_000),
+        ]
+
+    def edit_payments(self, payments):
+        payments[0].amount = 550_000; payments[0].payment_type = 'OUTBOUND'; payments[0].bank_account = self.banks[1]
+        payments[1].bank_account = None
+        payments[2].bank_account = self.banks[0]; payments[2].memo = '추가 입금'
+
+    def expenses(self):
+        return [
+            Expense(date=date(2026, 9, 5), category='RENT', description='창고 임차료', amount=1_000_000, payment_account=self.banks[0]),
+            Expense(date=date(2026, 9, 6), category='MEAL', description='직원 식대', amount=80_000, has_proof=False),
+        ]
+
+    def edit_expenses(self, expenses):
+        expenses[0].amount = 1_100_000; expenses[0].payment_account = self.banks[1]; expenses[0].description = '창고 임차료 (인상)'
+        expenses[1].payment_account = self.banks[0]
+
+    def payrolls(self):
+        return [Payroll(employee=emp, payment_date=date(2026, 9, 25), month_label='2026-09', base_pay=emp.base_salary,
+                        bonus=100_000 * i, deduction=270_000) for i, emp in enumerate(self.employees)]
+
+    def edit_payrolls(self, payrolls):
+        payrolls[0].bonus = 300_000; payrolls[0].payment_date = date(2026, 9, 26)
+        # 급여 비용에 출금 계좌를 지정한 뒤 급여 수정 -> 비용 저장이 출금 내역까지 만듦
+        payrolls[1].related_expense.payment_account = self.banks[0]
+
+    def snapshot(self):
+        """pk 를 뺀 결과 (연동 행은 연결 상대 기준으로)"""
+        def trx(t):
+            return t and (t.bank_account_id, t.date, t.transaction_type, t.amount, t.description)
+        def expense(e):
+            return e and (e.date, e.category, e.description, e.amount, e.has_proof, e.payment_account_id,
+                          trx(BankTransaction.objects.filter(related_expense=e).first()))
+        return {
+            'payments': [(p.partner_id, p.date, p.payment_type, p.amount, p.method, p.memo, p.bank_account_id, trx(p.related_bank_trx))
+                         for p in Payment.objects.order_by('pk')],
+            'expenses': [expense(e) for e in Expense.objects.order_by('pk')],
+            'payrolls': [(p.employee_id, p.payment_date, p.month_label, p.total_amount, expense(p.related_expense))
+                         for p in Payroll.objects.order_by('pk')],
+            'bank_transactions': BankTransaction.objects.count(),
+        }
+
+    def run_scenario(self, save):
+        payments, expenses, payrolls = self.payments(), self.expenses(), self.payrolls()
+        save(payments, expenses, payrolls)
+        created = self.snapshot()
+        self.edit_payments(payments); self.edit_expenses(expenses)
+        for payroll in payrolls:  # 화면에서 다시 불러온 것처럼
+            payroll.refresh_from_db()
+        self.edit_payrolls(payrolls)
+        save(payments, expenses, payrolls)
+        updated = self.snapshot()
+        Payroll.objects.all().delete(); Payment.objects.all().delete()
+        BankTransaction.objects.all().delete(); Expense.objects.all().delete()
+        return created, updated
+
+    def test_batch_matches_per_object_save(self):
+        def one_by_one(payments, expenses, payrolls):
+            for obj in [*payments, *expenses, *payrolls]:
+                obj.save()
+
+        def batch(payments, expenses, payrolls):
+            posting.post_payments(payments); posting.post_expenses(expenses); posting.post_payrolls(payrolls)
+
+        expected = self.run_scenario(one_by_one)
+        self.assertEqual(self.run_scenario(batch), expected)
+        created, updated = expected
+        self.assertEqual(created['bank_transactions'], 3)  # 입금 1 + 출금 1 + 지출 1
+        self.assertEqual(updated['bank_transactions'], 6)  # + 입금 1 + 지출 1 + 급여 비용 출금 1
+
+    def test_query_count_independent_of_batch_size(self):
+        def count(n):
+            payments = [Payment(partner_id=self.client_partner.pk, date=date(2026, 9, 1), payment_type='INBOUND',
+                                amount=1000 + i, bank_account=self.banks[i % 2]) for i in range(n)]
+            with CaptureQueriesContext(connection) as queries:
+                posting.post_payments(payments)
+            return len(queries)
+        self.assertEqual(count(2), count(50))
+
+
+# ---------------------------------------------------------
+#  월 급여 일괄 지급 - 인원 수와 무관한 쿼리 수, 귀속월당 1회
+# ---------------------------------------------------------
+class PayrollRunTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bank = BankAccount.objects.create(bank_name='국민', account_number='100-1')
+
+    def hire(self, count):
+        Employee.objects.bulk_create([Employee(name=f'직원{i:03}', position='사원', join_date=date(2024, 1, 1), base_salary=3_000_000)
+                                      for i in range(Employee.objects.count(), Employee.objects.count() + count)])
+
+    def run_month(self, month_label):
+        with CaptureQueriesContext(connection) as queries:
+            created = posting.run_payroll(month_label, date(2026, 9, 25), payment_account=self.bank)
+        return created, len(queries)
+
+    def test_queries_independent_of_headcount(self):
+        self.hire(3)
+        _, small = self.run_month('2026-08')
+        self.hire(40)
+        created, large = self.run_month('2026-09')
+        self.assertEqual(len(created), 43)
+        self.assertEqual(small, large)
+
+    def test_rerun_is_idempotent_and_posts_overrides(self):
+        self.hire(3)
+        first = Employee.objects.order_by('pk').first()
+        created = posting.run_payroll('2026-09', date(2026, 9, 25), {first.pk: {'bonus': 500_000, 'deduction': 100_000}}, self.bank)
+        self.assertEqual(len(created), 3)
+        self.hire(1)  # 확정 후 입사한 직원만 추가 지급
+        created = posting.run_payroll('2026-09', date(2026, 9, 25), {first.pk: {'bonus': 900_000}})
+        self.assertEqual([p.employee.name for p in created], ['직원003'])
+        self.assertEqual(Payroll.objects.filter(month_label='2026-09').count(), 4)
+
+        payroll = Payroll.objects.select_related('related_expense').get(employee=first, month_label='2026-09')
+        self.assertEqual(payroll.total_amount, 3_400_000)  # 첫 확정의 조정값 그대로
+        self.assertEqual(payroll.related_expense.payment_account, self.bank)
+        self.assertEqual(BankTransaction.objects.get(related_expense=payroll.related_expense).amount, 3_400_000)
+
+
+class ReconcileTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.bank = BankAccount.objects.create(bank_name='국민', account_number='100-1')
+        cls.client_partner = Partner.objects.create(name='목포횟집', partner_type='CLIENT')
+        cls.supplier = Partner.objects.create(name='포항수산', partner_type='SUPPLIER')
+
+    def upload(self, rows):
+        lines = ['거래일자,적요,출금액,입금액,잔액'] + [','.join(map(str, row)) for row in rows]
+        return reconcile.import_statement(self.bank, io.BytesIO('\n'.join(lines).encode()), 'statement.csv')
+
+    def test_import_is_idempotent_and_matches_book(self):
+        book = BankTransaction.objects.create(bank_account=self.bank, date=date(2026, 9, 1), transaction_type='DEPOSIT',
+                                              amount=50_000, description='[수금] 목포횟집')
+        payment = Payment.objects.create(partner=self.supplier, date=date(2026, 9, 2), amount=70_000, payment_type='OUTBOUND')
+        rows = [('2026.09.02', '목포횟집', '', 50_000, ''), ('2026.09.03', '포항수산 대금', 70_000, '', ''),
+                ('2026.09.03', '포항수산 대금', 70_000, '', ''), ('2026.09.05', '예금이자', '', 300, ''), ('잘못된 날짜', '', '', 1, '')]
+        result = self.upload(rows)
+        self.assertEqual((result.valid, result.created, result.error_count), (4, 4, 1))
+        self.assertEqual(self.upload(rows).created, 0)  # 같은 파일 다시 업로드
+
+        done = reconcile.reconcile(self.bank)
+        self.assertEqual((done.matched, done.matched_payments, done.drafts), (1, 1, 2))
+        self.assertEqual(BankStatementLine.objects.get(matched_transaction=book).date, date(2026, 9, 2))
+        payment.refresh_from_db()
+        self.assertEqual(payment.bank_account, self.bank)
+        drafts = BankStatementLine.objects.filter(status='DRAFT')
+        self.assertEqual(sorted(drafts.values_list('description', 'suggested_partner')), [('예금이자', None), ('포항수산 대금', self.supplier.pk)])
+
+        self.assertEqual(reconcile.post_drafts(drafts), 2)
+        self.assertEqual(reconcile.reconcile(self.bank).lines, 0)
+        self.assertEqual(Payment.objects.filter(partner=self.supplier, bank_account=self.bank).count(), 2)
+        self.assertFalse(BankTransaction.objects.filter(bank_account=self.bank, statement_line__isnull=True).exists())
+
+    def test_bulk_paths_bump_table_versions(self):
+        def version(model):
+            return versions.get_versions([model])[model._meta.label_lower][0]
+
+        lines = version(BankStatementLine)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload([('2026.09.05', '예금이자', '', 300, '')])
+        self.assertEqual(version(BankStatementLine), lines + 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            reconcile.reconcile(self.bank)
+        self.assertEqual(version(BankStatementLine), lines + 2)
+        with self.captureOnCommitCallbacks(execute=True), \
+                mock.patch('fulfillment.reconcile.mark_changed', wraps=versions.mark_changed) as marked:
+            self.assertEqual(reconcile.post_drafts(BankStatementLine.objects.all()), 1)  # 거래처 추정 없음 -> 통장 내역만
+        self.assertIn(mock.call(BankTransaction), marked.call_args_list)
+        self.assertEqual(version(BankStatementLine), lines + 3)
+
+
+class ImportFileTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk', password='pw')
+        cls.bank = BankAccount.objects.create(bank_name='국민', account_number='100-1')
+
+    def test_cp949_csv(self):
+        data = '상품코드,상품명,storage_type,판매가\nA-1,광어회,COLD,12000\n'.encode('cp949')
+        result = importers.run_import('product', io.BytesIO(data), 'products.csv')
+        self.assertEqual((result.created, result.error_count), (1, 0))
+        self.assertEqual(Product.objects.get(sku='A-1').name, '광어회')
+
+    def test_undecodable_row_is_reported(self):
+        data = '상품코드,상품명,storage_type,판매가\nA-1,광어회,COLD,12000\n'.encode('cp949') + b'A-2,\x80\xff,COLD,1\n'
+        result = importers.run_import('product', io.BytesIO(data), 'products.csv', dry_run=True)
+        self.assertEqual(result.errors[0][0], 3)
+        self.assertIn('인코딩', result.errors[0][1])
+
+    def test_corrupt_xlsx_is_a_file_error(self):
+        corrupt = b'PK\x03\x04 not really a workbook'
+        result = importers.run_import('product', io.BytesIO(corrupt), 'products.xlsx')
+        self.assertEqual(result.errors, [(1, "엑셀 파일을 열 수 없습니다 (손상되었거나 .xlsx 형식이 아님)")])
+        result, orders = importers.import_orders(io.BytesIO(corrupt), 'orders.xlsx')
+        self.assertEqual((result.error_count, orders), (1, []))
+        self.assertEqual(reconcile.import_statement(self.bank, io.BytesIO(corrupt), 'statement.xlsx').error_count, 1)
+
+        self.client.force_login(self.user)
+        upload = ContentFile(corrupt, name='products.xlsx')
+        response = self.client.post('/import/', {'kind': 'product', 'file': upload})
+        self.assertContains(response, '엑셀 파일을 열 수 없습니다')
+
+    def test_order_valid_count_with_mixed_rows(self):
+        Partner.objects.create(name='목포횟집', partner_type='CLIENT')
+        Product.objects.create(sku='A-1', name='광어회', storage_type='COLD', price=12_000)
+        rows = ['거래처,SKU,수량', '목포횟집,A-1,2', '목포횟집,A-1,"1,000"', '목포횟집,A-1,0', '없는거래처,A-1,1',
+                '목포횟집,A-1,2.5', '목포횟집,A-1,0.5']
+        result, orders = importers.import_orders(io.BytesIO('\n'.join(rows).encode()), 'orders.csv')
+        self.assertEqual((result.valid, result.error_count, orders), (2, 4, []))
+        self.assertEqual([row_no for row_no, _ in result.errors], [4, 5, 6, 7])
+        self.assertIn("'2.5'", result.errors[2][1])  # 소수는 잘라내지 않고 오류
+        self.assertFalse(Order.objects.exists())  # 오류가 있으면 저장하지 않음
+
+
+class LeanListAPITests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk', password='pw')
+        cls.clients = [Partner.objects.create(name=name, partner_type='CLIENT') for name in ('목포횟집', '강남포차')]
+        Partner.objects.create(name='포항수산', partner_type='SUPPLIER')
+        zone = Zone.objects.create(name='냉동')
+        locations = [Location.objects.create(zone=zone, code=f'F-{i:02}') for i in range(2)]
+        products = [Product.objects.create(sku=f'FISH-{i}', name=f'광어 {i}', category='SEAFOOD', storage_type='FROZEN', price=1000)
+                    for i in range(2)] + [Product.objects.create(sku='BEEF-1', name='한우', category='MEAT', storage_type='COLD', price=5000)]
+        for i, status in enumerate(['PENDING', 'PENDING', 'ALLOCATED', 'SHIPPED', 'SHIPPED']):
+            order = Order.objects.create(client=cls.clients[i % 2], status=status)
+            Order.objects.filter(pk=order.pk).update(order_date=datetime(2026, 9, 1 + i, 10))
+            OrderItem.objects.create(order=order, product=products[i % 3], quantity=i + 1)
+        for i, product in enumerate(products):
+            Inventory.objects.create(product=product, location=locations[i % 2], quantity=10, batch_number=f'B{i}',
+                                     expiry_date=date(2026, 10, 1 + i))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_login_required(self):
+        self.client.logout()
+        for url in ('/api/v1/orders/', '/api/v1/inventory/', '/api/v1/products/', '/api/v1/partners/balances/'):
+            with self.subTest(url=url):
+                self.assertIn(self.client.get(url).status_code, (401, 403))
+
+    def test_cursor_pagination_visits_every_row_once(self):
+        ids = []; url = '/api/v1/orders/?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            self.assertLessEqual(len(page['results']), 2)
+            ids += [row['id'] for row in page['results']]
+            url = page['next']
+        self.assertEqual(ids, list(Order.objects.order_by('id').values_list('id', flat=True)))
+
+    def test_fields_whitelist(self):
+        rows = self.client.get('/api/v1/orders/?fields=status,client_name,items').json()['results']
+        self.assertEqual(set(rows[0]), {'id', 'status', 'client_name', 'items'})
+        self.assertEqual(set(rows[0]['items'][0]), {'product_id', 'quantity', 'supplied_weight', 'cost_price', 'final_amount', 'sku', 'product_name'})
+        # 계산용으로만 조회한 열은 응답에 없음
+        rows = self.client.get('/api/v1/partners/balances/?fields=balance').json()['results']
+        self.assertEqual(set(rows[0]), {'id', 'balance'})
+
+        response = self.client.get('/api/v1/products/?fields=sku,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['fields'])
+
+    def test_filters_match_html_lists(self):
+        cases = [
+            ('/api/v1/orders/', '/orders/', 'orders',
+             [f'client={self.clients[0].pk}', 'status=SHIPPED', 'start_date=2026-09-02&end_date=2026-09-04']),
+            ('/api/v1/inventory/', '/inventory/', 'inventories',
+             ['p_name=광어', 'sku=beef', 'start_date=2026-10-02']),
+            ('/api/v1/products/', '/products/', 'products', ['name=광어', 'category=MEAT', 'storage=FROZEN']),
+            ('/api/v1/partners/balances/', '/partners/', 'partners', ['name=포', 'partner_type=CLIENT']),
+        ]
+        for api_url, html_url, name, queries in cases:
+            for query in queries:
+                with self.subTest(url=api_url, query=query):
+                    expected = {obj.pk for obj in self.client.get(f'{html_url}?{query}').context[name]}
+                    rows = self.client.get(f'{api_url}?{query}&fields=id').json()['results']
+                    self.assertTrue(expected)
+                    self.assertEqual({row['id'] for row in rows}, expected)
+
+
+class ConditionalListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create_user('clerk', password='pw')
+        Product.objects.create(sku='A-1', name='광어', storage_type='COLD', price=1000)
+
+    def login(self):
+        self.client.post('/accounts/login/', {'username': 'clerk', 'password': 'pw'})
+
+    def get(self, etag=None):
+        return self.client.get('/products/', headers={'If-None-Match': etag} if etag else {})
+
+    def test_etag_follows_data(self):
+        self.login()
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(sku='A-2', name='우럭', storage_type='COLD', price=1000)
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, '우럭')
+
+    def test_relogin_gets_fresh_csrf_token(self):
+        self.login()
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(etag).status_code, 304)  # 토큰 마스킹이 매번 달라도 ETag 는 같음
+        self.client.post('/accounts/logout/')
+        self.login()  # 로그인하면 CSRF 비밀값이 바뀜
+        response = self.get(etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class RefDataCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.product = Product.objects.create(sku='A-1', name='광어', storage_type='COLD', price=1000)
+        zone = Zone.objects.create(name='냉장')
+        cls.locations = [Location.objects.create(zone=zone, code=code) for code in ('C-01', 'C-02')]
+        cls.partner = Partner.objects.create(name='포항수산', partner_type='SUPPLIER')
+
+    def setUp(self):
+        benchmarks.reset_caches()
+        self.addCleanup(benchmarks.reset_caches)
+
+    def assertChoices(self, form_class, field, expected):
+        # 프로세스 LRU 를 거친 값, LRU 를 비우고 Django 캐시에서 읽은 값 모두 확인
+        for clear_lru in (False, True):
+            if clear_lru:
+                refdata._load.cache_clear()
+            self.assertEqual([label for _, label in list(form_class().fields[field].choices)[1:]], expected)
+
+    def test_choices_follow_saves_and_deletes(self):
+        self.assertChoices(InboundForm, 'product', ['광어'])
+        self.assertChoices(InboundForm, 'location', ['C-01', 'C-02'])
+        self.assertChoices(PurchaseForm, 'supplier', ['[매입처] 포항수산'])
+        self.assertChoices(OrderForm, 'client', [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = '우럭'
+            self.product.save()
+            self.locations[0].delete()
+            self.partner.partner_type = 'CLIENT'
+            self.partner.save()
+        self.assertChoices(InboundForm, 'product', ['우럭'])
+        self.assertChoices(InboundForm, 'location', ['C-02'])
+        self.assertChoices(PurchaseForm, 'supplier', [])
+        self.assertChoices(OrderForm, 'client', ['[매출처] 포항수산'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.delete()
+        self.assertChoices(InboundForm, 'product', [])
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def product(self, pk, sku, name):
+        return refdata.ProductRef(pk, sku, name, 'EA', 1000, 500, 'SEAFOOD', 'FROZEN', 30)
+
+    def setUp(self):
+        self.refs = (self.product(1, 'DAK', '닭 가슴살'), self.product(2, 'D-2', '닭다리'),
+                     self.product(3, 'X-3', '냉동 닭갈비'), self.product(4, 'G-4', '갈치 필렛'), self.product(5, 'G-5', '가리비'))
+        self.index = search.PrefixIndex('product', 'sku', 'name')
+        self.index.sync(self.refs)
+
+    def ids(self, query, limit=search.DEFAULT_LIMIT):
+        return [ref.id for ref in self.index.search(query, limit)]
+
+    def test_decompose_and_initials(self):
+        self.assertEqual(search.decompose('닭 Ab'), 'ㄷㅏㄹㄱ ab')
+        self.assertEqual(search.decompose('왜'), 'ㅇㅗㅐ')
+        self.assertEqual(search.initials('갈치 필렛 2kg'), 'ㄱㅊㅍㄹ')
+        self.assertTrue(search.is_initials('ㄱㅊ'))
+        self.assertFalse(search.is_initials('ㄱ'))
+
+    def test_jamo_prefix(self):
+        # 입력 중인 음절 ('갈' -> '가리' 의 중간 상태, '달' -> '닭')
+        self.assertEqual(self.ids('갈'), [4, 5])
+        self.assertEqual(self.ids('달'), [1, 2, 3])
+        self.assertEqual(self.ids('가슴'), [1])
+
+    def test_initials(self):
+        self.assertEqual(self.ids('ㄱㅊ'), [4])
+        self.assertEqual(self.ids('ㅍㄹ'), [4])  # 두 번째 단어의 초성
+        self.assertEqual(self.ids('ㄷㄱ'), [3, 1])
+
+    def test_ranking_and_limit(self):
+        # 코드 > 이름 > 단어 순, 같은 순위는 자모(가나다) 순
+        self.assertEqual(self.ids('d'), [2, 1])
+        self.assertEqual(self.ids('닭'), [1, 2, 3])
+        self.assertEqual(self.ids('닭', limit=2), [1, 2])
+        self.assertEqual(self.ids(''), [4, 5, 3, 1, 2])
+
+    def test_sync_applies_only_changes(self):
+        refs = self.refs + tuple(self.product(pk, f'S-{pk}', f'상품 {pk}') for pk in range(6, 30))
+        self.index.sync(refs)
+        changed = (self.product(4, 'G-4', '삼치 필렛'),) + refs[:3] + refs[4:]
+        with mock.patch.object(self.index, 'rebuild', wraps=self.index.rebuild) as rebuild:
+            self.index.sync(changed)
+            self.index.sync(changed)  # 같은 튜플 -> 아무것도 안 함
+            rebuild.assert_not_called()
+            self.assertEqual(self.ids('ㅅㅊ'), [4])
+            self.assertEqual(self.ids('갈'), [5])
+            self.assertEqual(sum(len(entries) for entries in self.index.lists.values()),
+                             sum(len(self.index.keys_for(ref)) for ref in changed))
+            self.index.sync(changed[:10])  # 많이 바뀌면 다시 정렬
+            rebuild.assert_called_once()
+        self.assertEqual(self.ids('상품'), [10, 6, 7, 8, 9])
+
+    def test_searchable_filter(self):
+        index = search.PrefixIndex('location', 'code', searchable=lambda ref: ref.is_active)
+        index.sync((refdata.LocationRef(1, 'F-01', True), refdata.LocationRef(2, 'F-02', False)))
+        self.assertEqual([ref.id for ref in index.search('f-')], [1])
+        self.assertIn(2, index.refs)  # 선택된 값 표시용 조회는 가능
+
+
+@override_settings(REQUEST_PROFILING=True, PROFILING_SLOW_QUERY_MS=0, PROFILING_EXPLAIN=True)
+class RequestProfilingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk', password='pw')
+        Product.objects.create(sku='A-1', name='광어', storage_type='COLD', price=1000)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_server_timing_matches_executed_queries(self):
+        with CaptureQueriesContext(connection) as queries, self.assertLogs('fulfillment.profiling', 'INFO') as logs:
+            response = self.client.get('/products/')
+        executed = [q for q in queries if not q['sql'].startswith('EXPLAIN')]  # 계측용 EXPLAIN 은 집계하지 않음
+        timing = dict(part.split(';', 1) for part in response['Server-Timing'].split(', '))
+        self.assertEqual(set(timing), {'db', 'tpl', 'total'})
+        self.assertIn(f'desc="{len(executed)} queries"', timing['db'])
+
+        summary = json.loads(logs.records[0].getMessage())
+        self.assertEqual((summary['view'], summary['status'], summary['queries']), ('fulfillment:product_list', 200, len(executed)))
+        self.assertGreater(summary['tpl_ms'], 0)
+        self.assertLessEqual(len(summary['slowest']), settings.PROFILING_SLOWEST)
+        # 임계값 0 -> 모든 쿼리가 느린 쿼리 경고 (SELECT 는 EXPLAIN 포함)
+        slow = [json.loads(record.getMessage())['slow_query'] for record in logs.records if record.levelname == 'WARNING']
+        self.assertEqual(len(slow), len(executed))
+        self.assertTrue(any(entry['explain'] for entry in slow if entry['sql'].startswith('SELECT')))
+
+    def test_template_patch_is_global_and_idempotent(self):
+        from django.template.backends.django import Template
+        with self.assertLogs('fulfillment.profiling', 'INFO'):
+            self.client.get('/products/')
+        patched = Template.render
+        self.assertEqual(patched.__module__, 'fulfillment.middleware')
+        middleware._patch_template_render()
+        self.assertIs(Template.render, patched)  # 두 번 감싸지 않음
+        # 계측 중이 아닐 때는 원래 render 그대로
+        self.assertEqual(engines['django'].from_string('{{ name }}').render({'name': '광어'}), '광어')
+
+    @override_settings(REQUEST_PROFILING=False)
+    def test_disabled_middleware_is_removed(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            middleware.RequestProfilingMiddleware(lambda request: None)
+        self.assertNotIn('Server-Timing', self.client.get('/products/'))
+
+
+class WriteTransactionTests(TransactionTestCase):
+    def setUp(self):
+        self.product = Product.objects.create(sku='A-1', name='광어', storage_type='COLD', price=1000)
+        self.short = Product.objects.create(sku='B-1', name='우럭', storage_type='COLD', price=1000)
+        zone = Zone.objects.create(name='냉장')
+        location = Location.objects.create(zone=zone, code='C-01')
+        self.stock = Inventory.objects.create(product=self.product, location=location, quantity=10, batch_number='B1',
+                                              expiry_date=date(2030, 1, 1))
+        self.order = Order.objects.create(client=Partner.objects.create(name='목포횟집', partner_type='CLIENT'))
+        OrderItem.objects.create(order=self.order, product=self.product, quantity=4)
+
+    def test_lock_errors_are_retried_with_backoff(self):
+        calls = []
+
+        @db.write_transaction(attempts=3)
+        def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise OperationalError('database is locked')
+            return 'ok'
+
+        stats = dict(db.lock_stats)
+        with mock.patch('fulfillment.db.time.sleep') as sleep, self.assertLogs('fulfillment.db', 'WARNING'):
+            self.assertEqual(flaky(), 'ok')
+        delays = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(delays), 2)
+        self.assertLess(delays[0], delays[1])  # 지수 백오프
+        self.assertEqual(db.lock_stats['retries'], stats['retries'] + 2)
+
+        calls.clear()
+        with mock.patch('fulfillment.db.time.sleep'), self.assertLogs('fulfillment.db', 'WARNING'):
+            with self.assertRaises(OperationalError):
+                db.write_transaction(attempts=2)(flaky)()
+        self.assertEqual((len(calls), db.lock_stats['failures']), (2, stats['failures'] + 1))
+
+        @db.write_transaction
+        def broken():
+            calls.append(1)
+            raise OperationalError('no such table: x')
+        calls.clear()
+        with self.assertRaises(OperationalError):
+            broken()
+        self.assertEqual(len(calls), 1)  # 잠금 오류가 아니면 재시도하지 않음
+
+    def test_order_import_retries_only_the_write(self):
+        bulk_create = Order.objects.bulk_create
+        calls = []
+
+        def locked_once(*args, **kwargs):
+            calls.append(1)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return bulk_create(*args, **kwargs)
+
+        upload = io.BytesIO('거래처,SKU,수량\n목포횟집,A-1,2'.encode())
+        with mock.patch.object(Order.objects, 'bulk_create', side_effect=locked_once), \
+                mock.patch('fulfillment.db.time.sleep'), self.assertLogs('fulfillment.db', 'WARNING'):
+            result, orders = importers.import_orders(upload, 'orders.csv')
+        self.assertEqual((len(calls), result.created), (2, 1))
+        self.assertEqual(OrderItem.objects.filter(order=orders[0]).count(), 1)
+
+    def test_nested_failure_rolls_back_to_savepoint(self):
+        OrderItem.objects.create(order=self.order, product=self.short, quantity=1)  # 재고 없음
+        with transaction.atomic():
+            with self.assertRaises(ValidationError):
+                services.create_picking_list(self.order)  # 첫 품목은 할당된 뒤 실패
+            self.assertFalse(PickingList.objects.exists())
+        self.stock.refresh_from_db()
+        self.assertEqual(self.stock.quantity, 10)
+
+    def test_concurrent_allocations_of_one_order(self):
+        barrier = threading.Barrier(2)
+        errors = []
+
+        def allocate():
+            try:
+                order = Order.objects.get(pk=self.order.pk)
+                barrier.wait()
+                services.create_picking_list(order)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=allocate) for _ in range(2)]
+        with mock.patch('fulfillment.db.logger'):  # 잠금 재시도 경고는 실행마다 다름
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.stock.refresh_from_db()
+        self.assertEqual((PickingList.objects.count(), self.stock.quantity), (1, 6))
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, 'ALLOCATED')
+
+
+class ReportingRouterTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch('fulfillment.routers.replica_configured', return_value=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = routers.ReportingRouter()
+
+    def read(self):
+        return self.router.db_for_read(Product) or 'default'
+
+    def request(self, cookie=None, write=None):
+        """미들웨어를 거친 요청 -> (뷰 안에서 본 읽기 DB, 응답)"""
+        seen = []
+
+        def view(request):
+            with routers.reporting():
+                if write is not None:
+                    self.router.db_for_write(write)
+                seen.append(self.read())
+            return HttpResponse()
+        request = RequestFactory().get('/')
+        if cookie is not None:
+            request.COOKIES[routers.STICKY_COOKIE] = cookie
+        response = routers.ReplicaStickinessMiddleware(view)(request)
+        return seen[0], response
+
+    def test_reads_go_to_replica_only_inside_reporting(self):
+        self.assertEqual(self.read(), 'default')
+        with routers.reporting():
+            self.assertEqual(self.read(), 'reporting')
+            with mock.patch.object(connections['default'], 'in_atomic_block', True):
+                self.assertEqual(self.read(), 'default')  # 트랜잭션 안
+            self.assertEqual(self.router.db_for_write(Product), 'default')
+            self.assertEqual(self.read(), 'default')  # 이 요청에서 쓰기 후
+        with mock.patch('fulfillment.routers.replica_configured', return_value=False), routers.reporting():
+            self.assertEqual(self.read(), 'default')
+
+    def test_session_writes_do_not_pin(self):
+        with routers.reporting():
+            self.router.db_for_write(Session)
+            self.assertEqual(self.read(), 'reporting')
+        self.assertEqual(self.request(write=Session)[1].cookies.get(routers.STICKY_COOKIE), None)
+
+    def test_sticky_cookie(self):
+        db_alias, response = self.request(write=Product)
+        self.assertEqual(db_alias, 'default')
+        cookie = response.cookies[routers.STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPORTING_STICKY_SECONDS)
+        self.assertEqual(self.request(cookie=cookie.value)[0], 'default')  # 최근에 쓴 사용자
+        self.assertEqual(self.request(cookie=str(int(time.time()) - 1))[0], 'reporting')  # 만료
+        self.assertEqual(self.request(cookie='garbage')[0], 'reporting')
+        self.assertNotIn(routers.STICKY_COOKIE, self.request()[1].cookies)
+
+
+class HitCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = User.objects.create_user('author', password='pw')
+        cls.reader = User.objects.create_user('reader', password='pw')
+        cls.notice = Notice.objects.create(title='공지', content='내용', author=author)
+
+    def setUp(self):
+        counters.flush()
+        self.client.force_login(self.reader)
+
+    def test_views_are_buffered_then_added_without_touching_updated_at(self):
+        url = f'/notices/{self.notice.pk}/'
+        with override_settings(HIT_COUNTER_FLUSH_SECONDS=3600):
+            for _ in range(3):
+                response = self.client.get(url)
+        self.assertContains(response, '3회 조회')  # 반영 전에도 화면에는 포함
+        self.assertEqual(Notice.objects.get(pk=self.notice.pk).views, 0)
+
+        with override_settings(HIT_COUNTER_FLUSH_SECONDS=0):
+            self.client.get(url)
+        notice = Notice.objects.get(pk=self.notice.pk)
+        self.assertEqual(notice.views, 4)
+        self.assertEqual(notice.updated_at, self.notice.updated_at)
+        self.assertEqual(counters.pending(Notice, notice.pk), 0)
+
+
+class FullTextSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.employee = Employee.objects.create(name='김철수', position='사원', join_date=date(2024, 1, 1), base_salary=3_000_000)
+        WorkLog.objects.bulk_create([  # bulk_create 도 트리거로 색인됨
+            WorkLog(date=date(2026, 9, 1), employee=cls.employee, content='냉동창고 재고 점검', issues='고등어 <b>파손</b> 3박스'),
+            WorkLog(date=date(2026, 9, 2), employee=cls.employee, content='고등어 입고 검수 완료'),
+            WorkLog(date=date(2026, 9, 3), employee=cls.employee, content='차량 점검'),
+        ])
+
+    def search(self, query, queryset=None):
+        return list(fulltext.search('worklog', query, queryset)[:10])
+
+    def test_prefix_terms_snippet_and_filter(self):
+        self.assertEqual(len(self.search('고등어')), 2)
+        [hit] = self.search('고등 파손')  # 모든 단어, 접두어 일치
+        self.assertIn('<mark>파손</mark>', hit.search_snippet)
+        self.assertIn('&lt;b&gt;', hit.search_snippet)  # 본문 HTML 은 이스케이프
+        self.assertEqual(self.search('고등어', WorkLog.objects.filter(date=date(2026, 9, 2)))[0].content, '고등어 입고 검수 완료')
+        self.assertEqual(self.search('!!!'), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        log = WorkLog.objects.get(content='차량 점검')
+        log.content = '지게차 수리'
+        log.save()
+        self.assertEqual(self.search('차량'), [])
+        self.assertEqual(len(self.search('지게차')), 1)
+        WorkLog.objects.filter(content__startswith='고등어').delete()
+        self.assertEqual(len(self.search('고등어')), 1)
+
+
+# ---------------------------------------------------------
+#  첨부 전달 (Range / ETag / X-Accel) + 썸네일 캐시
+# ---------------------------------------------------------
+class NoticeAttachmentTests(TempMediaMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('reader', password='pw')
+        cls.notice = Notice.objects.create(title='공지', content='내용', author=cls.user)
+        cls.notice.file.save('도면.png', ContentFile(benchmarks._sample_image()))
+        cls.data = cls.notice.file.read()
+        cls.notice.file.close()
+        cls.url = f'/notices/{cls.notice.pk}/file/'
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+    def test_full_range_and_conditional(self):
+        response = self.client.get(self.url + '?v=1')
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('immutable', response['Cache-Control'])
+        etag = response['ETag']
+
+        response = self.client.get(self.url, headers={'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 10-19/{len(self.data)}')
+        self.assertEqual(b''.join(response.streaming_content), self.data[10:20])
+        response = self.client.get(self.url, headers={'Range': 'bytes=-5'})
+        self.assertEqual(b''.join(response.streaming_content), self.data[-5:])
+        response = self.client.get(self.url, headers={'Range': 'bytes=0-3', 'If-Range': '"old"'})
+        self.assertEqual(response.status_code, 200)  # 파일이 바뀌었으면 전체 전송
+        self.assertEqual(self.client.get(self.url, headers={'Range': f'bytes={len(self.data)}-'}).status_code, 416)
+        self.assertEqual(self.client.get(self.url, headers={'If-None-Match': etag}).status_code, 304)
+
+    def test_sendfile_backend_hands_off_to_web_server(self):
+        with override_settings(SENDFILE_BACKEND='x-accel'):
+            response = self.client.get(self.url + '?download=1')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/notices/%EB%8F%84%EB%A9%B4.png')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+        self.assertEqual(response.content, b'')
+
+    def test_thumbnail_is_cached_on_disk(self):
+        response = self.client.get(f'/notices/{self.notice.pk}/thumbnail/')
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        b''.join(response.streaming_content)
+        path = attachments.get_thumbnail(self.notice.file, f'notice-{self.notice.pk}')
+        self.assertEqual(os.listdir(settings.THUMBNAIL_CACHE_DIR), [os.path.basename(path)])
+        self.assertContains(self.client.get('/notices/'), f'/notices/{self.notice.pk}/thumbnail/')
+
+
+# ---------------------------------------------------------
+#  대시보드 템플릿 조각 캐시 (버전 키)
+# ---------------------------------------------------------
+class DashboardFragmentCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser('boss', password='pw')
+
+    def setUp(self):
+        benchmarks.reset_caches()
+        self.client.force_login(self.user)
+
+    def test_cached_fragments_skip_queries_until_data_changes(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get('/dashboard/')
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get('/dashboard/')
+        self.assertLess(len(warm), len(cold) - 5)
+        self.assertContains(response, '등록된 공지사항이 없습니다.')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Notice.objects.create(title='재고 실사 안내', content='내용', author=self.user, is_important=True)
+        response = self.client.get('/dashboard/')
+        self.assertContains(response, '재고 실사 안내')  # Notice 버전이 바뀌어 그 조각만 다시 렌더링
+
+    def test_async_view_runs_only_missing_fragments(self):
+        ran = []
+
+        async def acollect(blocks):
+            ran.append([block.__name__ for block in blocks])
+            return await original(blocks)
+        original = reports.acollect
+        with mock.patch('fulfillment.reports.acollect', acollect):
+            self.client.get('/dashboard/async/')
+            self.client.get('/dashboard/async/')
+            with self.captureOnCommitCallbacks(execute=True):
+                Notice.objects.create(title='재고 실사 안내', content='내용', author=self.user)
+            response = self.client.get('/dashboard/async/')
+        self.assertEqual(ran, [[block.__name__ for block in reports.dashboard_blocks(date.today())], ['recent_notices']])
+        self.assertContains(response, '재고 실사 안내')
+
+
+class AsyncReportEquivalenceTests(TransactionTestCase):
+    """acollect() (순서대로 / 블록별 스레드 동시 실행) 결과가 동기 collect() 와 같은지"""
+    def setUp(self):
+        today = date.today()
+        client = Partner.objects.create(name='목포횟집', partner_type='CLIENT')
+        supplier = Partner.objects.create(name='포항수산', partner_type='SUPPLIER', initial_balance=-30_000)
+        product = Product.objects.create(sku='A-1', name='광어', storage_type='COLD', price=1000)
+        location = Location.objects.create(zone=Zone.objects.create(name='냉장'), code='C-01')
+        for amount, status in ((50_000, 'SHIPPED'), (20_000, 'SHIPPED'), (9_000, 'PENDING')):
+            order = Order.objects.create(client=client, status=status, total_revenue=amount, total_cogs=amount // 2)
+            OrderItem.objects.create(order=order, product=product, quantity=1, final_amount=amount)
+        Expense.objects.create(date=today, category='운반비', amount=7_000)
+        Payment.objects.create(partner=supplier, date=today, payment_type='OUTBOUND', amount=10_000)
+        Inventory.objects.create(product=product, location=location, quantity=3, batch_number='B1', expiry_date=today)
+        Notice.objects.create(title='공지', content='내용', author=User.objects.create_user('boss'))
+
+    def test_async_context_matches_sync(self):
+        today = date.today()
+        start, end = reports.month_range()
+        sync_dashboard = reports.lazy_dashboard(today)
+        expected = {name: dict(sync_dashboard[name].items()) for name in reports.DASHBOARD_FRAGMENTS}
+        expected_monthly = reports.monthly_context(start, reports.collect(reports.monthly_blocks(start, end)))
+        self.assertEqual(expected['kpi']['month_revenue'], 70_000)
+        for concurrent in (False, True):
+            with self.subTest(concurrent=concurrent), \
+                    mock.patch('fulfillment.reports.runs_concurrently', return_value=concurrent):
+                context = async_to_sync(reports.adashboard)(today)
+                for name, data in expected.items():
+                    self.assertEqual({key: context[name][key] for key in data}, data)
+                monthly = reports.monthly_context(start, async_to_sync(reports.acollect)(reports.monthly_blocks(start, end)))
+                self.assertEqual(monthly, expected_monthly)
+
+
+# ---------------------------------------------------------
+#  세션 / 로그인 사용자 캐시 - 요청마다 세션/사용자 조회 없음 + 변경 시 즉시 무효화
+# ---------------------------------------------------------
+class AuthCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('staff', password='old-password')
+
+    def setUp(self):
+        # 워커끼리 공유되는 캐시 (파일 캐시 - 다른 프로세스의 연결도 같은 저장소를 봄)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+        override = override_settings(
+            CACHES={'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tmp.name}},
+            SESSION_ENGINE='django.contrib.sessions.backends.cached_db', AUTH_USER_CACHE_SECONDS=300,
+        )
+        override.enable()
+        self.addCleanup(override.disable)
+        benchmarks.reset_caches()
+        self.client.login(username='staff', password='old-password')
+
+    def test_warm_request_skips_session_and_user_queries(self):
+        self.client.get('/worklogs/create/')
+        with CaptureQueriesContext(connection) as warm:
+            self.client.get('/worklogs/create/')
+        self.assertEqual(len(warm), 0)
+
+    def test_password_change_and_account_deletion_take_effect_immediately(self):
+        self.assertEqual(self.client.get('/notices/').status_code, 200)
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(self.client.get('/notices/').status_code, 302)  # 세션 해시 불일치 -> 로그아웃
+
+        self.client.login(username='staff', password='new-password')
+        self.client.get('/notices/')
+        User.objects.get(username='staff').delete()  # 관리자 화면 등 다른 경로의 삭제 (세션은 남아 있음)
+        self.assertEqual(self.client.get('/notices/').status_code, 302)
+
+    def test_change_in_another_worker_invalidates_shared_cache(self):
+        self.assertEqual(self.client.get('/notices/').status_code, 200)  # 이 워커가 사용자를 캐시
+        other_worker = FileBasedCache(self.cache_dir, {})  # 다른 프로세스의 캐시 연결
+        with mock.patch('fulfillment.auth.cache', other_worker):
+            user = User.objects.get(username='staff')
+            user.is_active = False
+            user.save()
+        self.assertEqual(self.client.get('/notices/').status_code, 302)
+
+    def test_process_local_cache_disables_user_and_session_cache(self):
+        locmem = 'django.core.cache.backends.locmem.LocMemCache'
+        redis = 'django.core.cache.backends.redis.RedisCache'
+        expression = '(s.AUTH_USER_CACHE_SECONDS, s.SESSION_ENGINE.rsplit(".", 1)[1])'
+        self.assertEqual(load_settings(expression, CACHE_BACKEND=locmem, AUTH_USER_CACHE_SECONDS=None, SESSION_STORE=None).stdout.strip(), "(0, 'db')")
+        self.assertEqual(load_settings(expression, CACHE_BACKEND=redis, AUTH_USER_CACHE_SECONDS=None, SESSION_STORE=None).stdout.strip(), "(300, 'cached_db')")
+        for env in ({'AUTH_USER_CACHE_SECONDS': '300'}, {'SESSION_STORE': 'cached_db'}):
+            with self.subTest(**env):
+                result = load_settings(expression, CACHE_BACKEND=locmem, **env)
+                self.assertNotEqual(result.returncode, 0)
+                self.assertIn('공유 CACHE_BACKEND', result.stderr)
+
+    def test_delete_account_logs_out(self):
+        self.client.get('/notices/')
+        self.assertEqual(self.client.post('/accounts/delete/').status_code, 302)
+        self.assertFalse(User.objects.filter(username='staff').exists())
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+
+# ---------------------------------------------------------
+#  거래명세서 PDF 디스크 캐시 (WeasyPrint 없이 render_pdf 대체)
+# ---------------------------------------------------------
+class InvoiceCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        client = Partner.objects.create(name='강남포차', partner_type='CLIENT')
+        product = Product.objects.create(sku='FISH-1', name='고등어', storage_type='FROZEN', price=10_000)
+        cls.order = Order.objects.create(client=client, status='SHIPPED', total_revenue=30_000)
+        OrderItem.objects.create(order=cls.order, product=product, quantity=3)
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(INVOICE_CACHE_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch('fulfillment.services.render_pdf', side_effect=lambda html, base_url=None: f'%PDF {len(html)}'.encode())
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def reload(self):
+        return Order.objects.select_related('client').get(pk=self.order.pk)
+
+    def test_hit_miss_and_new_version_replaces_old_file(self):
+        with self.assertLogs('fulfillment.services', 'INFO') as logs:
+            pdf, hit = services.get_invoice_pdf(self.reload())
+            self.assertFalse(hit)
+            self.assertEqual(services.get_invoice_pdf(self.reload()), (pdf, True))
+        self.assertEqual(self.render.call_count, 1)
+        self.assertEqual(len(logs.records), 1)  # 적중은 렌더링 로그 없음
+        first = os.listdir(settings.INVOICE_CACHE_DIR)
+        self.assertEqual(len(first), 1)  # 임시 파일(.tmp) 없이 원자적 교체
+
+        Order.objects.filter(pk=self.order.pk).update(memo='오전 배송')  # 명세서 내용 변경 -> 새 버전
+        with self.assertLogs('fulfillment.services', 'INFO'):
+            _, hit = services.get_invoice_pdf(self.reload())
+        self.assertFalse(hit)
+        files = os.listdir(settings.INVOICE_CACHE_DIR)
+        self.assertEqual(len(files), 1)
+        self.assertNotEqual(files, first)
+
+    def test_clear_and_unshipped_orders_are_not_cached(self):
+        with self.assertLogs('fulfillment.services', 'INFO') as logs:
+            services.get_invoice_pdf(self.reload())
+            services.clear_invoice_cache(self.order.pk)
+            self.assertEqual(os.listdir(settings.INVOICE_CACHE_DIR), [])
+            self.assertFalse(services.get_invoice_pdf(self.reload())[1])
+
+            Order.objects.filter(pk=self.order.pk).update(status='PENDING')
+            services.clear_invoice_cache(self.order.pk)
+            services.get_invoice_pdf(self.reload())
+        self.assertEqual(os.listdir(settings.INVOICE_CACHE_DIR), [])
+        self.assertEqual(len(logs.records), 3)
+
+
+# ---------------------------------------------------------
+#  일괄 거래명세서 - 조건 검증 / 직전 잔액 / PDF·ZIP 묶음 (render_pdfs 대체)
+# ---------------------------------------------------------
+def blank_pdf(pages=1):
+    import pypdf
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=72, height=72)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class InvoiceBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('clerk', password='pw')
+        cls.partner = Partner.objects.create(name='강남포차', partner_type='CLIENT', initial_balance=100_000)
+        cls.orders = [Order.objects.create(client=cls.partner, status='SHIPPED', total_revenue=10_000 * (i + 1)) for i in range(3)]
+        Payment.objects.create(partner=cls.partner, date=date.today(), payment_type='INBOUND', amount=25_000)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        override = override_settings(INVOICE_CACHE_DIR=tmp.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch('fulfillment.services.render_pdfs', side_effect=lambda htmls, **kwargs: [blank_pdf() for _ in htmls])
+        self.render = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_previous_balances_match_per_order_calculation(self):
+        orders = Order.objects.select_related('client').order_by('id')
+        self.assertEqual(services.calc_previous_balances(orders), {o.id: services.calc_previous_balance(o) for o in orders})
+
+    def test_invalid_parameters_redirect_with_message(self):
+        for query in ('start_date=2026-13-45', 'client=abc', 'end_date=2026-09-01', 'start_date=2026-09-02&end_date=2026-09-01'):
+            with self.subTest(query=query):
+                response = self.client.get(f'/orders/invoices/?{query}')
+                self.assertRedirects(response, '/orders/', fetch_redirect_response=False)
+                self.assertIn('조건 오류', str(list(response.wsgi_request._messages)[0]))
+        self.render.assert_not_called()
+
+    def test_zip_and_merged_pdf(self):
+        ids = ','.join(str(o.pk) for o in self.orders)
+        with self.assertLogs('fulfillment.services', 'INFO') as logs:
+            response = self.client.get(f'/orders/invoices/?ids={ids}&format=zip')
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertEqual(len(zipfile.ZipFile(io.BytesIO(response.content)).namelist()), 3)
+        self.assertIn('batch rendered 3 invoices', logs.output[0])
+
+        response = self.client.get(f'/orders/invoices/?start_date={date.today()}')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        import pypdf
+        self.assertEqual(len(pypdf.PdfReader(io.BytesIO(response.content)).pages), 3)
+        self.assertEqual(self.render.call_count, 1)  # 두 번째 요청은 디스크 캐시
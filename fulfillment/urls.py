@@ -1,5 +1,6 @@
 from django.urls import path
-from . import views
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+from . import views, api
 
 app_name = 'fulfillment'
 
@@ -7,6 +8,7 @@ urlpatterns = [
     # 메인 페이지 (대시보드)
     path('', views.dashboard, name='index'), 
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/async/', views.dashboard_async, name='dashboard_async'),
 
     # 0. 인증 (회원가입 등) - ★ [누락되어 오류 났던 부분 추가]
     path('signup/', views.signup, name='signup'),
@@ -32,6 +34,7 @@ urlpatterns = [
     # 4. 주문/출고 (+엑셀)
     path('orders/', views.order_list, name='order_list'),
     path('orders/create/', views.order_create, name='order_create'),
+    path('orders/import/', views.order_import, name='order_import'),
     path('orders/update/<int:pk>/', views.order_update, name='order_update'),
     path('orders/delete/<int:pk>/', views.order_delete, name='order_delete'),
     path('orders/export/', views.export_order_excel, name='export_order_excel'),
@@ -40,9 +43,11 @@ urlpatterns = [
     path('order/<int:pk>/allocate/', views.order_allocate, name='order_allocate'),
     path('order/<int:order_id>/weight/', views.process_weight, name='process_weight'),
     path('order/<int:order_id>/invoice/', views.generate_invoice_pdf, name='generate_invoice'),
+    path('orders/invoices/', views.invoice_batch, name='invoice_batch'),
 
     # 5. 재무/회계
     path('report/monthly/', views.monthly_report, name='monthly_report'),
+    path('report/monthly/async/', views.monthly_report_async, name='monthly_report_async'),
     path('expenses/', views.expense_list, name='expense_list'),
     path('expenses/create/', views.expense_create, name='expense_create'),
     path('expenses/update/<int:pk>/', views.expense_update, name='expense_update'),
@@ -56,6 +61,7 @@ urlpatterns = [
 
     path('payrolls/', views.payroll_list, name='payroll_list'),
     path('payrolls/create/', views.payroll_create, name='payroll_create'),
+    path('payrolls/run/', views.payroll_run, name='payroll_run'),
     path('payrolls/update/<int:pk>/', views.payroll_update, name='payroll_update'),
     path('payrolls/delete/<int:pk>/', views.payroll_delete, name='payroll_delete'),
 
@@ -85,6 +91,9 @@ urlpatterns = [
     path('products/update/<int:pk>/', views.product_update, name='product_update'),
     path('products/delete/<int:pk>/', views.product_delete, name='product_delete'),
 
+    # 대량 업로드 (엑셀/CSV)
+    path('import/', views.data_import, name='data_import'),
+
     # 9. 기초정보 - 회사 및 계좌
     path('settings/company/', views.company_update, name='company_update'),
     
@@ -92,6 +101,8 @@ urlpatterns = [
     path('banks/create/', views.bank_create, name='bank_create'),
     path('banks/transaction/create/', views.bank_transaction_create, name='bank_transaction_create'),
     path('banks/<int:pk>/', views.bank_detail, name='bank_detail'),
+    path('banks/<int:pk>/statement/import/', views.bank_statement_import, name='bank_statement_import'),
+    path('banks/<int:pk>/reconciliation/', views.bank_reconciliation, name='bank_reconciliation'),
     # ★ [추가] 입출금 내역 수정/삭제
     path('banks/transaction/update/<int:pk>/', views.bank_transaction_update, name='bank_transaction_update'),
     path('banks/transaction/delete/<int:pk>/', views.bank_transaction_delete, name='bank_transaction_delete'),
@@ -102,9 +113,22 @@ urlpatterns = [
     path('zones/delete/<int:pk>/', views.zone_delete, name='zone_delete'),
     path('locations/create/', views.location_create, name='location_create'),
     path('locations/delete/<int:pk>/', views.location_delete, name='location_delete'),
+    # 상품/위치 검색 (타입어헤드)
+    path('search/products/', views.product_search, name='product_search'),
+    path('search/locations/', views.location_search, name='location_search'),
 
     # ★ 11. 공지사항 (Notices) - [이 부분이 없어서 base.html이 터짐]
     path('notices/', views.notice_list, name='notice_list'),
     path('notices/create/', views.notice_create, name='notice_create'),
     path('notices/<int:pk>/', views.notice_detail, name='notice_detail'),
+    path('notices/<int:pk>/file/', views.notice_file, name='notice_file'),
+    path('notices/<int:pk>/thumbnail/', views.notice_thumbnail, name='notice_thumbnail'),
+
+    # 12. 읽기 전용 API (v1)
+    path('api/v1/token/', TokenObtainPairView.as_view(), name='api_token'),
+    path('api/v1/token/refresh/', TokenRefreshView.as_view(), name='api_token_refresh'),
+    path('api/v1/orders/', api.OrderListAPI.as_view(), name='api_orders'),
+    path('api/v1/inventory/', api.InventoryListAPI.as_view(), name='api_inventory'),
+    path('api/v1/products/', api.ProductListAPI.as_view(), name='api_products'),
+    path('api/v1/partners/balances/', api.PartnerBalanceListAPI.as_view(), name='api_partner_balances'),
 ]
\ No newline at end of file
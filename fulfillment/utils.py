@@ -1,20 +1,94 @@
-import barcode
-from barcode.writer import ImageWriter
+import importlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from io import BytesIO
 import base64
-import openpyxl
 from django.http import HttpResponse
 from django.utils import timezone
 
+logger = logging.getLogger(__name__)
+
+# ---------------------------------------------------------
+#  무거운 라이브러리 지연 로딩 (Lazy import)
+#  PDF/엑셀/이미지 스택은 처음 쓰는 순간에만 import 하여
+#  목록 화면만 처리하는 워커의 부팅 시간과 메모리를 줄입니다.
+# ---------------------------------------------------------
+HEAVY_LIBRARIES = ('openpyxl', 'barcode', 'barcode.writer', 'PIL', 'weasyprint', 'pypdf')
+
+def get_openpyxl():
+    import openpyxl
+    import openpyxl.styles
+    return openpyxl
+
+def get_barcode():
+    import barcode
+    import barcode.writer  # ImageWriter -> Pillow 로드
+    return barcode
+
+def get_weasyprint():
+    import weasyprint
+    return weasyprint
+
+def get_pypdf():
+    import pypdf
+    return pypdf
+
+def get_pillow():
+    from PIL import Image, ImageOps  # noqa: F401 (썸네일용)
+    return Image
+
+def preload_heavy_libraries(names=HEAVY_LIBRARIES):
+    """
+    워커 시작 시 미리 로드 (설정 PRELOAD_HEAVY_LIBS 또는 gunicorn post_fork 훅에서 호출).
+    네이티브 라이브러리가 없는 환경에서도 서버가 죽지 않도록 실패는 경고만 남깁니다.
+    """
+    loaded = []
+    for name in names:
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except (ImportError, OSError) as e:
+            logger.warning("preload of %s failed: %s", name, e)
+    return loaded
+
 def generate_barcode_image(data):
     """바코드 이미지 생성 함수"""
+    barcode = get_barcode()
     Code128 = barcode.get_barcode_class('code128')
-    writer = ImageWriter()
+    writer = barcode.writer.ImageWriter()
     rv = BytesIO()
     Code128(data, writer=writer).write(rv, options={'module_height': 8, 'font_size': 10})
     image_data = base64.b64encode(rv.getvalue()).decode('utf-8')
     return f"data:image/png;base64,{image_data}"
 
+def render_pdf(html, base_url=None):
+    """HTML 문자열을 WeasyPrint로 PDF(bytes) 변환"""
+    return get_weasyprint().HTML(string=html, base_url=base_url).write_pdf()
+
+def render_pdfs(htmls, base_url=None, workers=1):
+    """
+    여러 HTML을 PDF로 변환 (순서 유지).
+    workers > 1 이면 별도 프로세스에서 병렬 렌더링합니다.
+    부모의 DB 연결을 물려받지 않도록 fork 대신 spawn 으로 워커를 띄웁니다.
+    """
+    htmls = list(htmls)
+    workers = min(workers, len(htmls))
+    if workers <= 1:
+        return [render_pdf(html, base_url) for html in htmls]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(render_pdf, htmls, [base_url] * len(htmls)))
+
+def merge_pdfs(pdfs):
+    """PDF(bytes) 여러 개를 한 파일로 병합"""
+    pypdf = get_pypdf()
+    writer = pypdf.PdfWriter()
+    for pdf in pdfs:
+        writer.append(pypdf.PdfReader(BytesIO(pdf)))
+    out = BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
 def export_to_excel(queryset, filename, columns):
     """
     엑셀 다운로드 공통 함수
@@ -29,6 +103,7 @@ def export_to_excel(queryset, filename, columns):
     file_name = f"{filename}_{timezone.now().strftime('%Y%m%d')}.xlsx"
     response['Content-Disposition'] = f'attachment; filename="{file_name}"'
 
+    openpyxl = get_openpyxl()
     wb = openpyxl.Workbook()
     ws = wb.active
     ws.title = "Data"
@@ -0,0 +1,153 @@
+"""
+테이블별 변경 카운터 - 조건부 GET(ETag / Last-Modified)
+
+- 모델 save/delete 시 signal 로 해당 테이블 카운터 +1 (트랜잭션 커밋 후 1회)
+- bulk_create / update() 처럼 signal 이 없는 경로는 mark_changed() 를 직접 호출
+- 요청 처리 중에는 카운터 조회 결과를 요청 단위로 재사용 (폼/폼셋 여러 곳에서 불러도 1회)
+- @etag_by_versions(Product, ...) : 의존 테이블 카운터 + 경로/쿼리스트링 + 사용자 + CSRF 비밀값으로 ETag 생성,
+  데이터가 그대로면 본 쿼리/렌더링 없이 304 응답
+- version_key() : 같은 카운터로 만든 캐시 키 (기준 데이터 캐시, 대시보드 템플릿 조각)
+"""
+import hashlib
+import threading
+from functools import wraps
+
+from django.contrib.messages import get_messages
+from django.middleware.csrf import get_token
+from django.db import transaction
+from django.db.models import F
+from django.core.signals import request_started, request_finished
+from django.db.models.signals import post_save, post_delete
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from .models import TableVersion
+
+_local = threading.local()
+
+
+def _label(model):
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def _flush():
+    labels = getattr(_local, 'pending', None)
+    if not labels:
+        return
+    _local.pending = set()
+    memo = getattr(_local, 'memo', None)
+    now = timezone.now()
+    for label in sorted(labels):
+        rows = TableVersion.objects.filter(label=label)
+        if not rows.update(version=F('version') + 1, updated_at=now):
+            TableVersion.objects.bulk_create([TableVersion(label=label)], ignore_conflicts=True)
+            rows.update(version=F('version') + 1, updated_at=now)
+        if memo is not None:
+            memo.pop(label, None)
+
+
+def mark_changed(*models):
+    """
+    테이블 변경 기록. 트랜잭션 안이면 커밋 후 테이블당 1회만 증가
+    (롤백되면 on_commit 이 실행되지 않음 - 남은 라벨은 다음 커밋 때 함께 증가하며 이는 무해)
+    """
+    pending = getattr(_local, 'pending', None)
+    if pending is None:
+        pending = _local.pending = set()
+    pending.update(_label(model) for model in models)
+    transaction.on_commit(_flush)
+
+
+def has_pending(models):
+    """이 스레드에 아직 커밋되지 않은(또는 롤백된) 변경이 있는 테이블인지 - 공유 캐시 사용 금지"""
+    pending = getattr(_local, 'pending', None)
+    return bool(pending) and any(_label(model) in pending for model in models)
+
+
+def get_versions(models):
+    """{label: (version, updated_at)} - 기록이 없는 테이블은 (0, None)"""
+    labels = [_label(model) for model in models]
+    memo = getattr(_local, 'memo', None)
+    if memo is None:
+        memo = {}
+    missing = [label for label in labels if label not in memo]
+    if missing:
+        found = {label: (version, updated_at) for label, version, updated_at in
+                 TableVersion.objects.filter(label__in=missing).values_list('label', 'version', 'updated_at')}
+        for label in missing:
+            memo[label] = found.get(label, (0, None))
+    return {label: memo[label] for label in labels}
+
+
+def version_key(models):
+    """
+    캐시 키용 버전 문자열 (refdata / 템플릿 조각)
+    카운터 + 변경 시각 - DB 초기화로 카운터가 되돌아가도 이전 캐시와 겹치지 않도록
+    """
+    return '|'.join(f"{version}@{updated_at.timestamp() if updated_at else 0}"
+                    for version, updated_at in get_versions(models).values())
+
+
+def _start_request(**kwargs):
+    _local.memo = {}
+
+
+def _end_request(**kwargs):
+    _local.memo = None
+
+
+def _on_change(sender, **kwargs):
+    if sender._meta.app_label == 'fulfillment' and sender is not TableVersion:
+        mark_changed(sender)
+
+
+def connect_signals():
+    post_save.connect(_on_change, dispatch_uid='fulfillment.versions.save')
+    post_delete.connect(_on_change, dispatch_uid='fulfillment.versions.delete')
+    request_started.connect(_start_request, dispatch_uid='fulfillment.versions.start')
+    request_finished.connect(_end_request, dispatch_uid='fulfillment.versions.end')
+
+
+def etag_by_versions(*models):
+    """
+    목록 화면용 조건부 GET 데코레이터 (@login_required 안쪽에 사용)
+    models : 화면에 표시되는 모든 테이블 (잔액처럼 다른 테이블에서 계산되는 값 포함)
+    """
+    key = tuple(_label(model) for model in models)
+
+    def _has_messages(request):
+        # 표시 대기 중인 메시지가 있으면 본문이 달라지므로 조건부 응답을 하지 않음
+        return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+    def _csrf_secret(request):
+        # 본문의 폼에 들어간 CSRF 토큰 - 다시 로그인하면 바뀌므로 예전 화면(304)을 재사용하면 안 됨
+        # get_token() 은 호출마다 다르게 마스킹하므로 마스킹 전 비밀값(쿠키 값)을 사용
+        get_token(request)
+        return request.META.get('CSRF_COOKIE', '')
+
+    def etag_func(request, *args, **kwargs):
+        if _has_messages(request):
+            return None
+        versions = get_versions(key)
+        raw = '|'.join([request.path, request.GET.urlencode(), str(request.user.pk), _csrf_secret(request)] +
+                       [f"{label}:{versions[label][0]}" for label in key])
+        return hashlib.sha1(raw.encode()).hexdigest()
+
+    def last_modified_func(request, *args, **kwargs):
+        if _has_messages(request):
+            return None
+        stamps = [updated_at for _, updated_at in get_versions(key).values() if updated_at]
+        return max(stamps) if stamps else None
+
+    def decorator(view):
+        conditional = condition(etag_func=etag_func, last_modified_func=last_modified_func)(view)
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            # 매 요청 재검증 (사용자별 화면이므로 공유 캐시 금지)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
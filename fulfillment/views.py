@@ -1,17 +1,19 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.utils import timezone
-from django.db.models import Sum, Q  # <--- Q 확인
-from django.db.models.functions import TruncDay
+from django.db.models import Count
 from datetime import timedelta
-from django.http import HttpResponse
+import time
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse
+from django.urls import reverse
 from django.template.loader import render_to_string
 from decimal import Decimal
-from django.contrib.auth import login
+from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.core.paginator import Paginator # <--- Paginator 확인
 from django.contrib.auth.decorators import user_passes_test
-import weasyprint
+from django.core.exceptions import ValidationError
 
 # 관리자 권한 확인 함수
 def is_superuser(user):
@@ -35,14 +37,25 @@ from .forms import (
     ExpenseForm, EmployeeForm, PayrollForm, CompanyInfoForm,
     BankAccountForm, WorkLogForm, BankTransactionForm, SignUpForm,
     PurchaseCreateFormSet, OrderCreateFormSet, PaymentQuickForm,
-    ZoneForm, LocationForm, NoticeForm
+    ZoneForm, LocationForm, NoticeForm, DataImportForm, OrderImportForm, PayrollRunForm, PayrollRunFormSet,
+    BankStatementImportForm, InvoiceBatchForm,
 )
 
 # ---------------------------------------------------------
 # [3] 유틸리티 & 서비스 (Utils & Services)
 # ---------------------------------------------------------
 from .utils import generate_barcode_image, export_to_excel
-from .services import create_picking_list
+from .importers import run_import, IMPORTERS, import_orders
+from .versions import etag_by_versions
+from .db import write_transaction
+from .routers import use_reporting
+from .posting import payroll_run_rows, run_payroll
+from . import attachments, counters, fulltext, reconcile, refdata, reports, search
+from .services import (
+    create_picking_list, get_invoice_context, get_invoice_pdf, clear_invoice_cache,
+    get_invoice_pdfs, invoice_batch_queryset, bundle_invoices,
+    partner_balance_queryset, partner_balance, BALANCE_FIELDS,
+)
 
 
 # =========================================================
@@ -65,6 +78,7 @@ def delete_account(request):
     """회원탈퇴"""
     if request.method == 'POST':
         user = request.user
+        logout(request)  # 세션 정리 (signed_cookies 면 쿠키 삭제) - 사용자 캐시는 삭제 signal 로 무효화
         user.delete()
         return redirect('login')
     return render(request, 'registration/delete_account.html')
@@ -74,58 +88,17 @@ def delete_account(request):
 #  SECTION 2: 대시보드 및 회사 설정 (Dashboard)
 # =========================================================
 @login_required
+@use_reporting
 def dashboard(request):
-    """메인 경영 대시보드"""
-    today = timezone.now().date()
-    this_month_start = today.replace(day=1)
-
-    # 1. 금일 매출
-    today_revenue = OrderItem.objects.filter(
-        order__order_date__date=today, order__status='SHIPPED'
-    ).aggregate(s=Sum('final_amount'))['s'] or 0
-
-    # 2. 월간 실적 (매출, 원가, 비용, 이익)
-    month_orders = Order.objects.filter(order_date__date__gte=this_month_start, status='SHIPPED')
-    month_revenue = month_orders.aggregate(s=Sum('total_revenue'))['s'] or 0
-    month_cogs = month_orders.aggregate(s=Sum('total_cogs'))['s'] or 0
-    month_expenses = Expense.objects.filter(date__gte=this_month_start).aggregate(s=Sum('amount'))['s'] or 0
-    month_profit = (month_revenue - month_cogs) - month_expenses
-
-    # 3. 채권/채무
-    partners = Partner.objects.all()
-    total_receivable = 0
-    total_payable = 0
-    for p in partners:
-        balance = p.current_balance
-        if balance > 0: total_receivable += balance
-        elif balance < 0: total_payable += abs(balance)
-
-    # 4. 차트 데이터 (최근 7일 매출)
-    last_7_days = today - timedelta(days=6)
-    daily_sales_qs = Order.objects.filter(
-        order_date__date__gte=last_7_days, status='SHIPPED'
-    ).annotate(day=TruncDay('order_date')).values('day').annotate(total=Sum('total_revenue')).order_by('day')
-    
-    chart_dates = [d['day'].strftime('%m-%d') for d in daily_sales_qs]
-    chart_revenues = [int(d['total']) for d in daily_sales_qs]
+    """메인 경영 대시보드 (집계 블록은 fulfillment.reports, 조각 캐시가 빈 블록만 실행)"""
+    return render(request, 'fulfillment/dashboard.html', reports.lazy_dashboard(timezone.now().date()))
 
-    # 5. 비용 차트
-    expense_qs = Expense.objects.filter(date__gte=this_month_start).values('category').annotate(total=Sum('amount'))
-    expense_labels = [ex['category'] for ex in expense_qs]
-    expense_data = [int(ex['total']) for ex in expense_qs]
-
-    # 6. 기타 알림
-    expiring = Inventory.objects.filter(expiry_date__lte=today+timedelta(days=7), quantity__gt=0).order_by('expiry_date')[:5]
-    recent_orders = Order.objects.order_by('-order_date')[:5]
-
-    context = {
-        'today_revenue': today_revenue, 'month_revenue': month_revenue,
-        'month_profit': month_profit, 'total_receivable': total_receivable, 'total_payable': total_payable,
-        'chart_dates': chart_dates, 'chart_revenues': chart_revenues,
-        'expense_labels': expense_labels, 'expense_data': expense_data,
-        'expiring': expiring, 'recent_orders': recent_orders,
-    }
-    return render(request, 'fulfillment/dashboard.html', context)
+@login_required
+@use_reporting
+async def dashboard_async(request):
+    """대시보드 비동기 버전 - 캐시가 빈 조각의 독립 집계 블록을 동시에 실행 (SQLite 는 순서대로)"""
+    context = await reports.adashboard(timezone.now().date())
+    return await sync_to_async(render)(request, 'fulfillment/dashboard.html', context)
 
 @login_required
 def company_update(request):
@@ -155,8 +128,7 @@ def inbound_create(request):
             return redirect('fulfillment:print_label', inventory_id=inv.id)
     else:
         form = InboundForm(initial={'expiry_date': timezone.now().date() + timedelta(days=365)})
-    products = Product.objects.all()
-    return render(request, 'fulfillment/inbound_form.html', {'form': form, 'products': products})
+    return render(request, 'fulfillment/inbound_form.html', {'form': form, 'products': refdata.products()})
 
 @login_required
 def print_label(request, inventory_id):
@@ -196,6 +168,7 @@ def inventory_delete(request, pk):
     return render(request, 'fulfillment/common_delete.html', {'object': obj, 'back_url': 'fulfillment:inventory_list'})
 
 @login_required
+@use_reporting
 def export_inventory_excel(request):
     """재고 엑셀 다운로드"""
     queryset = Inventory.objects.filter(quantity__gt=0).select_related('product', 'location__zone').order_by('product__name')
@@ -216,7 +189,7 @@ def export_inventory_excel(request):
 @login_required
 def purchase_list(request):
     """발주 리스트 및 신규 등록 팝업"""
-    purchases = Purchase.objects.select_related('supplier').order_by('-purchase_date')
+    purchases = Purchase.objects.select_related('supplier').annotate(item_count=Count('items')).order_by('-purchase_date')
     start_date = request.GET.get('start_date'); end_date = request.GET.get('end_date')
     supplier_id = request.GET.get('supplier'); status = request.GET.get('status')
 
@@ -225,9 +198,7 @@ def purchase_list(request):
     if supplier_id: purchases = purchases.filter(supplier_id=supplier_id)
     if status: purchases = purchases.filter(status=status)
 
-    suppliers = Partner.objects.filter(partner_type__in=['SUPPLIER', 'BOTH'])
-    products_all = Product.objects.all()
-    locations_all = Location.objects.filter(is_active=True)
+    suppliers = refdata.partners('SUPPLIER', 'BOTH')
     
     # 신규 등록용 폼 (팝업)
     form = PurchaseForm(initial={'purchase_date': timezone.now().date()})
@@ -235,7 +206,6 @@ def purchase_list(request):
 
     context = {
         'purchases': purchases, 'suppliers': suppliers,
-        'products_all': products_all, 'locations_all': locations_all,
         'form': form, 'formset': formset
     }
     return render(request, 'fulfillment/purchase_list.html', context)
@@ -275,7 +245,7 @@ def purchase_update(request, pk):
     else:
         form = PurchaseForm(instance=purchase)
         formset = PurchaseCreateFormSet(instance=purchase)
-    context = {'form': form, 'formset': formset, 'purchase': purchase, 'products_all': Product.objects.all(), 'locations_all': Location.objects.filter(is_active=True), 'title': f'발주서 수정 (#{purchase.id})'}
+    context = {'form': form, 'formset': formset, 'purchase': purchase, 'title': f'발주서 수정 (#{purchase.id})'}
     return render(request, 'fulfillment/purchase_edit.html', context)
 
 @login_required
@@ -285,6 +255,7 @@ def purchase_delete(request, pk):
     return render(request, 'fulfillment/common_delete.html', {'object': obj, 'back_url': 'fulfillment:purchase_list'})
 
 @login_required
+@use_reporting
 def export_purchase_excel(request):
     queryset = Purchase.objects.select_related('supplier').order_by('-purchase_date')
     start_date = request.GET.get('start_date'); end_date = request.GET.get('end_date')
@@ -303,7 +274,7 @@ def export_purchase_excel(request):
 @login_required
 def order_list(request):
     """주문 리스트 및 신규 등록 팝업"""
-    orders = Order.objects.select_related('client').order_by('-order_date')
+    orders = Order.objects.select_related('client').annotate(item_count=Count('items')).order_by('-order_date')
     start_date = request.GET.get('start_date'); end_date = request.GET.get('end_date')
     client_id = request.GET.get('client'); status = request.GET.get('status')
 
@@ -312,15 +283,14 @@ def order_list(request):
     if client_id: orders = orders.filter(client_id=client_id)
     if status: orders = orders.filter(status=status)
 
-    clients = Partner.objects.filter(partner_type__in=['CLIENT', 'BOTH'])
-    products_all = Product.objects.all()
+    clients = refdata.partners('CLIENT', 'BOTH')
     
     # 신규 등록용 폼 (팝업)
     form = OrderForm(initial={'status': 'PENDING'})
     formset = OrderCreateFormSet(queryset=OrderItem.objects.none(), prefix='items')
 
     context = {
-        'orders': orders, 'clients': clients, 'products_all': products_all,
+        'orders': orders, 'clients': clients,
         'form': form, 'formset': formset
     }
     return render(request, 'fulfillment/order_list.html', context)
@@ -328,6 +298,7 @@ def order_list(request):
 # fulfillment/views.py 의 해당 함수 교체
 
 @login_required
+@write_transaction
 def order_create(request):
     if request.method == 'POST':
         form = OrderForm(request.POST)
@@ -368,6 +339,34 @@ def order_create(request):
     return redirect('fulfillment:order_list')
 
 @login_required
+def order_import(request):
+    """거래처 주문서(엑셀/CSV) 일괄 등록 -> 거래처별 주문 생성 (+ 선택 시 피킹 지시)"""
+    result = None
+    if request.method == 'POST':
+        form = OrderImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            started = time.perf_counter()
+            result, orders = import_orders(upload, upload.name, memo=form.cleaned_data['memo'])
+            if orders:
+                failed = 0
+                if form.cleaned_data['allocate']:
+                    for order in orders:
+                        try:
+                            create_picking_list(order)
+                        except ValidationError as e:
+                            failed += 1
+                            messages.error(request, f"주문 #{order.id} 피킹 지시 실패: {'; '.join(e.messages)}")
+                elapsed = time.perf_counter() - started
+                messages.success(request, f"주문 {len(orders)}건 등록 완료 ({result.valid}개 품목, {elapsed:.2f}초)"
+                                 + (f" / 피킹 지시 실패 {failed}건" if failed else ""))
+                return redirect('fulfillment:order_list')
+    else:
+        form = OrderImportForm()
+    return render(request, 'fulfillment/order_import.html', {'form': form, 'result': result})
+
+@login_required
+@write_transaction
 def order_update(request, pk):
     order = get_object_or_404(Order, pk=pk)
     if request.method == 'POST':
@@ -421,13 +420,15 @@ def order_update(request, pk):
         form = OrderForm(instance=order)
         formset = OrderCreateFormSet(instance=order)
         
-    context = {'form': form, 'formset': formset, 'order': order, 'products_all': Product.objects.all(), 'title': f'주문서 수정 (#{order.id})'}
+    context = {'form': form, 'formset': formset, 'order': order, 'title': f'주문서 수정 (#{order.id})'}
     return render(request, 'fulfillment/order_edit.html', context)
 
 @login_required
 def order_delete(request, pk):
     obj = get_object_or_404(Order, pk=pk)
-    if request.method == 'POST': obj.delete(); return redirect('fulfillment:order_list')
+    if request.method == 'POST':
+        clear_invoice_cache(obj.id); obj.delete()
+        return redirect('fulfillment:order_list')
     return render(request, 'fulfillment/common_delete.html', {'object': obj, 'back_url': 'fulfillment:order_list'})
 
 @login_required
@@ -442,6 +443,7 @@ def order_allocate(request, pk):
     return redirect('fulfillment:order_list')
 
 @login_required
+@write_transaction
 def process_weight(request, order_id):
     """출고 계량 처리"""
     order = get_object_or_404(Order, id=order_id)
@@ -472,28 +474,41 @@ def process_weight(request, order_id):
 
 @login_required
 def generate_invoice_pdf(request, order_id):
-    """거래 명세서"""
-    order = get_object_or_404(Order, id=order_id)
-    items = order.items.all()
-    my_company = CompanyInfo.objects.first()
-    if not my_company: my_company = CompanyInfo(name="(회사정보 미설정)")
-    
-    current_total = order.total_revenue
-    total_balance = 0; previous_balance = 0
-    if order.client:
-        initial = order.client.initial_balance
-        past_sales = Order.objects.filter(client=order.client, status='SHIPPED').filter(Q(order_date__lt=order.order_date)|Q(order_date=order.order_date, id__lt=order.id)).aggregate(s=Sum('total_revenue'))['s'] or 0
-        total_paid = Payment.objects.filter(partner=order.client, payment_type='INBOUND', date__lte=order.order_date.date()).aggregate(s=Sum('amount'))['s'] or 0
-        previous_balance = (initial + past_sales) - total_paid
-        total_balance = previous_balance + current_total
-
-    context = {
-        'order': order, 'items': items, 'company': my_company,
-        'today': timezone.now().date(), 'previous_balance': previous_balance, 'total_balance': total_balance,
-    }
-    return render(request, 'fulfillment/invoice_pdf.html', context)
-
-@login_required
+    """거래 명세서 (PDF / ?format=html 은 브라우저 미리보기)"""
+    order = get_object_or_404(Order.objects.select_related('client'), id=order_id)
+    context = get_invoice_context(order)
+    if request.GET.get('format') == 'html':
+        return render(request, 'fulfillment/invoice_pdf.html', context)
+
+    pdf, cache_hit = get_invoice_pdf(order, context)
+    response = HttpResponse(pdf, content_type='application/pdf')
+    response['Content-Disposition'] = f'inline; filename="invoice_{order.id}.pdf"'
+    response['X-Invoice-Cache'] = 'HIT' if cache_hit else 'MISS'
+    return response
+
+@login_required
+@use_reporting
+def invoice_batch(request):
+    """일괄 거래명세서 (배송 회차 전체를 PDF 1개 또는 ZIP으로 출력)"""
+    form = InvoiceBatchForm(request.GET)
+    if not form.is_valid():
+        errors = [error for field_errors in form.errors.values() for error in field_errors]
+        messages.error(request, "일괄 명세서 조건 오류: " + ' '.join(errors))
+        return redirect('fulfillment:order_list')
+    data = form.cleaned_data
+    orders = invoice_batch_queryset(start_date=data['start_date'], end_date=data['end_date'],
+                                    ids=data['ids'], client_id=data['client'])
+    if not orders.exists():
+        messages.warning(request, "출력할 출고완료 주문이 없습니다.")
+        return redirect('fulfillment:order_list')
+
+    content, content_type, ext = bundle_invoices(get_invoice_pdfs(orders), data['format'])
+    response = HttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="invoices_{timezone.now().strftime("%Y%m%d")}.{ext}"'
+    return response
+
+@login_required
+@use_reporting
 def export_order_excel(request):
     queryset = Order.objects.select_related('client').order_by('-order_date')
     start_date = request.GET.get('start_date'); end_date = request.GET.get('end_date')
@@ -510,41 +525,23 @@ def export_order_excel(request):
 #  SECTION 6: 재무 및 회계 (Finance)
 # =========================================================
 @login_required
+@use_reporting
 def monthly_report(request):
     """월간 손익 보고서"""
-    query_month = request.GET.get('month')
-    if query_month:
-        year, month = map(int, query_month.split('-'))
-        start_date = timezone.datetime(year, month, 1).date()
-    else:
-        start_date = timezone.now().date().replace(day=1)
-
-    if start_date.month == 12: next_month_start = start_date.replace(year=start_date.year + 1, month=1, day=1)
-    else: next_month_start = start_date.replace(month=start_date.month + 1, day=1)
-
-    orders = Order.objects.filter(order_date__gte=start_date, order_date__lt=next_month_start, status='SHIPPED')
-    total_revenue = orders.aggregate(s=Sum('total_revenue'))['s'] or 0
-    total_cogs = orders.aggregate(s=Sum('total_cogs'))['s'] or 0
-    gross_profit = total_revenue - total_cogs
-
-    expenses = Expense.objects.filter(date__gte=start_date, date__lt=next_month_start)
-    total_expense = expenses.aggregate(s=Sum('amount'))['s'] or 0
-    operating_profit = gross_profit - total_expense
-    op_margin = round((operating_profit / total_revenue * 100), 1) if total_revenue > 0 else 0
-
-    purchases = Purchase.objects.filter(purchase_date__gte=start_date, purchase_date__lt=next_month_start, status='RECEIVED')
-    total_purchase_amt = purchases.aggregate(s=Sum('total_amount'))['s'] or 0
-
-    context = {
-        'target_date': start_date, 'query_month': start_date.strftime('%Y-%m'),
-        'total_revenue': total_revenue, 'total_cogs': total_cogs, 'gross_profit': gross_profit,
-        'total_expense': total_expense, 'operating_profit': operating_profit, 'op_margin': op_margin,
-        'total_purchase_amount': total_purchase_amt,
-        'expense_list': expenses.values('category').annotate(sum=Sum('amount')).order_by('-sum'),
-    }
+    start, end = reports.month_range(request.GET.get('month'))
+    context = reports.monthly_context(start, reports.collect(reports.monthly_blocks(start, end)))
     return render(request, 'fulfillment/monthly_report.html', context)
 
 @login_required
+@use_reporting
+async def monthly_report_async(request):
+    """월간 손익 보고서 비동기 버전"""
+    start, end = reports.month_range(request.GET.get('month'))
+    context = reports.monthly_context(start, await reports.acollect(reports.monthly_blocks(start, end)))
+    return await sync_to_async(render)(request, 'fulfillment/monthly_report.html', context)
+
+@login_required
+@etag_by_versions(Expense, BankAccount)
 def expense_list(request):
     expenses = Expense.objects.order_by('-date')
     form = ExpenseForm()
@@ -592,6 +589,49 @@ def bank_detail(request, pk):
     account = get_object_or_404(BankAccount, pk=pk)
     transactions = account.transactions.order_by('-date', '-id')
     return render(request, 'fulfillment/bank_detail.html', {'account': account, 'transactions': transactions})
+@login_required
+def bank_statement_import(request, pk):
+    """통장 거래내역(엑셀/CSV) 업로드 -> 장부 자동 대사 -> 대사 결과 화면"""
+    account = get_object_or_404(BankAccount, pk=pk)
+    result = None
+    if request.method == 'POST':
+        form = BankStatementImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['file']
+            started = time.perf_counter()
+            result = reconcile.import_statement(account, upload, upload.name)
+            if result.valid:
+                done = reconcile.reconcile(account, form.cleaned_data['window_days'])
+                messages.success(request, f"{result.valid}줄 중 신규 {result.created}줄 저장 / 장부 일치 {done.matched}건, "
+                                          f"입출금 연결 {done.matched_payments}건, 전표 초안 {done.drafts}건 ({time.perf_counter() - started:.2f}초)")
+                if result.error_count:
+                    messages.warning(request, f"읽지 못한 행 {result.error_count}개는 건너뛰었습니다.")
+                return redirect('fulfillment:bank_reconciliation', pk=account.pk)
+    else:
+        form = BankStatementImportForm()
+    return render(request, 'fulfillment/bank_statement_import.html', {'account': account, 'form': form, 'result': result})
+@login_required
+def bank_reconciliation(request, pk):
+    """대사 결과 (상태별 합계 / 전표 초안 / 장부에만 있는 내역) - 초안 선택 확정, 엑셀 다운로드"""
+    account = get_object_or_404(BankAccount, pk=pk)
+    if request.method == 'POST':
+        lines = account.statement_lines.filter(pk__in=request.POST.getlist('lines'))
+        if request.POST.get('action') == 'rematch':
+            done = reconcile.reconcile(account)
+            messages.info(request, f"다시 대사: 장부 일치 {done.matched}건, 입출금 연결 {done.matched_payments}건, 전표 초안 {done.drafts}건")
+        else:
+            messages.success(request, f"전표 초안 {reconcile.post_drafts(lines)}건을 장부에 반영했습니다.")
+        return redirect(request.get_full_path())
+    start = request.GET.get('start_date') or None; end = request.GET.get('end_date') or None
+    report = reconcile.reconciliation_report(account, start, end)
+    if request.GET.get('export') == 'excel':
+        lines = account.statement_lines.select_related('matched_transaction', 'suggested_partner').order_by('date', 'id')
+        if report['start']: lines = lines.filter(date__gte=report['start'])
+        if report['end']: lines = lines.filter(date__lte=report['end'])
+        return export_to_excel(lines, f"대사_{account.bank_name}", [
+            ('거래일', 'date'), ('구분', 'get_transaction_type_display'), ('금액', 'amount'), ('적요', 'description'), ('잔액', 'balance'),
+            ('상태', 'get_status_display'), ('장부 내역', 'matched_transaction__description'), ('추정 거래처', 'suggested_partner__name')])
+    return render(request, 'fulfillment/bank_reconciliation.html', {'account': account, **report})
 
 
 # =========================================================
@@ -654,14 +694,45 @@ def payroll_delete(request, pk):
     obj = get_object_or_404(Payroll, pk=pk)
     if request.method == 'POST': obj.delete(); return redirect('fulfillment:payroll_list')
     return render(request, 'fulfillment/common_delete.html', {'object': obj, 'back_url': 'fulfillment:payroll_list'})
+@login_required
+def payroll_run(request):
+    """월 급여 일괄 지급 - 재직 직원 전체 미리보기(성과급/수당/차감 조정) 후 확정. 귀속월에 이미 지급된 직원은 제외"""
+    today = timezone.now().date()
+    header = PayrollRunForm(request.POST if request.method == 'POST' else (request.GET or None),
+                            initial={'month_label': today.strftime('%Y-%m'), 'payment_date': today})
+    values = header.cleaned_data if header.is_valid() else header.initial
+    month_label, payment_date = values['month_label'], values['payment_date']
+
+    overrides = {}
+    if request.method == 'POST':
+        formset = PayrollRunFormSet(request.POST, prefix='rows')
+        if formset.is_valid():
+            overrides = {row.pop('employee'): row for row in (dict(form.cleaned_data) for form in formset)}
+            if header.is_valid() and request.POST.get('action') == 'confirm':
+                created = run_payroll(month_label, payment_date, overrides, values.get('payment_account'))
+                messages.success(request, f"{month_label} 급여 {len(created)}건 지급 완료" if created else f"{month_label} 급여는 이미 모두 지급되었습니다.")
+                return redirect(f"{reverse('fulfillment:payroll_list')}?start_date={payment_date}&end_date={payment_date}")
+    rows = payroll_run_rows(month_label, payment_date, overrides)
+    if request.method != 'POST' or formset.is_valid():  # 귀속월이 바뀌면 지급 대상도 바뀜 -> 입력 행 다시 구성
+        formset = PayrollRunFormSet(prefix='rows', initial=[{'employee': row.payroll.employee_id, **overrides.get(row.payroll.employee_id, {})}
+                                                            for row in rows if not row.paid])
+    forms_by_employee = {str(form['employee'].value()): form for form in formset}
+    lines = [(row, forms_by_employee.get(str(row.payroll.employee_id))) for row in rows]
+    due = [row.payroll.total_amount for row in rows if not row.paid]
+    return render(request, 'fulfillment/payroll_run.html', {
+        'header': header, 'formset': formset, 'lines': lines, 'month_label': month_label,
+        'due_count': len(due), 'due_total': sum(due),
+    })
 
 @login_required
 def worklog_list(request):
-    logs = WorkLog.objects.select_related('employee').order_by('-date')
-    q_date = request.GET.get('date')
+    logs = WorkLog.objects.select_related('employee').order_by('-date', '-id')
+    q_date = request.GET.get('date'); query = request.GET.get('q', '')
     if q_date: logs = logs.filter(date=q_date)
+    if query: logs = fulltext.search('worklog', query, logs)  # 내용/특이사항 전문 검색 (순위순)
+    page_obj = Paginator(logs, 24).get_page(request.GET.get('page'))
     form = WorkLogForm(initial={'date': timezone.now().date()})
-    return render(request, 'fulfillment/worklog_list.html', {'logs': logs, 'form': form})
+    return render(request, 'fulfillment/worklog_list.html', {'logs': page_obj, 'page_obj': page_obj, 'form': form})
 @login_required
 def worklog_create(request):
     if request.method == 'POST':
@@ -689,11 +760,15 @@ def worklog_delete(request, pk):
 
 # --- 8-1. 거래처 (Partners) ---
 @login_required
+@etag_by_versions(Partner, Order, Purchase, Payment)
 def partner_list(request):
     partners = Partner.objects.order_by('name')
     name_q = request.GET.get('name'); type_q = request.GET.get('partner_type')
     if name_q: partners = partners.filter(name__icontains=name_q)
     if type_q: partners = partners.filter(partner_type=type_q)
+    partners = partner_balance_queryset(partners)  # 잔액은 서브쿼리로 함께 (p.balance)
+    for p in partners:
+        p.balance = partner_balance(*(getattr(p, name) for name in BALANCE_FIELDS))
     form = PartnerForm()
     return render(request, 'fulfillment/partner_list.html', {'partners': partners, 'form': form})
 @login_required
@@ -758,6 +833,7 @@ def partner_detail(request, pk):
     return render(request, 'fulfillment/partner_detail.html', {'partner': partner, 'ledger_data': ledger, 'form': form})
 
 @login_required
+@write_transaction
 def partner_payment_create(request, pk):
     partner = get_object_or_404(Partner, pk=pk)
     if request.method == 'POST':
@@ -767,6 +843,7 @@ def partner_payment_create(request, pk):
             pay.partner = partner; pay.save()
     return redirect('fulfillment:partner_detail', pk=pk)
 @login_required
+@write_transaction
 def payment_update(request, pk):
     pay = get_object_or_404(Payment, pk=pk)
     if request.method == 'POST':
@@ -783,6 +860,7 @@ def payment_delete(request, pk):
 
 # --- 8-2. 상품 (Products) ---
 @login_required
+@etag_by_versions(Product)
 def product_list(request):
     products = Product.objects.order_by('category', 'name')
     name_q = request.GET.get('name'); cat_q = request.GET.get('category'); sto_q = request.GET.get('storage')
@@ -811,8 +889,41 @@ def product_delete(request, pk):
     if request.method == 'POST': obj.delete(); return redirect('fulfillment:product_list')
     return render(request, 'fulfillment/common_delete.html', {'object': obj, 'back_url': 'fulfillment:product_list'})
 
-# --- 8-3. 창고/위치 (Locations) ---
+# --- 8-3. 대량 업로드 (Bulk Import) ---
 @login_required
+def data_import(request):
+    """상품/거래처/기초재고 엑셀·CSV 일괄 업로드 (행별 오류 리포트)"""
+    result = None; kind_label = None
+    if request.method == 'POST':
+        form = DataImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            kind = form.cleaned_data['kind']; upload = form.cleaned_data['file']
+            kind_label = IMPORTERS[kind][0]
+            result = run_import(kind, upload, upload.name, dry_run=form.cleaned_data['dry_run'])
+    else:
+        form = DataImportForm()
+    return render(request, 'fulfillment/data_import.html', {'form': form, 'result': result, 'kind_label': kind_label})
+
+# --- 8-4. 상품/위치 검색 (Typeahead) ---
+def _typeahead(request, kind):
+    """select2 ajax 형식 {results: [{id, text, ...}]} - 결과 수 제한 (?limit=, 최대 50)"""
+    try:
+        limit = int(request.GET.get('limit', search.DEFAULT_LIMIT))
+    except ValueError:
+        limit = search.DEFAULT_LIMIT
+    refs = search.search(kind, request.GET.get('q', ''), limit)
+    results = [{'id': ref.id, 'text': search.result_text(kind, ref), **search.result_data(kind, ref)} for ref in refs]
+    return JsonResponse({'results': results})
+@login_required
+def product_search(request):
+    return _typeahead(request, 'product')
+@login_required
+def location_search(request):
+    return _typeahead(request, 'location')
+
+# --- 8-5. 창고/위치 (Locations) ---
+@login_required
+@etag_by_versions(Zone, Location, Inventory, Product)
 def location_list(request):
     zones = Zone.objects.prefetch_related('locations', 'locations__inventory_set', 'locations__inventory_set__product').order_by('name')
     return render(request, 'fulfillment/location_list.html', {'zones': zones, 'zone_form': ZoneForm(), 'location_form': LocationForm()})
@@ -840,6 +951,7 @@ def location_delete(request, pk):
     return render(request, 'fulfillment/common_delete.html', {'object': obj, 'back_url': 'fulfillment:location_list'})
     
 @login_required
+@use_reporting
 def print_partner_ledger(request, pk):
     """거래처 원장 인쇄용 페이지 (상품명 상세 표시 + 콤마 적용)"""
     partner = get_object_or_404(Partner, pk=pk)
@@ -959,11 +1071,11 @@ def print_partner_ledger(request, pk):
 def notice_list(request):
     """공지사항 목록"""
     query = request.GET.get('q', '')
-    # 중요 공지 먼저, 그 다음 최신순 정렬
-    notices = Notice.objects.all().order_by('-is_important', '-created_at')
-    
+    # 중요 공지 먼저, 그 다음 최신순 정렬 / 검색 시 전문 검색 순위순 (fulltext.py)
     if query:
-        notices = notices.filter(Q(title__icontains=query) | Q(content__icontains=query))
+        notices = fulltext.search('notice', query)
+    else:
+        notices = Notice.objects.select_related('author').order_by('-is_important', '-created_at')
     
     # 페이지네이션 (10개씩)
     paginator = Paginator(notices, 10)
@@ -995,12 +1107,28 @@ def notice_create(request):
 def notice_detail(request, pk):
     """공지사항 상세"""
     notice = get_object_or_404(Notice, pk=pk)
-    # 조회수 증가 (본인이 쓴 글이 아닐 때만)
-    if notice.author != request.user:
-        notice.views += 1
-        notice.save()
+    # 조회수 증가 (본인이 쓴 글이 아닐 때만) - 모아서 반영 (counters.py)
+    if notice.author_id != request.user.pk:
+        counters.hit(Notice, notice.pk)
+    notice.views += counters.pending(Notice, notice.pk)
     return render(request, 'fulfillment/notice_detail.html', {'notice': notice})
 
+@login_required
+def notice_file(request, pk):
+    """첨부파일 다운로드 (?download=1 이면 저장 창, ?v=버전 이 있으면 브라우저 장기 캐시)"""
+    notice = get_object_or_404(Notice.objects.only('file'), pk=pk)
+    return attachments.serve_fieldfile(request, notice.file, as_attachment=request.GET.get('download') == '1',
+                                       immutable='v' in request.GET)
+
+@login_required
+def notice_thumbnail(request, pk):
+    """이미지 첨부 미리보기 (처음 요청 시 생성해 디스크에 캐시)"""
+    notice = get_object_or_404(Notice.objects.only('file'), pk=pk)
+    path = attachments.get_thumbnail(notice.file, f"notice-{notice.pk}")
+    if path is None:
+        raise Http404("미리보기가 없습니다.")
+    return attachments.serve_file(request, path, f"notice-{notice.pk}.webp", immutable='v' in request.GET)
+
 # ---------------------------------------------------------
 #  [수정됨] 입출금 내역 수정 (관리자 전용)
 # ---------------------------------------------------------